@@ -11,7 +11,26 @@ from .__about__ import (
 from .data_types import *
 from .logging import make_logger
 from .runtime import *
-from .wiring import *
+# as `from .wiring import *`, apart from the classes loaded on first access
+from .wiring import (DeltaBlock,
+                     DeltaMethodBlock,
+                     Interactive,
+                     DeltaGraph,
+                     RealNode,
+                     PythonNode,
+                     placeholder_node_factory,
+                     NodeTemplate)
 
 # standard library
 from . import lib
+
+# `import *` loads the classes loaded on first access as well
+__all__ = [name for name in globals() if not name.startswith("_")]
+__all__.append("MigenNodeTemplate")
+
+
+def __getattr__(name):
+    # user-facing classes loaded on first access, see deltalanguage.wiring
+    if name == "MigenNodeTemplate":
+        return getattr(wiring, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,40 @@
+"""Benchmark suite of the Deltaflow runtime simulators.
+
+Each workload is a graph stressing one aspect of the runtime:
+
+- ``chain``: linear chain of nodes
+- ``fan_out``: one output sent to several nodes via an auto-generated
+  splitter
+- ``fan_in``: several sources connected to optional inputs
+- ``const_heavy``: chain of nodes with constant inputs
+- ``migen``: Migen node simulated in the loop
+- ``serialisation``: serialisation of a graph with 10k nodes
+
+For each workload the suite reports the wall time, the messages per second,
+the 50th and 99th percentiles of the latency per hop and the peak RSS.
+The results can be stored as JSON baselines and later compared, e.g.
+between commits:
+
+.. code-block:: console
+
+    python -m deltalanguage.bench --output baseline.json
+    # ... change the code ...
+    python -m deltalanguage.bench --compare baseline.json
+
+The comparison exits with code 1 if any metric is worse than the baseline
+by more than the threshold (10% by default).
+
+How the time of a workload grows with its size is shown by running it at
+several scales, e.g. ``--scaling 0.5,1,2,4``.
+"""
+
+from ._harness import (METRICS,
+                       compare,
+                       format_results,
+                       load,
+                       run_isolated,
+                       run_suite,
+                       run_workload,
+                       save,
+                       scaling)
+from ._workloads import WORKLOADS, Probe, Workload
@@ -0,0 +1,82 @@
+import argparse
+import sys
+
+from ._harness import (compare,
+                       format_results,
+                       load,
+                       run_suite,
+                       save,
+                       scaling)
+from ._workloads import WORKLOADS
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m deltalanguage.bench",
+        description="Benchmark the Deltaflow runtime simulators."
+    )
+    parser.add_argument("workloads", nargs="*",
+                        help="workloads to run, all by default: "
+                        + ", ".join(WORKLOADS))
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="factor applied to the size of the workloads")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="runs of each workload, the fastest is kept")
+    parser.add_argument("--scheduler", default="threads",
+                        help="scheduler of DeltaPySimulator")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="queue size of DeltaPySimulator")
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="run the workloads in this process")
+    parser.add_argument("--scaling", metavar="SCALES",
+                        help="comma-separated scales to run each workload at, "
+                        "reports the time per unit of size")
+    parser.add_argument("--output", metavar="JSON",
+                        help="store the results as a baseline")
+    parser.add_argument("--compare", metavar="JSON",
+                        help="flag regressions against a baseline")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative change tolerated by --compare")
+    args = parser.parse_args(argv)
+    for name in args.workloads:
+        if name not in WORKLOADS:
+            parser.error(f"unknown workload {name}")
+
+    simulator_kwargs = {"scheduler": args.scheduler}
+    if args.queue_size is not None:
+        simulator_kwargs["queue_size"] = args.queue_size
+
+    if args.scaling:
+        scales = [float(scale) for scale in args.scaling.split(",")]
+        for name in args.workloads or WORKLOADS:
+            for result in scaling(name, scales, simulator_kwargs,
+                                  isolate=not args.no_isolate):
+                print(f"{name} size={result['size']} "
+                      f"seconds={result['seconds']:.4g} "
+                      f"us_per_size={result['us_per_size']:.4g}")
+        return 0
+
+    results = run_suite(args.workloads or None,
+                        scale=args.scale,
+                        repeat=args.repeat,
+                        simulator_kwargs=simulator_kwargs,
+                        isolate=not args.no_isolate)
+
+    baseline = load(args.compare) if args.compare else None
+    print(format_results(results, baseline))
+
+    if args.output:
+        save(results, args.output)
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        for name, metric, before, after in regressions:
+            print(f"REGRESSION {name} {metric}: {before:.4g} -> {after:.4g}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
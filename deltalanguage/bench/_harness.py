@@ -0,0 +1,305 @@
+"""Execution of the workloads, measurement of the metrics and comparison
+of the results against baselines.
+"""
+
+import datetime
+import inspect
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+from time import perf_counter
+import typing
+
+import numpy as np
+
+from deltalanguage.runtime import DeltaPySimulator
+from deltalanguage.wiring import DeltaGraph
+
+from ._workloads import WORKLOADS
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+# metric -> True if larger values are better
+METRICS = {
+    "seconds": False,
+    "msgs_per_sec": True,
+    "latency_p50_us": False,
+    "latency_p99_us": False,
+    "peak_rss_kib": False,
+}
+
+
+def _peak_rss() -> typing.Optional[int]:
+    """Peak resident set size of this process in KiB, if available."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_workload(name: str,
+                 scale: float = 1.0,
+                 simulator_kwargs: typing.Dict[str, typing.Any] = None
+                 ) -> typing.Dict[str, typing.Any]:
+    """Build and execute a workload once in this process.
+
+    Parameters
+    ----------
+    name : str
+        Name of the workload, one of :py:data:`WORKLOADS`.
+    scale : float
+        Factor applied to the size of the workload.
+    simulator_kwargs : typing.Dict[str, typing.Any]
+        Keyword arguments of
+        :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`.
+
+    Returns
+    -------
+    typing.Dict[str, typing.Any]
+        The metrics of the run. Latencies are ``None`` for workloads that do
+        not send messages.
+    """
+    if name not in WORKLOADS:
+        raise ValueError(f"Unknown workload {name}, "
+                         f"expected one of {', '.join(WORKLOADS)}")
+    builder, param = WORKLOADS[name]
+    default = inspect.signature(builder).parameters[param].default
+    size = max(1, int(default * scale))
+
+    DeltaGraph.clean_stack()
+    workload = builder(**{param: size})
+    if workload.run is None:
+        rt = DeltaPySimulator(workload.graph, **(simulator_kwargs or {}))
+        run = rt.run
+    else:
+        run = workload.run
+
+    start = perf_counter()
+    run()
+    seconds = perf_counter() - start
+
+    result = {
+        "size": size,
+        "messages": workload.messages,
+        "seconds": seconds,
+        "msgs_per_sec": workload.messages / seconds if seconds else None,
+        "latency_p50_us": None,
+        "latency_p99_us": None,
+        "peak_rss_kib": _peak_rss(),
+    }
+    if workload.probe is not None and workload.probe.latencies:
+        p50, p99 = np.percentile(workload.probe.latencies, [50, 99]) * 1e6
+        result["latency_p50_us"] = float(p50)
+        result["latency_p99_us"] = float(p99)
+    if not workload.messages:
+        result["msgs_per_sec"] = None
+    return result
+
+
+def _run_isolated(conn, name, scale, simulator_kwargs):
+    try:
+        conn.send(run_workload(name, scale, simulator_kwargs))
+    except BaseException as exc:  # pylint: disable=broad-except
+        conn.send(exc)
+    finally:
+        conn.close()
+
+
+def run_isolated(name: str,
+                 scale: float = 1.0,
+                 simulator_kwargs: typing.Dict[str, typing.Any] = None
+                 ) -> typing.Dict[str, typing.Any]:
+    """Same as :py:func:`run_workload`, but in a forked process, so that
+    the peak RSS is specific to the workload.
+
+    Falls back to :py:func:`run_workload` where fork is not available.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return run_workload(name, scale, simulator_kwargs)
+
+    ctx = multiprocessing.get_context("fork")
+    recv, send = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_run_isolated,
+                       args=(send, name, scale, simulator_kwargs))
+    proc.start()
+    send.close()
+    try:
+        result = recv.recv()
+    except EOFError:
+        result = RuntimeError(f"Workload {name} exited with code "
+                              f"{proc.exitcode}")
+    proc.join()
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+def _commit() -> typing.Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             cwd=os.path.dirname(__file__),
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.DEVNULL,
+                             check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.decode().strip() or None
+
+
+def run_suite(names: typing.List[str] = None,
+              scale: float = 1.0,
+              repeat: int = 1,
+              simulator_kwargs: typing.Dict[str, typing.Any] = None,
+              isolate: bool = True) -> typing.Dict[str, typing.Any]:
+    """Run workloads and collect their metrics.
+
+    Parameters
+    ----------
+    names : typing.List[str]
+        Names of the workloads to run, all by default.
+    scale : float
+        Factor applied to the size of every workload.
+    repeat : int
+        Each workload is run this many times, the fastest run is kept.
+    simulator_kwargs : typing.Dict[str, typing.Any]
+        Keyword arguments of
+        :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`.
+    isolate : bool
+        Run each workload in its own process.
+
+    Returns
+    -------
+    typing.Dict[str, typing.Any]
+        The results, which can be stored as JSON with :py:func:`save` and
+        compared with :py:func:`compare`.
+    """
+    names = list(WORKLOADS) if names is None else names
+    run = run_isolated if isolate else run_workload
+
+    results = {}
+    for name in names:
+        runs = [run(name, scale, simulator_kwargs) for _ in range(repeat)]
+        results[name] = min(runs, key=lambda r: r["seconds"])
+
+    return {
+        "meta": {
+            "commit": _commit(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale,
+            "simulator_kwargs": simulator_kwargs or {},
+        },
+        "results": results,
+    }
+
+
+def scaling(name: str,
+            scales: typing.List[float],
+            simulator_kwargs: typing.Dict[str, typing.Any] = None,
+            isolate: bool = True) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Run a workload at several scales, to check how its time grows with
+    its size.
+
+    Returns
+    -------
+    typing.List[typing.Dict[str, typing.Any]]
+        The metrics of each run, with the time per unit of size in
+        microseconds under ``"us_per_size"``, which stays constant if
+        the time is linear in the size.
+    """
+    run = run_isolated if isolate else run_workload
+    results = []
+    for scale in scales:
+        result = run(name, scale, simulator_kwargs)
+        result["us_per_size"] = 1e6 * result["seconds"] / result["size"]
+        results.append(result)
+    return results
+
+
+def save(results: typing.Dict[str, typing.Any], path: str):
+    """Store results as JSON."""
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load(path: str) -> typing.Dict[str, typing.Any]:
+    """Load results stored by :py:func:`save`."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: typing.Dict[str, typing.Any],
+            current: typing.Dict[str, typing.Any],
+            threshold: float = 0.1
+            ) -> typing.List[typing.Tuple[str, str, float, float]]:
+    """Find the metrics that are worse than in the baseline.
+
+    Only workloads and metrics present in both results are compared, and
+    only if the workloads have the same size.
+
+    Parameters
+    ----------
+    baseline : typing.Dict[str, typing.Any]
+        Reference results.
+    current : typing.Dict[str, typing.Any]
+        New results.
+    threshold : float
+        Relative change tolerated before a metric is considered regressed.
+
+    Returns
+    -------
+    typing.List[typing.Tuple[str, str, float, float]]
+        Workload, metric, baseline value and new value of each regression.
+    """
+    regressions = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None or old.get("size") != new.get("size"):
+            continue
+        for metric, higher_is_better in METRICS.items():
+            before, after = old.get(metric), new.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if higher_is_better:
+                change = -change
+            if change > threshold:
+                regressions.append((name, metric, before, after))
+    return regressions
+
+
+def format_results(results: typing.Dict[str, typing.Any],
+                   baseline: typing.Dict[str, typing.Any] = None) -> str:
+    """Table of the results, with the relative change to the baseline of
+    each metric if provided.
+    """
+    def fmt(val):
+        return "-" if val is None else f"{val:.4g}"
+
+    header = ["workload"] + list(METRICS)
+    rows = [header]
+    for name, res in results["results"].items():
+        old = (baseline or {"results": {}})["results"].get(name, {})
+        row = [name]
+        for metric in METRICS:
+            cell = fmt(res.get(metric))
+            if old.get(metric) and res.get(metric) is not None:
+                change = (res[metric] - old[metric]) / old[metric]
+                cell += f" ({change:+.0%})"
+            row.append(cell)
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.ljust(width)
+                               for cell, width in zip(row, widths)).rstrip()
+                     for row in rows)
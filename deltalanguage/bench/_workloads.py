@@ -0,0 +1,215 @@
+"""Graphs used as workloads of the benchmark suite.
+
+Each workload is a function that builds a graph and returns a
+:py:class:`Workload` describing how to run and measure it.
+"""
+
+from time import perf_counter
+import typing
+
+from deltalanguage.data_types import Int, Optional
+from deltalanguage.runtime import DeltaRuntimeExit, serialise_graph
+from deltalanguage.wiring import DeltaBlock, DeltaGraph, Interactive
+
+
+class Probe:
+    """Timestamps of the messages sent by the sources and the latencies
+    observed by the sink of a workload.
+
+    The messages are integer indices, so that the sink can look up
+    when each of them was sent.
+
+    Parameters
+    ----------
+    n : int
+        Number of messages sent.
+    hops : int
+        Number of wires each message travels between a source and the sink.
+    """
+
+    def __init__(self, n: int, hops: int):
+        self.sent = [0.0] * n
+        self.latencies = []
+        self.hops = hops
+
+    def received(self, index: int):
+        self.latencies.append(
+            (perf_counter() - self.sent[index]) / self.hops
+        )
+
+
+class Workload:
+    """A graph to benchmark.
+
+    Parameters
+    ----------
+    graph : DeltaGraph
+        The graph to execute.
+    messages : int
+        Number of messages sent on the wires of the graph during one run,
+        messages of constant nodes are not counted.
+    probe : Probe
+        If provided, latencies observed in the graph.
+    run : typing.Callable
+        If provided, used instead of executing the graph with
+        :py:class:`DeltaPySimulator
+        <deltalanguage.runtime.DeltaPySimulator>`.
+    """
+
+    def __init__(self,
+                 graph: DeltaGraph,
+                 messages: int,
+                 probe: Probe = None,
+                 run: typing.Callable[[], None] = None):
+        self.graph = graph
+        self.messages = messages
+        self.probe = probe
+        self.run = run
+
+
+@DeltaBlock(allow_const=False)
+def increment(a: int) -> int:
+    return a + 1
+
+
+@Interactive(outputs=[("out", Int())])
+def counter(node):
+    for i in range(10):
+        node.send(i)
+
+
+@DeltaBlock(allow_const=False)
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+def _source(probe: Probe, start: int, n: int):
+    @Interactive(outputs=[("out", Int())], name="source")
+    def source(node):
+        for i in range(start, start + n):
+            probe.sent[i] = perf_counter()
+            node.send(i)
+
+    return source
+
+
+def _sink(probe: Probe, inputs: int, offset: int, optional: bool = False):
+    """Sink that stops the graph after receiving all messages sent.
+
+    Values received are shifted by ``offset`` before being looked up.
+    """
+    in_type = Optional(Int()) if optional else Int()
+    names = [f"in{i}" for i in range(inputs)]
+    expected = len(probe.sent) * (1 if optional else inputs)
+
+    @Interactive(inputs=[(name, in_type) for name in names], name="sink")
+    def sink(node):
+        received = 0
+        while received < expected:
+            for val in node.receive().values():
+                if val is not None:
+                    probe.received(val - offset)
+                    received += 1
+        raise DeltaRuntimeExit
+
+    return sink
+
+
+def chain(n: int = 2000, length: int = 10) -> Workload:
+    """Linear chain of ``length`` incrementing nodes."""
+    probe = Probe(n, length + 1)
+    with DeltaGraph("chain") as graph:
+        val = _source(probe, 0, n).call()
+        for _ in range(length):
+            val = increment(val)
+        _sink(probe, 1, length).call(in0=val)
+
+    return Workload(graph, n * (length + 1), probe)
+
+
+def fan_out(n: int = 2000, width: int = 4) -> Workload:
+    """Source connected to ``width`` nodes via an auto-generated splitter,
+    merged back by the sink.
+    """
+    probe = Probe(n, 3)
+    with DeltaGraph("fan_out") as graph:
+        val = _source(probe, 0, n).call()
+        _sink(probe, width, 1).call(
+            **{f"in{i}": increment(val) for i in range(width)}
+        )
+
+    return Workload(graph, n * (2 * width + 1), probe)
+
+
+def fan_in(n: int = 1000, width: int = 4) -> Workload:
+    """``width`` sources connected to optional inputs of the sink."""
+    probe = Probe(n * width, 1)
+    with DeltaGraph("fan_in") as graph:
+        _sink(probe, width, 0, optional=True).call(
+            **{f"in{i}": _source(probe, i * n, n).call()
+               for i in range(width)}
+        )
+
+    return Workload(graph, n * width, probe)
+
+
+def const_heavy(n: int = 2000, length: int = 10) -> Workload:
+    """Linear chain of ``length`` nodes, each with a constant input."""
+    probe = Probe(n, length + 1)
+    with DeltaGraph("const_heavy") as graph:
+        val = _source(probe, 0, n).call()
+        for _ in range(length):
+            val = add(val, 1)
+        _sink(probe, 1, length).call(in0=val)
+
+    return Workload(graph, n * (length + 1), probe)
+
+
+def migen(n: int = 200) -> Workload:
+    """Migen node simulated in the loop between a source and the sink."""
+    import migen as mg
+
+    from deltalanguage.wiring import MigenNodeTemplate
+
+    class MigenIncrement(MigenNodeTemplate):
+
+        def migen_body(self, template):
+            i1 = template.add_pa_in_port("i1", Optional(Int()))
+            o1 = template.add_pa_out_port("o1", Int())
+
+            self.comb += i1.ready.eq(1)
+            self.sync += o1.valid.eq(0)
+            self.sync += mg.If(
+                i1.valid & i1.ready,
+                o1.valid.eq(1),
+                o1.data.eq(i1.data + 1)
+            )
+
+    probe = Probe(n, 2)
+    with DeltaGraph("migen") as graph:
+        val = _source(probe, 0, n).call()
+        node = MigenIncrement(name="migen_increment").call(i1=val)
+        _sink(probe, 1, 1).call(in0=node.o1)
+
+    return Workload(graph, 2 * n, probe)
+
+
+def serialisation(nodes: int = 10000) -> Workload:
+    """Serialisation of a linear chain of ``nodes`` nodes."""
+    with DeltaGraph("serialisation") as graph:
+        val = counter.call()
+        for _ in range(nodes - 1):
+            val = increment(val)
+
+    return Workload(graph, 0, run=lambda: serialise_graph(graph))
+
+
+# name -> (builder, parameter scaled by the size factor)
+WORKLOADS = {
+    "chain": (chain, "n"),
+    "fan_out": (fan_out, "n"),
+    "fan_in": (fan_in, "n"),
+    "const_heavy": (const_heavy, "n"),
+    "migen": (migen, "n"),
+    "serialisation": (serialisation, "nodes"),
+}
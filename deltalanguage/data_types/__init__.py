@@ -46,6 +46,11 @@ found in `Deltaflow Data Types <tutorials/data_types.html>`_.
 
 """
 
+import importlib
+import importlib.abc
+import importlib.util
+import sys
+
 from ._delta_types import (BaseDeltaType,
                            PrimitiveDeltaType,
                            CompoundDeltaType,
@@ -69,6 +74,30 @@ from ._exceptions import DeltaIOError, DeltaTypeError
 
 from ._special import Size, Void
 
+
+class _SchemaFinder(importlib.abc.MetaPathFinder):
+    """Imports ``capnp``, whose import hook loads the ``.capnp`` schemas of
+    this submodule, only when :py:mod:`dotdf_capnp` is first imported, as
+    loading ``capnp`` takes time.
+    """
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != f"{__name__}.dotdf_capnp":
+            return None
+        import capnp  # pylint: disable=W0611
+        sys.meta_path.remove(self)
+        return importlib.util.find_spec(fullname)
+
+
+sys.meta_path.append(_SchemaFinder())
+
+
+def __getattr__(name):
+    if name == "dotdf_capnp":
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # user-facing classes
 __all__ = ["Top",
            "Bool",
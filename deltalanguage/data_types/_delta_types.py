@@ -3,10 +3,14 @@ They do not integrate with mypy.
 They do not have values you can interact with.
 """
 
-from abc import ABC, abstractmethod
+from abc import ABCMeta, abstractmethod
+import functools
+import itertools
 import logging
 import struct
+import threading
 import typing
+import weakref
 
 import attr
 import numpy as np
@@ -18,8 +22,104 @@ from ._special import Size, Void
 
 logger = make_logger(logging.WARNING, "Data Types")
 
+# interned types by their class and structure, see _InternedType
+_types: typing.MutableMapping[typing.Hashable, 'BaseDeltaType'] = \
+    weakref.WeakValueDictionary()
+# interned types by the arguments of their construction, the most recent
+# ones are kept alive
+_types_by_args: typing.Dict[typing.Hashable, 'BaseDeltaType'] = {}
+_MAX_TYPES_BY_ARGS = 4096
+_types_lock = threading.Lock()
 
-class BaseDeltaType(ABC):
+# attributes of types holding data derived from their structure
+_DERIVED = ('_codec', '_str', '_numpy_type', '_hash')
+
+
+def _frozen(arg) -> typing.Hashable:
+    """Hashable key of an argument of the construction of a type, equal only
+    to the keys of the same argument.
+
+    Raises
+    ------
+    TypeError
+        If ``arg`` is not made of types, sizes, strings and integers.
+    """
+    arg_type = type(arg)
+    if arg_type is Size:
+        return (Size, arg.is_placeholder, arg.val)
+    if arg_type is tuple or arg_type is list:
+        return (arg_type, tuple(map(_frozen, arg)))
+    if isinstance(arg, BaseDeltaType):
+        # records of different classes are equal, but they are distinct
+        return (arg_type, id(arg), arg)
+    if isinstance(arg, (type, np.dtype, str, int)):
+        return (arg_type, arg)
+    raise TypeError(f"{arg} cannot be a key")
+
+
+def _intern(t: 'BaseDeltaType') -> 'BaseDeltaType':
+    """The interned type with the structure of ``t``, which is ``t`` if
+    there was none.
+    """
+    key = (type(t), t._key())
+    with _types_lock:
+        return _types.setdefault(key, t)
+
+
+def _unpickle_type(cls: type, state: dict) -> 'BaseDeltaType':
+    t = object.__new__(cls)
+    t.__dict__.update(state)
+    return _intern(t)
+
+
+def _cached(name: str):
+    """Decorator caching the result of a method of a type without arguments
+    in its attribute ``name``, listed in ``_DERIVED``.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            try:
+                return self.__dict__[name]
+            except KeyError:
+                value = self.__dict__[name] = method(self)
+                return value
+        return wrapper
+    return decorator
+
+
+class _InternedType(ABCMeta):
+    """Metaclass of Deltaflow types, which interns them: there is only one
+    instance of each structure, thus types are compared by identity and
+    the data derived from their structure is computed once.
+
+    Constructions with hashable arguments are looked up before creating a
+    new instance, other ones are looked up by the structure of the new
+    instance.
+    Types are held weakly, apart from the ones constructed most recently.
+    """
+
+    def __call__(cls, *args, **kwargs):
+        try:
+            args_key = (cls, _frozen(args),
+                        _frozen(sorted(kwargs.items())) if kwargs else ())
+            t = _types_by_args.get(args_key)
+        except TypeError:
+            args_key = t = None
+        if t is not None:
+            return t
+
+        t = _intern(super().__call__(*args, **kwargs))
+        if args_key is not None:
+            with _types_lock:
+                if len(_types_by_args) >= _MAX_TYPES_BY_ARGS:
+                    # drop the oldest
+                    del _types_by_args[next(iter(_types_by_args))]
+                _types_by_args[args_key] = t
+        return t
+
+
+class BaseDeltaType(metaclass=_InternedType):
     """The base Deltaflow type, of which other types are derived.
 
     Attributes
@@ -31,12 +131,51 @@ class BaseDeltaType(ABC):
         * for compound types it's the sum of all componenets' sizes
         * for :py:class:`Union` that is the the size of the largest element
           PLUS 1 byte that stores which particular data type is encoded
+
+    There are two encodings of data of each type:
+
+    * :py:meth:`pack_bytes` and :py:meth:`unpack_bytes` use packed native
+      bytes produced by a single :py:class:`struct.Struct`, see
+      :py:attr:`codec`. This is the encoding used for message transport.
+    * :py:meth:`pack` and :py:meth:`unpack` provide a bit string view of
+      the data, i.e. an ASCII string of ``0`` and ``1``. It is meant for
+      hardware and debug consumers only.
+
+    Types are interned: structurally equal types are the same object,
+    which is compared by identity, and the derived data such as
+    :py:attr:`codec`, ``str()`` and :py:meth:`as_numpy_type` is computed
+    once per type. Thus types must not be modified after their
+    construction.
+    Only records of different classes with the same fields, and the types
+    made of them, are distinct objects which are equal.
     """
 
+    # compiled on first use by codec
+    _codec: typing.Optional[struct.Struct] = None
+
     def __init__(self):
         self._pack_format = None
         self.size = Size(0)
 
+    def __getstate__(self):
+        # derived data, e.g. compiled codecs which cannot be pickled, is
+        # rebuilt on demand
+        state = self.__dict__.copy()
+        for name in _DERIVED:
+            state.pop(name, None)
+        return state
+
+    def __reduce__(self):
+        # unpickled types are interned as well
+        return _unpickle_type, (type(self), self.__getstate__())
+
+    def _key(self) -> typing.Hashable:
+        """Structure of the type, which identifies it among the types of its
+        class. Component types are interned, thus they are identified by
+        their ``id``.
+        """
+        return ()
+
     def bytes_to_bits(self, s: bytes) -> bytes:
         """Converts a byte encoding of an object to a bit encoding.
 
@@ -186,24 +325,86 @@ class BaseDeltaType(ABC):
         """
         return self._pack_format
 
+    @property
+    def codec(self) -> struct.Struct:
+        """Precompiled :py:class:`struct.Struct` used by :py:meth:`pack_bytes`
+        and :py:meth:`unpack_bytes`.
+
+        It is compiled once per instance on the first access.
+        Standard sizes and little-endian byte order without padding are used,
+        thus ``codec.size`` is the number of bytes of a packed message.
+        """
+        if self._codec is None:
+            self._codec = struct.Struct('<' + self._codec_format())
+        return self._codec
+
+    def pack_bytes(self, val: object) -> bytes:
+        """Encode an object to packed native bytes via :py:attr:`codec`.
+
+        Parameters
+        ----------
+        val : object
+            Object to be packed.
+            Its type should match :py:meth:`as_python_type`.
+
+        Returns
+        -------
+        bytes
+
+        Raises
+        ------
+        DeltaTypeError
+            If the object cannot be packed as this type.
+        """
+        flat = []
+        try:
+            self._flatten_native(val, flat)
+            return self.codec.pack(*flat)
+        except (struct.error, AttributeError, TypeError, ValueError) as exc:
+            raise DeltaTypeError(f'Data does not match the packing format\n'
+                                 f'{val=}\n{self=}') from exc
+
+    def unpack_bytes(self, buffer: bytes) -> object:
+        """Decode packed native bytes produced by :py:meth:`pack_bytes`.
+
+        Parameters
+        ----------
+        buffer : bytes
+            Packed object of this type.
+
+        Returns
+        -------
+        object
+            Object itself.
+        """
+        return self._deflatten_native(iter(self.codec.unpack(buffer)))
+
+    def _codec_format(self) -> str:
+        """Format of :py:attr:`codec` without the byte order prefix."""
+        return self.pack_format
+
+    def _flatten_native(self, val, out: list):
+        """Append the fields of ``val`` to be packed by :py:attr:`codec`."""
+        out.append(val)
+
+    def _deflatten_native(self, fields: typing.Iterator):
+        """Revert :py:meth:`_flatten_native` by consuming unpacked fields."""
+        return next(fields)
+
+
 class PrimitiveDeltaType(BaseDeltaType):
     """Primitive Deltaflow types, which have a direct mapping to primitive
     types of Python and C.
     """
 
-    def __eq__(self, other):
-        if type(self) is type(other):
-            return self.size == other.size
-        return False
-
-    def __hash__(self):
-        return hash(self.size)
+    def _key(self):
+        return self.size
 
     def pack(self, val):
-        return self.bytes_to_bits(struct.pack(self.pack_format, val))
+        return self.bytes_to_bits(self.pack_bytes(val))
 
     def unpack(self, buffer):
-        return struct.unpack(self.pack_format, self.bits_to_bytes(buffer))[0]
+        return self.unpack_bytes(self.bits_to_bytes(buffer))
 
     def as_numpy_object(self, val):
         return self.as_numpy_type()(val)
@@ -213,9 +414,9 @@ class PrimitiveDeltaType(BaseDeltaType):
 
     def is_packable(self, val):
         try:
-            self.pack(val)
+            self.pack_bytes(val)
             return True
-        except:
+        except DeltaTypeError:
             return False
 
 
@@ -226,10 +427,6 @@ class CompoundDeltaType(BaseDeltaType):
     def __len__(self):
         pass
 
-    @abstractmethod
-    def __hash__(self):
-        pass
-
     @abstractmethod
     def flatten(self, vals) -> list:
         """Converts data of this type to a plain list."""
@@ -291,6 +488,9 @@ class Top(BaseDeltaType):
     def is_packable(self, val):
         raise NotImplementedError
 
+    def _codec_format(self):
+        raise NotImplementedError
+
 
 class Array(CompoundDeltaType):
     """Fixed-size collection of objects of the same type.
@@ -315,6 +515,7 @@ class Array(CompoundDeltaType):
         self.size = self.list_of.size * self.length
         self._pack_format = self.list_of.pack_format * self.length.val
 
+    @_cached('_str')
     def __str__(self):
         return f"[{self.list_of} x {self.length}]"
 
@@ -338,19 +539,27 @@ class Array(CompoundDeltaType):
             val = val[0]
         return [self.list_of.from_numpy_object(v) for v in val]
 
+    @_cached('_numpy_type')
     def as_numpy_type(self):
         return np.dtype([('f0',
                           self.list_of.as_numpy_type(),
                           self.length.val)])
 
     def __eq__(self, other):
+        # equal arrays are the same object, apart from arrays of records of
+        # different classes
         if type(self) is type(other):
-            return self.list_of == other.list_of and self.length == other.length
+            return self is other or (self.list_of == other.list_of
+                                     and self.length == other.length)
         return False
 
+    @_cached('_hash')
     def __hash__(self):
         return hash((self.list_of, self.length))
 
+    def _key(self):
+        return (id(self.list_of), self.length)
+
     def flatten(self, vals):
         flatten_vals = []
         for v in vals:
@@ -393,7 +602,34 @@ class Array(CompoundDeltaType):
         elif len(val) == self.length.val:
             return all(self.list_of.is_packable(v) for v in val)
         else:
-            return False        
+            return False
+
+    def _codec_format(self):
+        return self.list_of._codec_format() * self.length.val
+
+    def _flatten_native(self, val, out):
+        if type(val) is np.ndarray:
+            val = self.from_numpy_object(val)
+        elif not isinstance(val, list):
+            raise DeltaTypeError(f'Data does not match the packing format\n'
+                                 f'{val=}\n{self=}')
+
+        if len(val) != self.length.val:
+            raise DeltaTypeError(f'Data does not match the packing format\n'
+                                 f'{val=}\n{self=}')
+
+        if type(self.list_of) in (Int, UInt, Float):
+            # elements are fields of the codec as they are
+            out.extend(val)
+        else:
+            for v in val:
+                self.list_of._flatten_native(v, out)
+
+    def _deflatten_native(self, fields):
+        if type(self.list_of) in (Int, UInt, Float):
+            return list(itertools.islice(fields, self.length.val))
+        return [self.list_of._deflatten_native(fields)
+                for _ in range(self.length.val)]
 
 
 class UInt(PrimitiveDeltaType):
@@ -423,12 +659,14 @@ class UInt(PrimitiveDeltaType):
             raise NotImplementedError(f'Unsupported format: {self.size} - '
                                       'supported sizes are 8, 16, 32, 64')
 
+    @_cached('_str')
     def __str__(self):
         return f"UInt{self.size}"
 
     def as_python_type(self):
         return int
 
+    @_cached('_numpy_type')
     def as_numpy_type(self):
         if self.size == Size(8):
             return np.uint8
@@ -470,12 +708,14 @@ class Int(PrimitiveDeltaType):
             raise NotImplementedError(f'Unsupported format: {self.size} - '
                                       'supported sizes are 8, 16, 32, 64')
 
+    @_cached('_str')
     def __str__(self):
         return f"Int{self.size}"
 
     def as_python_type(self):
         return int
 
+    @_cached('_numpy_type')
     def as_numpy_type(self):
         if self.size == Size(8):
             return np.int8
@@ -523,6 +763,15 @@ class Bool(PrimitiveDeltaType):
         else:
             raise DeltaTypeError
 
+    def _flatten_native(self, val, out):
+        # the format '?' would accept any object, thus the check
+        if val == True:
+            out.append(True)
+        elif val == False:
+            out.append(False)
+        else:
+            raise DeltaTypeError
+
 
 class Char(PrimitiveDeltaType):
     """Character implemented via 8-bit in analogy with ``char`` from ``struct``
@@ -549,11 +798,11 @@ class Char(PrimitiveDeltaType):
     def from_numpy_object(self, val):
         return chr(val)
 
-    def pack(self, val):
-        return super().pack(val.encode('ascii'))
+    def _flatten_native(self, val, out):
+        out.append(val.encode('ascii'))
 
-    def unpack(self, val):
-        return super().unpack(val.decode('ascii'))
+    def _deflatten_native(self, fields):
+        return next(fields).decode('ascii')
 
 
 class Str(Array):
@@ -565,12 +814,14 @@ class Str(Array):
         super().__init__(Char(), length)
         self._pack_format = str(self.length) + 's'
 
+    @_cached('_str')
     def __str__(self):
         return f"Str{self.size}"
 
     def as_python_type(self):
         return str
 
+    @_cached('_numpy_type')
     def as_numpy_type(self):
         return (np.string_, self.length.val)
 
@@ -589,20 +840,11 @@ class Str(Array):
 
     def pack(self, val):
         # overwrite
-        if not self.is_packable(val):
-            raise DeltaTypeError(f'Data does not match the packing format\n'
-                                 f'{val=}\n{self=}')
-
-        if type(val) is np.string_:
-            val = self.from_numpy_object(val)
-        return self.bytes_to_bits(struct.pack(self.pack_format,
-                                              *self.flatten(val)))
+        return self.bytes_to_bits(self.pack_bytes(val))
 
     def unpack(self, buffer):
         # overwrite
-        flatten_vals = list(struct.unpack(self.pack_format,
-                                          self.bits_to_bytes(buffer)))
-        return self.deflatten(flatten_vals)
+        return self.unpack_bytes(self.bits_to_bytes(buffer))
 
     def is_packable(self, val):
         val_df_type = delta_type(val)
@@ -612,7 +854,26 @@ class Str(Array):
             return True
         else:
             return False
-        
+
+    def _codec_format(self):
+        return self.pack_format
+
+    def _flatten_native(self, val, out):
+        if type(val) is np.string_:
+            val = self.from_numpy_object(val)
+        elif type(val) is not str:
+            raise DeltaTypeError(f'Data does not match the packing format\n'
+                                 f'{val=}\n{self=}')
+
+        # the format 's' would silently truncate longer strings
+        if len(val) > self.length.val:
+            raise DeltaTypeError(f'Data does not match the packing format\n'
+                                 f'{val=}\n{self=}')
+
+        out.extend(self.flatten(val))
+
+    def _deflatten_native(self, fields):
+        return next(fields).decode('ascii').rstrip('\x00')
 
 
 class Float(PrimitiveDeltaType):
@@ -636,12 +897,14 @@ class Float(PrimitiveDeltaType):
             raise NotImplementedError(f'Unsupported format: {self.size} - '
                                       'supported sizes are 32, 64')
 
+    @_cached('_str')
     def __str__(self):
         return f"Float{self.size}"
 
     def as_python_type(self):
         return float
 
+    @_cached('_numpy_type')
     def as_numpy_type(self):
         if self.size == Size(32):
             return np.float32
@@ -671,12 +934,14 @@ class Complex(PrimitiveDeltaType):
             raise NotImplementedError(f'Unsupported format: {self.size} - '
                                       'supported sizes are 64, 128')
 
+    @_cached('_str')
     def __str__(self):
         return f"Complex{self.size}"
 
     def as_python_type(self):
         return complex
 
+    @_cached('_numpy_type')
     def as_numpy_type(self):
         if self.size == Size(64):
             return np.complex64
@@ -687,14 +952,12 @@ class Complex(PrimitiveDeltaType):
                                       'supported sizes are 64, 128')
         
 
-    def pack(self, val):
-        return self.bytes_to_bits(struct.pack(self.pack_format,
-                                              val.real,
-                                              val.imag))
+    def _flatten_native(self, val, out):
+        out.append(val.real)
+        out.append(val.imag)
 
-    def unpack(self, buffer):
-        vals = struct.unpack(self.pack_format, self.bits_to_bytes(buffer))
-        return vals[0] + vals[1] * 1j
+    def _deflatten_native(self, fields):
+        return next(fields) + next(fields) * 1j
 
 
 class Tuple(CompoundDeltaType):
@@ -716,6 +979,7 @@ class Tuple(CompoundDeltaType):
         self.size = sum((e.size for e in self.elems), Size(0))
         self._pack_format = "".join((e.pack_format for e in self.elems))
 
+    @_cached('_str')
     def __str__(self):
         return f"({', '.join(map(str, self.elems))})"
 
@@ -745,18 +1009,25 @@ class Tuple(CompoundDeltaType):
         return tuple((t.from_numpy_object(v))
                      for t, v in zip(self.elems, val))
 
+    @_cached('_numpy_type')
     def as_numpy_type(self):
         return np.dtype([(f'f{i}', t.as_numpy_type())
                          for i, t in enumerate(self.elems)])
 
     def __eq__(self, other):
+        # equal tuples are the same object, apart from tuples of records of
+        # different classes
         if type(other) is Tuple:
-            return self.elems == other.elems
+            return self is other or self.elems == other.elems
         return False
 
+    @_cached('_hash')
     def __hash__(self):
         return hash(self.elems)
 
+    def _key(self):
+        return tuple(map(id, self.elems))
+
     def flatten(self, vals):
         flatten_vals = []
         for v in vals:
@@ -806,7 +1077,27 @@ class Tuple(CompoundDeltaType):
                         "NumPy array object for Tuple has length != 1")
                 val = val[0]
             return all(elem.is_packable(v) for elem, v in zip(self.elems, val))
-        return False        
+        return False
+
+    def _codec_format(self):
+        return "".join(e._codec_format() for e in self.elems)
+
+    def _flatten_native(self, val, out):
+        if type(val) is np.ndarray:
+            val = self.from_numpy_object(val)
+        elif not isinstance(val, tuple):
+            raise DeltaTypeError(f'Data does not match the packing format\n'
+                                 f'{val=}\n{self=}')
+
+        if len(val) != len(self.elems):
+            raise DeltaTypeError(f'Data does not match the packing format\n'
+                                 f'{val=}\n{self=}')
+
+        for t, v in zip(self.elems, val):
+            t._flatten_native(v, out)
+
+    def _deflatten_native(self, fields):
+        return tuple(t._deflatten_native(fields) for t in self.elems)
 
 
 class Record(CompoundDeltaType):
@@ -866,6 +1157,7 @@ class Record(CompoundDeltaType):
 
         self._pack_format = "".join((e.pack_format for (_, e) in self.elems))
 
+    @_cached('_str')
     def __str__(self):
         def record_inst_printer(field):
             return f"{field[0]}: {field[1]}"
@@ -899,18 +1191,25 @@ class Record(CompoundDeltaType):
         return self.attrs_type(*[t.from_numpy_object(val[name])
                                  for name, t in self.elems])
 
+    @_cached('_numpy_type')
     def as_numpy_type(self):
         return np.dtype((np.record, [(name, t.as_numpy_type())
                                      for name, t in self.elems]))
 
     def __eq__(self, other):
+        # records of different classes with the same fields are distinct
+        # types, but they are equal
         if type(self) is type(other):
-            return self.elems == other.elems
+            return self is other or self.elems == other.elems
         return False
 
     def __hash__(self):
         return hash(self.elems)
 
+    def _key(self):
+        return (self.attrs_type,
+                tuple((name, id(t)) for name, t in self.elems))
+
     def flatten(self, vals):
         flatten_vals = []
         for v in attr.astuple(vals, retain_collection_types=True):
@@ -968,7 +1267,28 @@ class Record(CompoundDeltaType):
                 return hasattr(val, name) and t.is_packable(getattr(val, name))
             return all(packable_attrs(name, t) for name, t in self.elems)
         else:
-            return False       
+            return False
+
+    def _codec_format(self):
+        return "".join(e._codec_format() for (_, e) in self.elems)
+
+    def _flatten_native(self, val, out):
+        if isinstance(val, np.ndarray):
+            val = self.from_numpy_object(val)
+        elif not attr.has(type(val)):
+            raise DeltaTypeError(f'Data does not match the packing format\n'
+                                 f'{val=}\n{self=}')
+
+        if len(attr.fields(type(val))) != len(self.elems):
+            raise DeltaTypeError(f'Data does not match the packing format\n'
+                                 f'{val=}\n{self=}')
+
+        for name, t in self.elems:
+            t._flatten_native(getattr(val, name), out)
+
+    def _deflatten_native(self, fields):
+        return self.attrs_type(*[t._deflatten_native(fields)
+                                 for (_, t) in self.elems])
 
 
 class Union(CompoundDeltaType):
@@ -998,15 +1318,15 @@ class Union(CompoundDeltaType):
 
     def __init__(self, elems: typing.Iterable[typing.Union[typing.Type, BaseDeltaType]]):
         super().__init__()
-        self.elems = []
+        unique_elems = []
 
         # flatten Unions and save only unique sorted elements
         for e in elems:
-            if type(e) is Union:
-                for ee in e.elems:
-                    self._add_elem(as_delta_type(ee))
-            else:
-                self._add_elem(as_delta_type(e))
+            for ee in (e.elems if type(e) is Union else [e]):
+                ee = as_delta_type(ee)
+                if ee not in unique_elems:
+                    unique_elems.append(ee)
+        self.elems = sorted(unique_elems, key=str)
 
         if len(self.elems) == 0:
             raise DeltaTypeError("You cannot have empty Union")
@@ -1020,6 +1340,7 @@ class Union(CompoundDeltaType):
         # the data format is encoded in the 1-byte meta buffer
         self._pack_format = ""
 
+    @_cached('_str')
     def __str__(self):
         elems_str = ' | '.join(map(str, self.elems))
         return '<' + elems_str + '>'
@@ -1051,6 +1372,7 @@ class Union(CompoundDeltaType):
         raise DeltaTypeError(
             "NumPy unions cannot be converted to Python types.")
 
+    @_cached('_numpy_type')
     def as_numpy_type(self):
         # Unions are implemented as a NumPy array
         # where all elements have the same offset.
@@ -1058,19 +1380,20 @@ class Union(CompoundDeltaType):
                          'formats': [t.as_numpy_type() for t in self.elems],
                          'offsets': [0]*len(self.elems)})
 
-    def _add_elem(self, elem: BaseDeltaType):
-        if not elem in self.elems:
-            self.elems.append(elem)
-            self.elems.sort(key=str)
-
     def __eq__(self, other):
+        # equal unions are the same object, apart from unions of records of
+        # different classes
         if type(self) is type(other):
-            return self.elems == other.elems
+            return self is other or self.elems == other.elems
         return False
 
+    @_cached('_hash')
     def __hash__(self):
         return hash(tuple(self.elems))
 
+    def _key(self):
+        return tuple(map(id, self.elems))
+
     def flatten(self, vals):
         # no need, instead the same method from the identified type is used
         raise NotImplementedError
@@ -1120,6 +1443,27 @@ class Union(CompoundDeltaType):
             return False
         return any(elem.is_packable(val) for elem in self.elems)
 
+    def _codec_format(self):
+        # the largest element's bytes followed by 1 byte of meta data
+        return f"{max(e.codec.size for e in self.elems)}sB"
+
+    def _flatten_native(self, val, out):
+        if type(val) is np.ndarray:
+            raise DeltaTypeError(
+                "NumPy unions cannot be converted to Python types.")
+        for i, elem in enumerate(self.elems):
+            if elem.is_packable(val):
+                out.append(elem.pack_bytes(val))
+                out.append(i)
+                return
+
+        raise DeltaTypeError(f'Union does not support {val}')
+
+    def _deflatten_native(self, fields):
+        buffer = next(fields)
+        elem = self.elems[next(fields)]
+        return elem.unpack_bytes(buffer[:elem.codec.size])
+
 
 class Raw(BaseDeltaType):
     """Wrapper for converting objects of one data type into raw bits.
@@ -1142,17 +1486,23 @@ class Raw(BaseDeltaType):
             raise DeltaTypeError("Raw cannot contain Top.")
 
     def __eq__(self, other):
+        # equal raw types are the same object, apart from raw records of
+        # different classes
         if type(other) is Raw:
-            return self.base_type == other.base_type
-        else:
-            return False
+            return self is other or self.base_type == other.base_type
+        return False
 
+    @_cached('_hash')
     def __hash__(self):
         return hash(self.base_type)
 
+    def _key(self):
+        return id(self.base_type)
+
     def __getattr__(self, item):
         return getattr(self.base_type, item)
 
+    @_cached('_str')
     def __str__(self):
         return f"Raw({str(self.base_type)})"
 
@@ -1180,6 +1530,22 @@ class Raw(BaseDeltaType):
     def unpack(self, buffer):
         return int(buffer, 2)
 
+    def _codec_format(self):
+        return f"{(self.size.val + 7) // 8}s"
+
+    def _flatten_native(self, val, out):
+        if not self.is_packable(val):
+            raise DeltaTypeError(
+                "Raw.pack requires int input. Use Raw.as_bits before pack.")
+        try:
+            out.append(val.to_bytes(self.codec.size, 'little'))
+        except OverflowError as exc:
+            raise DeltaTypeError(
+                f"Raw value {val} does not fit {self.size} bits") from exc
+
+    def _deflatten_native(self, fields):
+        return int.from_bytes(next(fields), 'little')
+
     def as_bits(self, val: BaseDeltaType) -> int:
         """Converts a given value into an integer containing its binary
         representation. This is done using the base type's
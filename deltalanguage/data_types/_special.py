@@ -58,10 +58,8 @@ class Size:
         return Size(self.val + other.val)
 
     def __iadd__(self, other):
-        if self.is_placeholder or other.is_placeholder:
-            raise ValueError("Please define Size")
-        self.val += other.val
-        return self
+        # sizes are shared by interned types, thus they are not modified
+        return self + other
 
     def __sub__(self, other):
         if self.is_placeholder or other.is_placeholder:
@@ -69,15 +67,7 @@ class Size:
         return Size(self.val - other.val)
 
     def __isub__(self, other):
-        if self.is_placeholder or other.is_placeholder:
-            raise ValueError("Please define Size")
-
-        self.val -= other.val
-
-        if self.val < 0:
-            raise ValueError("Only non-negative sizes for types are allowed.")
-
-        return self
+        return self - other
 
     def __mul__(self, other):
         if self.is_placeholder:
@@ -94,17 +84,7 @@ class Size:
         return self.__mul__(other)
 
     def __imul__(self, other):
-        if self.is_placeholder:
-            raise ValueError("Please define Size")
-
-        if isinstance(other, int):
-            self.val *= other
-        elif type(other) is Size:
-            self.val *= other.val
-        else:
-            raise DeltaTypeError("Unsupported data type")
-
-        return self
+        return self * other
 
     @property
     def in_bytes(self) -> int:
@@ -17,11 +17,19 @@ the top level module and can be used like this:
     logger.warning("We have a warning!")
 """
 
+from collections import deque
+import heapq
 import logging
-from typing import Dict
+import pickle
+import struct
+import threading
+from typing import IO, TYPE_CHECKING, Dict, Iterator, Optional, Tuple
 
 from deltalanguage._utils import QueueMessage
 
+if TYPE_CHECKING:
+    from deltalanguage.data_types import BaseDeltaType
+
 
 # Global dictionary with all deltalanguage loggers
 DeltaLoggers: Dict[str, logging.Logger] = {}
@@ -114,25 +122,67 @@ class MessageLog:
       the output message gets assigned the same value.
       This ensures that the internal state of the node is taken in account.
 
+    By default all messages are kept in memory. For long runs the log can
+    be bounded to the last ``maxlen`` messages, only every ``sampling``-th
+    message can be kept, or the messages can be written to the file at
+    ``path`` instead, which is read by :py:func:`read_message_log`.
+
     Parameters
     ----------
     lvl : int
         Logging level.
+    maxlen : Optional[int]
+        If given, only the last ``maxlen`` messages are kept in memory.
+    sampling : int
+        Keep only one in this many messages, by default all of them.
+    path : Optional[str]
+        If given, messages are written to this file instead of being kept in
+        memory. Records are buffered in runs of ``run_size`` messages, each
+        run is sorted by logical clock before it is written.
+    run_size : int
+        Number of messages per sorted run in the file.
 
     Attributes
     ----------
-    messages : List[QueueMessage]
-        Log of messages.
+    messages : Union[List[QueueMessage], Deque[QueueMessage]]
+        Log of messages kept in memory.
 
 
     .. todo :: This class belongs to the domain of `DeltaPySimulator`.
     """
 
-    def __init__(self, lvl: int = logging.ERROR):
-        self.messages = []
+    def __init__(self,
+                 lvl: int = logging.ERROR,
+                 maxlen: Optional[int] = None,
+                 sampling: int = 1,
+                 path: Optional[str] = None,
+                 run_size: int = 4096):
+        if sampling < 1:
+            raise ValueError("sampling must be a positive integer")
+        if run_size < 1:
+            raise ValueError("run_size must be a positive integer")
+
+        self.messages = [] if maxlen is None else deque(maxlen=maxlen)
         self.lvl = lvl
-
-    def add_message(self, sender: str, port: str, msg: QueueMessage):
+        self.sampling = sampling
+        self.path = path
+        self.run_size = run_size
+
+        self._seen = 0
+        self._file: Optional[IO[bytes]] = None
+        # ids of the nodes by their names, and of the ports by their
+        # (node name, port name)
+        self._node_ids: Dict[str, int] = {}
+        self._port_ids: Dict[Tuple[str, str], int] = {}
+        self._definitions = []
+        self._run = []
+        self._lock = threading.Lock()
+
+    def add_message(self,
+                    sender: str,
+                    port: str,
+                    msg: QueueMessage,
+                    port_type: Optional['BaseDeltaType'] = None):
         """Add a message to the log.
 
         Note, only messages with non-negative clock are added.
@@ -158,15 +208,184 @@ class MessageLog:
         if not isinstance(msg, QueueMessage):
             raise TypeError("Message logged that was not of"
                             + f"type QueueMessage: {msg}")
-        if (self.lvl <= logging.INFO
-                and msg.msg is not None
-                and msg.clk >= 0):
+        if (self.lvl > logging.INFO
+                or msg.msg is None
+                or msg.clk < 0):
+            return
+
+        if self.sampling > 1:
+            # nodes log their messages concurrently
+            with self._lock:
+                seen = self._seen
+                self._seen += 1
+            if seen % self.sampling:
+                return
+
+        if self.path is None:
             self.messages.append((sender, port, msg))
+        else:
+            self._spill(sender, port, msg, port_type)
+
+    def _spill(self,
+               sender: str,
+               port: str,
+               msg: QueueMessage,
+               port_type: Optional['BaseDeltaType']):
+        """Add a binary record of the message to the current run.
+
+        The payload is packed by the codec of ``port_type`` if possible,
+        otherwise it is pickled.
+        """
+        from deltalanguage.data_types import DeltaTypeError
+        try:
+            if port_type is None:
+                raise DeltaTypeError("Type of the port is unknown")
+            payload = port_type.pack_bytes(msg.msg)
+            encoding = _CODEC
+        except (DeltaTypeError, NotImplementedError):
+            payload = pickle.dumps(msg.msg)
+            encoding = _PICKLE
+
+        with self._lock:
+            port_id = self._port_ids.get((sender, port))
+            if port_id is None:
+                node_id = self._node_ids.setdefault(sender,
+                                                    len(self._node_ids))
+                port_id = self._port_ids[(sender, port)] = len(self._port_ids)
+                self._definitions.append(
+                    (node_id, port_id, sender, port, port_type)
+                )
+            else:
+                node_id = self._node_ids[sender]
+
+            self._run.append((msg.clk,
+                              _RECORD.pack(node_id, port_id, msg.clk,
+                                           encoding, len(payload))
+                              + payload))
+            if len(self._run) >= self.run_size:
+                self._write_run()
+
+    def _write_run(self):
+        """Write the new port definitions and the current run sorted by
+        logical clock to the file.
+        """
+        if self._file is None:
+            self._file = open(self.path, "wb")
+            self._file.write(_MAGIC)
+
+        if self._definitions:
+            data = pickle.dumps(self._definitions)
+            self._file.write(_BLOCK.pack(_DEFINITIONS, len(data)) + data)
+            self._definitions = []
+
+        if self._run:
+            self._run.sort(key=lambda record: record[0])
+            data = b"".join(record for _, record in self._run)
+            self._file.write(_BLOCK.pack(_RUN, len(data)) + data)
+            self._run = []
+
+    def close(self):
+        """Write the remaining messages and close the file, if messages are
+        written to a file.
+        """
+        with self._lock:
+            if self._run or self._definitions:
+                self._write_run()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
 
     def log_messages(self):
         """Print all messages in order of clock time."""
-        self.messages.sort(key=lambda x: x[2].clk)
+        if self.path is None:
+            messages = sorted(self.messages, key=lambda x: x[2].clk)
+        else:
+            self.close()
+            if self._port_ids:
+                messages = read_message_log(self.path)
+            else:
+                messages = []
+
         log = make_logger(self.lvl, "MessageLog")
-        for sender, port, msg in self.messages:
+        for sender, port, msg in messages:
             log.info(f"Sent to {sender} port {port} at logical "
                      + f"clock time {msg.clk}: {msg.msg}")
+
+
+# format of the files written by MessageLog
+_MAGIC = b"DFML\x01"
+# kind and length of a block
+_BLOCK = struct.Struct("<BQ")
+_DEFINITIONS, _RUN = 0, 1
+# node id, port id, clock, encoding and length of the payload
+_RECORD = struct.Struct("<IIqBI")
+_CODEC, _PICKLE = 0, 1
+
+
+def read_message_log(path: str) -> Iterator[Tuple[str, str, QueueMessage]]:
+    """Read the messages written by :py:class:`MessageLog` to a file.
+
+    The sorted runs of the file are merged lazily, thus only one message
+    per run is held in memory at a time.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+
+    Returns
+    -------
+    Iterator[Tuple[str, str, QueueMessage]]
+        Receiving node, port and message, in order of clock time.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path} is not a message log")
+
+        definitions = {}
+        runs = []
+        while True:
+            header = file.read(_BLOCK.size)
+            if not header:
+                break
+            kind, length = _BLOCK.unpack(header)
+            if kind == _DEFINITIONS:
+                for _, port_id, sender, port, port_type in pickle.loads(
+                        file.read(length)):
+                    definitions[port_id] = (sender, port, port_type)
+            else:
+                runs.append((file.tell(), file.tell() + length))
+                file.seek(length, 1)
+
+        yield from heapq.merge(
+            *(_read_run(file, start, end, definitions)
+              for start, end in runs),
+            key=lambda message: message[2].clk
+        )
+
+
+def _read_run(
+    file: IO[bytes],
+    start: int,
+    end: int,
+    definitions: Dict[int, Tuple[str, str, 'BaseDeltaType']]
+) -> Iterator[Tuple[str, str, QueueMessage]]:
+    """Read the messages of a run one by one.
+
+    Runs share the file, thus its position is set before each read.
+    """
+    pos = start
+    while pos < end:
+        file.seek(pos)
+        _, port_id, clk, encoding, length = _RECORD.unpack(
+            file.read(_RECORD.size)
+        )
+        payload = file.read(length)
+        pos += _RECORD.size + length
+
+        sender, port, port_type = definitions[port_id]
+        if encoding == _CODEC:
+            msg = port_type.unpack_bytes(payload)
+        else:
+            msg = pickle.loads(payload)
+        yield sender, port, QueueMessage(msg, clk=clk)
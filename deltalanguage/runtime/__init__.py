@@ -6,6 +6,7 @@ This submodule contains the following user-facing parts:
 - Serialisation routines:
   :py:func:`serialise_graph`
   :py:func:`deserialise_graph`
+  :py:func:`deserialise_graph_file`
 - Python Runtime Simulator :py:class:`DeltaPySimulator`
 
 - Universal exit strategy :py:exc:`DeltaRuntimeExit`
@@ -21,13 +22,25 @@ the top level module and can be used like this:
     print(dl.DeltaRuntimeExit)
 """
 
-from ._output import deserialise_graph, serialise_graph
-from ._queues import ConstQueue, DeltaQueue
+from ._output import (deserialise_graph,
+                      deserialise_graph_file,
+                      serialise_graph)
+from ._async_scheduler import AsyncioScheduler
+from ._queues import (AsyncDeltaQueue,
+                      ConstMutationWarning,
+                      ConstQueue,
+                      DeltaQueue,
+                      FrozenList)
+from ._process_runtime import DeltaProcessSimulator, partition_graph
+from ._ring_buffer import RingBuffer, SharedMemoryQueue
 from ._runtime import DeltaPySimulator, DeltaRuntimeExit, DeltaThread
+from ._scheduler import CooperativeScheduler
 
 
 # user-facing classes
 __all__ = ["deserialise_graph",
+           "deserialise_graph_file",
            "serialise_graph",
            "DeltaPySimulator",
+           "DeltaProcessSimulator",
            "DeltaRuntimeExit"]
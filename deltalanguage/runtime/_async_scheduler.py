@@ -0,0 +1,211 @@
+from __future__ import annotations
+import asyncio
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+import functools
+import sys
+import threading
+import typing
+
+from deltalanguage.wiring import PyInteractiveBody, PythonNode
+
+from ._queues import AsyncDeltaQueue
+
+if typing.TYPE_CHECKING:
+    from ._runtime import DeltaPySimulator
+
+
+class AsyncioScheduler:
+    """Runs all nodes of
+    :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`
+    as tasks of a single ``asyncio`` event loop.
+
+    The nodes communicate via :py:class:`AsyncDeltaQueue`, thus a node
+    waiting for an input or for room in an output queue is suspended and
+    does not occupy a thread. Thousands of nodes can be run this way.
+
+    - Nodes with function and method bodies are evaluated on the event loop,
+      unless the body is marked as ``blocking``, then it is evaluated on an
+      executor thread.
+    - Nodes with interactive bodies that are coroutine functions
+      (``async def``) are run on the event loop and have to await
+      ``node.receive`` and ``node.send``.
+    - Nodes with interactive bodies that are plain functions, as well as
+      nodes which are given to their bodies via ``node_key``, are run on
+      executor threads, their calls of ``node.receive`` and ``node.send``
+      are passed to the event loop.
+
+    At the stop signal all tasks are cancelled immediately, there is no
+    polling of the signal.
+
+    Parameters
+    ----------
+    runtime : DeltaPySimulator
+        The simulator that owns the queues and the stop signal.
+
+    Attributes
+    ----------
+    tasks : typing.Dict[str, PythonNode]
+        Nodes to be run as tasks, by their full names.
+    loop : asyncio.AbstractEventLoop
+        The event loop, it exists only while the scheduler is running.
+    """
+
+    is_async = True
+
+    def __init__(self, runtime: DeltaPySimulator):
+        self.runtime = runtime
+        self.log = runtime.log
+        self.tasks: typing.Dict[str, PythonNode] = {}
+        self.loop: asyncio.AbstractEventLoop = None
+
+        self._executor: ThreadPoolExecutor = None
+        self._sig_stop: asyncio.Event = None
+        self._exc: typing.Optional[BaseException] = None
+
+        # protects submission of coroutines from executor threads
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def add_node(self, node: PythonNode):
+        """Register a node with a running body."""
+        self.tasks[node.full_name] = node
+
+    @staticmethod
+    def _on_executor(node: PythonNode) -> bool:
+        """The node calls ``receive`` and ``send`` synchronously."""
+        if isinstance(node.body, PyInteractiveBody):
+            return not node.body.is_async
+        return node.node_key is not None
+
+    def dispatch(self, node: PythonNode, coro: typing.Coroutine):
+        """Run ``coro``, which receives or sends messages of ``node``.
+
+        For nodes running on the event loop it is returned to be awaited,
+        otherwise it is passed to the event loop and its result is waited
+        for.
+        """
+        if node._async_body:
+            return coro
+
+        with self._lock:
+            if self._closed:
+                coro.close()
+                sys.exit()
+            future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+        try:
+            return future.result()
+        except CancelledError:
+            sys.exit()
+
+    def wait_until(self,
+                   node: PythonNode,
+                   condition: typing.Callable[[], bool]):
+        """Constant nodes use their queues before the event loop is started,
+        they never have to wait.
+        """
+        if not condition():
+            raise RuntimeError(
+                f"Node {node.full_name} would block the asyncio scheduler "
+                "outside of the event loop."
+            )
+
+    async def evaluate(self,
+                       node: PythonNode,
+                       values: typing.Dict[str, typing.Any]):
+        """Evaluate the function or method body of ``node``."""
+        if getattr(node.body, "blocking", False):
+            return await self.loop.run_in_executor(
+                self._executor, functools.partial(node.body.eval, **values)
+            )
+        else:
+            return node.body.eval(**values)
+
+    def stop(self):
+        """Wake up the event loop at the stop signal, can be called from
+        any thread.
+        """
+        with self._lock:
+            if self.loop is not None and not self._closed:
+                self.loop.call_soon_threadsafe(self._sig_stop.set)
+
+    async def _run_node(self, node: PythonNode):
+        try:
+            if self._on_executor(node):
+                await self.loop.run_in_executor(self._executor,
+                                                node.thread_worker,
+                                                self.runtime)
+            elif isinstance(node.body, PyInteractiveBody):
+                node.log.debug(f"Running... {node}")
+                await node.body.eval(node)
+            else:
+                while True:
+                    await node.arun_step()
+
+        except SystemExit:
+            # silent exit of this node only
+            pass
+
+        except Exception as exc:
+            # DeltaRuntimeExit or an error, re-raised by the scheduler's
+            # thread after the shutdown
+            if self._exc is None:
+                self._exc = exc
+            self._sig_stop.set()
+
+    async def _main(self):
+        for qu in self.runtime.all_queues():
+            if isinstance(qu, AsyncDeltaQueue):
+                qu.bind()
+
+        # wait until either the stop signal or all nodes have finished
+        finished = asyncio.gather(
+            *(self._run_node(node) for node in self.tasks.values())
+        )
+        stopped = asyncio.ensure_future(self._sig_stop.wait())
+        await asyncio.wait([finished, stopped],
+                           return_when=asyncio.FIRST_COMPLETED)
+        if finished.done():
+            self.log.info("All nodes have finished. Stopping.")
+
+        self.runtime._stop_workers()
+        with self._lock:
+            self._closed = True
+
+        # coroutines submitted by executor threads become tasks now
+        await asyncio.sleep(0)
+
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks()
+                   if task is not current]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, finished, return_exceptions=True)
+
+    def run(self):
+        """Main loop, it should be started on its own thread."""
+        n_executor = sum(self._on_executor(node)
+                         or getattr(node.body, "blocking", False)
+                         for node in self.tasks.values())
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(n_executor, 1),
+            thread_name_prefix="Executor"
+        )
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            with self._lock:
+                self.loop = loop
+                self._sig_stop = asyncio.Event()
+                if self.runtime.sig_stop.is_set():
+                    self._sig_stop.set()
+
+            loop.run_until_complete(self._main())
+        finally:
+            self._executor.shutdown(wait=True)
+            loop.close()
+            self.loop = None
+
+        if self._exc is not None:
+            raise self._exc
@@ -0,0 +1,306 @@
+import functools
+from queue import Full
+from time import perf_counter
+import typing
+
+from deltalanguage.wiring import PyInteractiveBody, PythonNode
+from deltalanguage._utils import QueueMessage
+
+from ._queues import DeltaQueue, Flusher
+
+
+class NodeMetrics:
+    """Counters of the activity of a running node.
+
+    The counters are updated only by the node itself, other threads can
+    read them at any time.
+
+    Times are measured only for one in ``sampling`` steps of nodes with
+    function and method bodies, or for one in ``sampling`` calls of ``get``
+    and ``put`` of nodes with interactive bodies, and are multiplied by
+    ``sampling``.
+
+    Parameters
+    ----------
+    sampling : int
+        Sampling interval of the time measurements.
+    per_call : bool
+        Sample each call of ``get`` and ``put`` instead of each step.
+
+    Attributes
+    ----------
+    messages_in : int
+        Number of messages received.
+    messages_out : int
+        Number of messages sent.
+    full_retries : int
+        Number of times a ``put`` gave up because the queue was full,
+        after which the node checks the stop signal and retries.
+    time_get : float
+        Time blocked on ``get`` (in seconds).
+    time_put : float
+        Time blocked on ``put`` (in seconds).
+    """
+
+    __slots__ = ("messages_in", "messages_out", "full_retries",
+                 "time_get", "time_put", "_active", "_started", "_weight",
+                 "_sampling", "_per_call", "_calls")
+
+    def __init__(self, sampling: int = 1, per_call: bool = False):
+        self.messages_in = 0
+        self.messages_out = 0
+        self.full_retries = 0
+        self.time_get = 0.0
+        self.time_put = 0.0
+        # time spent running and the start of the current measured run
+        self._active = 0.0
+        self._started: typing.Optional[float] = None
+        # multiplier of the current time measurements, 0 if not measured
+        self._weight = 0
+        self._sampling = sampling
+        self._per_call = per_call
+        self._calls = 0
+
+    def _sample(self) -> int:
+        """Weight of the next measurement, 0 if it is skipped."""
+        self._calls += 1
+        if self._calls % self._sampling:
+            return 0
+        return self._sampling
+
+    def call_weight(self) -> int:
+        """Weight of the measurement of a call of ``get`` or ``put``."""
+        return self._sample() if self._per_call else self._weight
+
+    def start(self, weight: int = None):
+        """Start measuring a run of the node, either a step or the whole
+        life of an interactive node.
+        """
+        self._weight = self._sample() if weight is None else weight
+        if self._weight:
+            self._started = perf_counter()
+
+    def stop(self):
+        if self._weight:
+            self._active += self._weight * (perf_counter() - self._started)
+            self._started = None
+        self._weight = 0
+
+    @property
+    def time_body(self) -> float:
+        """Time running, except for the time blocked on ``get`` and
+        ``put`` (in seconds).
+        """
+        active = self._active
+        started, weight = self._started, self._weight
+        if started is not None:
+            active += weight * (perf_counter() - started)
+        return max(0.0, active - self.time_get - self.time_put)
+
+    def as_dict(self) -> typing.Dict[str, typing.Union[int, float]]:
+        return {"messages_in": self.messages_in,
+                "messages_out": self.messages_out,
+                "time_body": self.time_body,
+                "time_get": self.time_get,
+                "time_put": self.time_put,
+                "full_retries": self.full_retries}
+
+
+class QueueMetrics:
+    """High-water mark of a queue, updated by the sending node."""
+
+    __slots__ = ("high_water_mark",)
+
+    def __init__(self):
+        self.high_water_mark = 0
+
+
+def _count(item: QueueMessage, many: bool = False) -> int:
+    """Number of messages in an item of a queue."""
+    if item.msg is None or type(item.msg) is Flusher:
+        return 0
+    return len(item.msg) if many else 1
+
+
+class MeteredQueue:
+    """View of a queue for one of the nodes it connects, which updates
+    the counters of the node and of the queue.
+
+    All the other attributes are the ones of the queue.
+
+    Parameters
+    ----------
+    queue : DeltaQueue
+        The queue.
+    node_metrics : NodeMetrics
+        Counters of the node.
+    queue_metrics : QueueMetrics
+        Counters of the queue if this is the sending node.
+    """
+
+    def __init__(self,
+                 queue: DeltaQueue,
+                 node_metrics: NodeMetrics,
+                 queue_metrics: QueueMetrics = None):
+        self._queue = queue
+        self._node = node_metrics
+        self._metrics = queue_metrics
+
+    def __getattr__(self, item):
+        return getattr(self._queue, item)
+
+    def _timed_get(self, get: typing.Callable, many: bool, *args, **kwargs):
+        weight = self._node.call_weight()
+        if weight:
+            start = perf_counter()
+            try:
+                item = get(*args, **kwargs)
+            finally:
+                self._node.time_get += weight * (perf_counter() - start)
+        else:
+            item = get(*args, **kwargs)
+        self._node.messages_in += _count(item, many)
+        return item
+
+    def get(self, *args, **kwargs) -> QueueMessage:
+        return self._timed_get(self._queue.get, False, *args, **kwargs)
+
+    def get_many(self, *args, **kwargs) -> QueueMessage:
+        return self._timed_get(self._queue.get_many, True, *args, **kwargs)
+
+    def _timed_put(self, put: typing.Callable, item: QueueMessage,
+                   many: bool, *args, **kwargs):
+        weight = self._node.call_weight()
+        start = perf_counter() if weight else None
+        try:
+            put(item, *args, **kwargs)
+        except Full:
+            self._node.full_retries += 1
+            raise
+        finally:
+            if weight:
+                self._node.time_put += weight * (perf_counter() - start)
+        self._sent(item, many)
+
+    def _sent(self, item: QueueMessage, many: bool):
+        self._node.messages_out += _count(item, many)
+        if self._metrics is not None:
+            depth = self._queue.qsize()
+            if depth > self._metrics.high_water_mark:
+                self._metrics.high_water_mark = depth
+
+    def put(self, item: QueueMessage, *args, **kwargs):
+        self._timed_put(self._queue.put, item, False, *args, **kwargs)
+
+    def put_many(self, item: QueueMessage, *args, **kwargs):
+        self._timed_put(self._queue.put_many, item, True, *args, **kwargs)
+
+    async def aget(self) -> QueueMessage:
+        weight = self._node.call_weight()
+        start = perf_counter()
+        item = await self._queue.aget()
+        if weight:
+            self._node.time_get += weight * (perf_counter() - start)
+        self._node.messages_in += _count(item)
+        return item
+
+    async def aget_many(self, *args, **kwargs) -> QueueMessage:
+        weight = self._node.call_weight()
+        start = perf_counter()
+        item = await self._queue.aget_many(*args, **kwargs)
+        if weight:
+            self._node.time_get += weight * (perf_counter() - start)
+        self._node.messages_in += _count(item, True)
+        return item
+
+    async def aput(self, item: QueueMessage):
+        weight = self._node.call_weight()
+        start = perf_counter()
+        await self._queue.aput(item)
+        if weight:
+            self._node.time_put += weight * (perf_counter() - start)
+        self._sent(item, False)
+
+
+_MEASURED = ("thread_worker", "run_step", "arun_step")
+
+
+def instrument(node: PythonNode,
+               sampling: int,
+               queue_metrics: typing.Dict[str, QueueMetrics]) -> NodeMetrics:
+    """Replace the queues of the node by :py:class:`MeteredQueue` and
+    measure its steps, only the instance of the node is modified.
+
+    Parameters
+    ----------
+    node : PythonNode
+        Node with its communications set.
+    sampling : int
+        Sampling interval of the time measurements.
+    queue_metrics : typing.Dict[str, QueueMetrics]
+        Counters of the queues by the names of their out ports, the ones of
+        the out queues of the node are added.
+
+    Returns
+    -------
+    NodeMetrics
+        Counters of the node.
+    """
+    interactive = isinstance(node.body, PyInteractiveBody)
+    metrics = NodeMetrics(sampling, per_call=interactive)
+
+    node.in_queues = {name: MeteredQueue(q, metrics)
+                      for name, q in node.in_queues.items()}
+    out_queues = {}
+    for name, q in node.out_queues.items():
+        queue_metrics[str(q._src.name)] = QueueMetrics()
+        out_queues[name] = MeteredQueue(q, metrics,
+                                        queue_metrics[str(q._src.name)])
+    node.out_queues = out_queues
+    node._compile_plan()
+
+    # the methods of the class, not the ones measured by another simulator
+    uninstrument(node)
+    worker = node.thread_worker
+    step, astep = node.run_step, node.arun_step
+
+    if interactive:
+        @functools.wraps(worker)
+        def thread_worker(runtime):
+            metrics.start(weight=1)
+            try:
+                worker(runtime)
+            finally:
+                metrics.stop()
+
+        node.thread_worker = thread_worker
+
+    else:
+        @functools.wraps(step)
+        def run_step():
+            metrics.start()
+            try:
+                step()
+            finally:
+                metrics.stop()
+
+        @functools.wraps(astep)
+        async def arun_step():
+            metrics.start()
+            try:
+                await astep()
+            finally:
+                metrics.stop()
+
+        node.run_step = run_step
+        node.arun_step = arun_step
+
+    return metrics
+
+
+def uninstrument(node: PythonNode):
+    """Stop measuring the steps of a node instrumented by
+    :py:func:`instrument` for a previous simulation.
+    """
+    for name in _MEASURED:
+        vars(node).pop(name, None)
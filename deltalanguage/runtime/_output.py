@@ -1,25 +1,34 @@
 from __future__ import annotations
+import contextlib
 import glob
+import mmap
 import os
 import tempfile
-from typing import TYPE_CHECKING, List, Tuple, Union
+from typing import TYPE_CHECKING, Iterator, List, Tuple, Union
 import zipfile
 
-import capnp
-
-# use the import magic from capnp to get the schema
-import deltalanguage.data_types.dotdf_capnp \
-    as dotdf_capnp  # pylint: disable=E0401, disable=E0611
+from deltalanguage.wiring import BodyCache
 
 if TYPE_CHECKING:
+    import capnp
     from deltalanguage.wiring import DeltaGraph
 
 
+def _dotdf_capnp():
+    """The ``capnp`` schema of .df files, loaded on first use as loading
+    ``capnp`` takes time.
+    """
+    import deltalanguage.data_types.dotdf_capnp \
+        as dotdf_capnp  # pylint: disable=E0401, disable=E0611
+    return dotdf_capnp
+
+
 def serialise_graph(
     graph: DeltaGraph,
     name: str = None,
     files: List[str] = None,
-    requirements: List[str] = None
+    requirements: List[str] = None,
+    body_cache: str = None
 ) -> Tuple[bytes, capnp.lib.capnp._DynamicStructBuilder]:
     """Converts a complete representation of the Deltaflow program stored as
     a :py:class:`DeltaGraph<deltalanguage.wiring.DeltaGraph>` to bytecode.
@@ -39,6 +48,10 @@ def serialise_graph(
         Additional Python packages required to execute the program. These
         packages should be freely available on PyPI and provided using their
         pip installation identifiers.
+    body_cache : str
+        Directory of an on-disk cache of the serialisations of the bodies,
+        shared between exports, so that only the bodies that changed are
+        serialised again.
 
     Returns
     -------
@@ -50,7 +63,7 @@ def serialise_graph(
     files = files if files is not None else []
     requirements_s = set(requirements) if requirements is not None else set()
 
-    schema = dotdf_capnp.Program.new_message()
+    schema = _dotdf_capnp().Program.new_message()
     if name:
         schema.name = name
     elif graph.name:
@@ -78,11 +91,23 @@ def serialise_graph(
     nodes = schema.init("nodes", len(graph.nodes))
     wiring = schema.init_resizable_list("graph")
 
+    # bodies are deduplicated by their serialisation
+    body_index = {}
+    cache = BodyCache(body_cache) if body_cache is not None else None
     for graph_node, capnp_node in zip(graph.nodes, nodes):
-        graph_node.capnp(capnp_node, bodies)
+        graph_node.capnp(capnp_node, bodies, body_index, cache)
+
+    # positions of the nodes and their in ports, the first one wins
+    node_index = {}
+    for i, graph_node in enumerate(graph.nodes):
+        if graph_node.full_name not in node_index:
+            in_ports = {}
+            for j, in_port in enumerate(graph_node.in_ports):
+                in_ports.setdefault(in_port.index, j)
+            node_index[graph_node.full_name] = (i, in_ports)
 
     for graph_node in graph.nodes:
-        graph_node.capnp_wiring(nodes, wiring)
+        graph_node.capnp_wiring(nodes, wiring, node_index)
 
     # resizable lists initialise only here
     bodies.finish()
@@ -107,4 +132,50 @@ def deserialise_graph(
     Union[capnp._DynamicStructReader, capnp._DynamicStructBuilder]
         Deltaflow graph.
     """
-    return dotdf_capnp.Program.from_bytes(data)
+    return _dotdf_capnp().Program.from_bytes(data)
+
+
+@contextlib.contextmanager
+def deserialise_graph_file(
+    path: str
+) -> Iterator[capnp._DynamicStructReader]:
+    """Read a .df file without copying it into memory.
+
+    The file is memory-mapped and the Deltaflow program is read in place,
+    only the parts of it that are accessed are loaded. The program is
+    valid only within the context:
+
+    .. code-block:: python
+
+        with deserialise_graph_file("program.df") as program:
+            graph = DeltaGraph.from_capnp(program)
+
+    Parameters
+    ----------
+    path : str
+        Path of the .df file.
+
+    Yields
+    ------
+    capnp._DynamicStructReader
+        Deltaflow graph, which can be passed to
+        :py:meth:`DeltaGraph.from_capnp
+        <deltalanguage.wiring.DeltaGraph.from_capnp>`.
+    """
+    with open(path, "rb") as df_file, \
+            mmap.mmap(df_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        # the file is trusted, thus programs of any size can be read
+        program = _dotdf_capnp().Program.from_bytes(
+            buffer,
+            traversal_limit_in_words=2**63 - 1
+        )
+        # newer versions of pycapnp return a context manager
+        if hasattr(program, "__enter__"):
+            with program as reader:
+                yield reader
+        else:
+            try:
+                yield program
+            finally:
+                # the reader refers to the mapping, which is closed next
+                del program
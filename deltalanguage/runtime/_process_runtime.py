@@ -0,0 +1,531 @@
+import io
+import logging
+import multiprocessing
+import os
+import traceback
+import typing
+
+import dill
+
+from deltalanguage.data_types import DeltaTypeError
+from deltalanguage.wiring import (Body,
+                                  DeltaGraph,
+                                  Latency,
+                                  OutPort,
+                                  PyConstBody,
+                                  PythonBody,
+                                  PythonNode,
+                                  RealNode)
+from deltalanguage.logging import make_logger
+
+from ._queues import DeltaQueue
+from ._ring_buffer import RingBuffer, SharedMemoryQueue
+from ._runtime import DeltaPySimulator
+
+
+def _latency_cost(latency: typing.Optional[Latency],
+                  clock_cost: int) -> int:
+    """Estimated cost of a body in nanoseconds."""
+    if latency is None:
+        return 1
+    if latency._time is not None:
+        return max(latency._time, 1)
+    if latency._clocks is not None:
+        return max(latency._clocks * clock_cost, 1)
+    return 1
+
+
+def _wire_is_packable(out_port: OutPort) -> bool:
+    try:
+        out_port.port_type.codec
+    except NotImplementedError:
+        return False
+    return True
+
+
+def partition_graph(graph: DeltaGraph,
+                    processes: int,
+                    placement: typing.Dict[str, int] = None,
+                    clock_cost: int = 1000) -> typing.Dict[str, int]:
+    """Split the nodes of a graph into groups, each to be run by its own
+    process.
+
+    Nodes connected by a wire whose type does not have a fixed size are
+    grouped first, as such messages cannot be placed on shared memory.
+    The groups that contain nodes from ``placement`` are placed as
+    requested, the others are balanced across the processes by their
+    estimated cost, i.e. the sum of the latencies of their bodies
+    (largest first, each to the least loaded process).
+
+    Constant nodes are not grouped, as their results are cached in the
+    receiving process: each process running one of their destinations
+    runs them as well, see :py:func:`_const_replicas`. They are given the
+    index of their first destination and cannot be placed.
+
+    Parameters
+    ----------
+    graph : DeltaGraph
+        The graph to split.
+    processes : int
+        The maximum number of processes.
+    placement : typing.Dict[str, int]
+        Process index per node given by its full name or its name.
+    clock_cost : int
+        Estimated cost of a clock cycle in nanoseconds, used for
+        latencies given in clocks.
+
+    Returns
+    -------
+    typing.Dict[str, int]
+        Process index per full name of each node, the indices are
+        contiguous from ``0``.
+    """
+    placement = placement if placement is not None else {}
+    if processes < 1:
+        raise ValueError("At least one process is required")
+
+    # union-find of nodes that cannot be separated
+    parent = {node.full_name: node.full_name for node in graph.nodes}
+
+    def find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    consts = {node.full_name: node for node in graph.nodes
+              if isinstance(node.body, PyConstBody)}
+    for node in graph.nodes:
+        if node.full_name in consts:
+            continue
+        for out_port in node.out_ports:
+            if not _wire_is_packable(out_port):
+                parent[find(node.full_name)] = find(
+                    out_port.destination.node.full_name)
+
+    groups: typing.Dict[str, typing.List[RealNode]] = {}
+    for node in graph.nodes:
+        if node.full_name not in consts:
+            groups.setdefault(find(node.full_name), []).append(node)
+    for node in consts.values():
+        for key in (node.full_name, node.name):
+            if key in placement:
+                raise ValueError(
+                    f"Constant node {node.full_name} is run by the "
+                    "processes of its destinations, it cannot be placed"
+                )
+
+    # requested placement
+    assigned: typing.Dict[str, int] = {}
+    for root, nodes in groups.items():
+        for node in nodes:
+            for key in (node.full_name, node.name):
+                if key not in placement:
+                    continue
+                if placement[key] not in range(processes):
+                    raise ValueError(
+                        f"Node {node.full_name} is placed on process "
+                        f"{placement[key]}, but there are only "
+                        f"{processes} processes"
+                    )
+                if assigned.setdefault(root, placement[key]) != placement[key]:
+                    raise ValueError(
+                        f"Node {node.full_name} cannot be separated from "
+                        f"the nodes {[n.full_name for n in nodes]}"
+                    )
+
+    # balancing of the rest
+    load = [0] * processes
+    costs = {root: sum(_latency_cost(node.body.latency, clock_cost)
+                       for node in nodes)
+             for root, nodes in groups.items()}
+    for root, index in assigned.items():
+        load[index] += costs[root]
+    for root in sorted((root for root in groups if root not in assigned),
+                       key=lambda root: -costs[root]):
+        assigned[root] = load.index(min(load))
+        load[assigned[root]] += costs[root]
+
+    # drop empty processes
+    used = sorted(set(assigned.values()))
+    partitions = {node.full_name: used.index(assigned[root])
+                  for root, nodes in groups.items()
+                  for node in nodes}
+
+    def const_index(node):
+        for out_port in node.out_ports:
+            dest = out_port.destination.node
+            if dest.full_name in consts:
+                return const_index(dest)
+            return partitions[dest.full_name]
+        return 0
+
+    for node in consts.values():
+        partitions[node.full_name] = const_index(node)
+    return partitions
+
+
+def _const_replicas(
+    graph: DeltaGraph,
+    partitions: typing.Dict[str, int]
+) -> typing.Dict[str, typing.Set[int]]:
+    """Processes running each constant node: the ones running its
+    destinations, or the one it is given by :py:func:`partition_graph` if
+    it only sends to other constant nodes, which evaluate it themselves.
+    """
+    replicas = {}
+    for node in graph.nodes:
+        if isinstance(node.body, PyConstBody):
+            replicas[node.full_name] = {
+                partitions[out_port.destination.node.full_name]
+                for out_port in node.out_ports
+                if not isinstance(out_port.destination.node.body,
+                                  PyConstBody)
+            } or {partitions[node.full_name]}
+    return replicas
+
+
+class _RemoteBody(Body):
+    """Stands for the body of a node run by another process."""
+
+    @property
+    def language(self) -> str:
+        return "Remote"
+
+    @property
+    def as_serialised(self) -> str:
+        raise NotImplementedError("The body is run by another process")
+
+
+class _GraphPickler(dill.Pickler):
+    """Pickles a graph without the bodies of its nodes, they are referred to
+    by their index in ``bodies``.
+    """
+
+    def __init__(self, file, bodies: typing.List[Body]):
+        super().__init__(file, recurse=True)
+        self._index = {id(body): i for i, body in enumerate(bodies)}
+
+    def persistent_id(self, obj):
+        if isinstance(obj, Body):
+            return self._index.get(id(obj), -1)
+        return None
+
+
+class _GraphUnpickler(dill.Unpickler):
+    """Unpickles a graph pickled by :py:class:`_GraphPickler`, only the
+    provided bodies are deserialised, the rest are replaced by
+    :py:class:`_RemoteBody`.
+    """
+
+    def __init__(self, file, bodies: typing.Dict[int, bytes]):
+        super().__init__(file)
+        self._bodies = bodies
+
+    def persistent_load(self, pid):
+        if pid in self._bodies:
+            return dill.loads(self._bodies[pid])
+        return _RemoteBody()
+
+
+def _run_partition(index: int,
+                   skeleton: bytes,
+                   bodies: typing.Dict[int, bytes],
+                   partitions: typing.Dict[str, int],
+                   rings: typing.Dict[str, RingBuffer],
+                   sig_stop,
+                   errors,
+                   kwargs: typing.Dict[str, typing.Any]):
+    """Entry point of the process running a partition of the graph."""
+    try:
+        graph = _GraphUnpickler(io.BytesIO(skeleton), bodies).load()
+        _PartitionSimulator(graph, index, partitions, rings, sig_stop,
+                            **kwargs).run()
+    except BaseException as exc:
+        errors.put((index, "".join(traceback.format_exception(
+            type(exc), exc, exc.__traceback__))))
+        sig_stop.set()
+    finally:
+        for ring in rings.values():
+            ring.release()
+
+
+class _PartitionSimulator(DeltaPySimulator):
+    """Runs the nodes of a single partition of the graph.
+
+    Wires to and from the other partitions use :py:class:`SharedMemoryQueue`
+    attached to the ring buffers created by
+    :py:class:`DeltaProcessSimulator`, the stop signal is shared by all
+    processes.
+    """
+
+    def __init__(self,
+                 graph: DeltaGraph,
+                 index: int,
+                 partitions: typing.Dict[str, int],
+                 rings: typing.Dict[str, RingBuffer],
+                 sig_stop,
+                 **kwargs):
+        self.index = index
+        self.partitions = partitions
+        self.replicas = _const_replicas(graph, partitions)
+        self.rings = rings
+        super().__init__(graph, **kwargs)
+
+        self.sig_stop = sig_stop
+        for node in self._own_nodes():
+            node.set_communications(self)
+
+    def _runs(self, node: RealNode) -> bool:
+        """Whether the node is run by this partition, constant nodes are
+        run by several ones.
+        """
+        if node.full_name in self.replicas:
+            return self.index in self.replicas[node.full_name]
+        return self.partitions[node.full_name] == self.index
+
+    def _own_nodes(self) -> typing.List[RealNode]:
+        """Nodes of this partition."""
+        return [node for node in self.graph.nodes if self._runs(node)]
+
+    def _make_queue(self, out_port: OutPort) -> typing.Union[DeltaQueue, None]:
+        if out_port.name in self.rings:
+            return SharedMemoryQueue(out_port,
+                                     queue_interval=self.queue_interval,
+                                     ring=self.rings[out_port.name])
+        return super()._make_queue(out_port)
+
+    def _create_io_queues(self, node: PythonNode):
+        if node.full_name not in self.partitions:
+            return
+
+        if self._runs(node):
+            super()._create_io_queues(node)
+        else:
+            # only the queues from the other partitions are needed
+            for out_port in node.out_ports:
+                dest = out_port.destination.node.full_name
+                if self.partitions[dest] == self.index:
+                    q = self._make_queue(out_port)
+                    self.in_queues[dest][out_port.destination.index] = q
+
+    def _stop_workers(self):
+        # the stop signal can be set by another process, thus the local
+        # queues are flushed anyway
+        self.sig_stop.set()
+        for qu in self.all_queues():
+            qu.flush()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+
+
+class DeltaProcessSimulator:
+    """Python runtime simulator that runs
+    :py:class:`DeltaGraph<deltalanguage.wiring.DeltaGraph>` on several
+    processes, so that nodes with heavy Python bodies are not serialised by
+    the GIL.
+
+    The nodes are split into partitions by :py:func:`partition_graph`,
+    either as requested via ``placement`` or by balancing the latencies of
+    their bodies. Each partition is run by its own process exactly as
+    :py:class:`DeltaPySimulator` would run it.
+    Wires within a partition use :py:class:`DeltaQueue`, wires between
+    partitions use :py:class:`SharedMemoryQueue`, which pass the packed
+    bytes of messages.
+
+    The bodies are shipped to the processes via their serialisation,
+    thus they have to be serialisable by ``dill``.
+    Note that any state kept by the bodies, e.g. by
+    :py:class:`StateSaver<deltalanguage.lib.StateSaver>`, stays in the
+    process that ran them.
+
+    Parameters
+    ----------
+    graph : DeltaGraph
+        The graph which will be executed.
+    processes : int
+        Maximum number of processes, by default the number of CPUs.
+    placement : typing.Dict[str, int]
+        Process index per node given by its full name or its name, the rest
+        of the nodes are placed automatically.
+    lvl : int
+        The level at which logs are displayed.
+    msg_lvl : int
+        The level at which logs from messages between nodes are displayed.
+    queue_size : int
+        Size of all queues, including the ring buffers between partitions.
+    queue_interval : float
+        Interval (in seconds) at which blocked nodes check the stop signal.
+    context : str
+        Start method of the processes, see ``multiprocessing.get_context``.
+
+
+    .. warning::
+        Messages between partitions are always validated and their types
+        must have a fixed size, nodes connected by other wires are placed
+        in the same partition.
+
+    Examples
+    --------
+    The bodies are defined at the module level of a script, so that they
+    can be serialised:
+
+    .. code-block:: python
+
+        import deltalanguage as dl
+
+        @dl.DeltaBlock(allow_const=False)
+        def double(a: int) -> int:
+            return 2 * a
+
+        @dl.DeltaBlock(allow_const=False)
+        def show(a: int) -> dl.Void:
+            print(a)
+            raise dl.DeltaRuntimeExit
+
+        if __name__ == "__main__":
+            with dl.DeltaGraph() as graph:
+                show(double(double(5)))
+
+            dl.DeltaProcessSimulator(graph, processes=2).run()
+    """
+
+    def __init__(self,
+                 graph: DeltaGraph,
+                 processes: int = None,
+                 placement: typing.Dict[str, int] = None,
+                 lvl: int = logging.ERROR,
+                 msg_lvl: int = logging.ERROR,
+                 queue_size: int = 16,
+                 queue_interval: float = 1.0,
+                 context: str = None):
+        self.log = make_logger(lvl, "DeltaProcessSimulator")
+        self.graph = graph
+        self.graph.check()
+        self.queue_size = queue_size
+        self._kwargs = {"lvl": lvl,
+                        "msg_lvl": msg_lvl,
+                        "queue_size": queue_size,
+                        "queue_interval": queue_interval}
+        self._mp = multiprocessing.get_context(context)
+
+        self.partitions = partition_graph(
+            graph,
+            processes if processes is not None else os.cpu_count(),
+            placement
+        )
+        self.log.info(f"Nodes per process: {self.partitions}")
+
+        self.sig_stop = self._mp.Event()
+        self.rings: typing.Dict[str, RingBuffer] = {}
+        self.processes: typing.List[multiprocessing.Process] = []
+
+    def _serialise(
+        self
+    ) -> typing.Tuple[bytes, typing.List[typing.Dict[int, bytes]]]:
+        """Pickle the graph without bodies, and serialise the bodies of
+        each partition.
+        """
+        bodies = [node.body for node in self.graph.nodes]
+        file = io.BytesIO()
+        _GraphPickler(file, bodies).dump(self.graph)
+
+        replicas = _const_replicas(self.graph, self.partitions)
+        per_partition = [{} for _ in range(max(self.partitions.values()) + 1)]
+        for i, node in enumerate(self.graph.nodes):
+            try:
+                # the python serialisation is used for all bodies
+                serialised = PythonBody._dill_serialise(node.body)
+            except Exception as exc:
+                raise RuntimeError(
+                    f"Body of node {node.full_name} cannot be serialised"
+                ) from exc
+            for index in replicas.get(node.full_name,
+                                      (self.partitions[node.full_name],)):
+                per_partition[index][i] = serialised
+
+        return file.getvalue(), per_partition
+
+    def _make_rings(self):
+        """Create the ring buffers for the wires between partitions."""
+        for node in self.graph.nodes:
+            if isinstance(node.body, PyConstBody):
+                # run by the partitions of their destinations
+                continue
+            for out_port in node.out_ports:
+                dest = out_port.destination
+                if (self.partitions[node.full_name]
+                        == self.partitions[dest.node.full_name]):
+                    continue
+
+                if dest.in_port_size > 0 and self.queue_size > 0:
+                    maxsize = min(dest.in_port_size, self.queue_size)
+                else:
+                    maxsize = max(dest.in_port_size, self.queue_size)
+                try:
+                    self.rings[out_port.name] = SharedMemoryQueue.make_ring(
+                        out_port, maxsize)
+                except DeltaTypeError as exc:
+                    raise RuntimeError(
+                        f"Wire from {out_port.name} cannot cross processes"
+                    ) from exc
+
+    def start(self):
+        """Serialise the graph and start a process for each partition."""
+        if self.processes:
+            raise RuntimeError('DeltaProcessSimulator is already running')
+
+        skeleton, bodies = self._serialise()
+        self._make_rings()
+        self.errors = self._mp.Queue()
+
+        for index, partition_bodies in enumerate(bodies):
+            process = self._mp.Process(
+                target=_run_partition,
+                args=(index, skeleton, partition_bodies, self.partitions,
+                      self.rings, self.sig_stop, self.errors, self._kwargs),
+                name=f"Process_{index}"
+            )
+            process.start()
+            self.processes.append(process)
+
+        self.log.info(f"Total number of processes = {len(self.processes)}")
+
+    def run(self, timeout=None):
+        """Run the simulation of the graph.
+
+        If ``timeout`` is ``None`` runs continually until the graph calls
+        :py:class:`DeltaRuntimeExit` or an error occurs.
+        Otherwise it should be a floating point number specifying a timeout
+        for the simulation in seconds.
+        """
+        self.start()
+        self.sig_stop.wait(timeout=timeout)
+        self.stop()
+
+    def stop(self):
+        """Signal all processes to stop, wait for them to finish and release
+        the shared memory.
+        """
+        self.sig_stop.set()
+        for ring in self.rings.values():
+            ring.close()
+
+        for process in self.processes:
+            process.join()
+
+        errors = []
+        while not self.errors.empty():
+            errors.append(self.errors.get())
+
+        for ring in self.rings.values():
+            ring.release()
+        self.rings = {}
+        self.processes = []
+
+        if errors:
+            raise RuntimeError(
+                "At least one exception is raised in a child process:\n"
+                + "\n".join(f"process {index}:\n{tb}"
+                            for index, tb in sorted(errors))
+            )
@@ -1,17 +1,162 @@
+import asyncio
 from copy import deepcopy
 import logging
 from queue import Empty, Full, Queue
-
+from time import monotonic
+import typing
+import warnings
+
+import attr
+import numpy as np
+
+from deltalanguage.data_types import (Bool,
+                                      Complex,
+                                      DeltaTypeError,
+                                      Float,
+                                      Int,
+                                      UInt)
 from deltalanguage.wiring import OutPort
 from deltalanguage.logging import make_logger
 from deltalanguage._utils import QueueMessage
 
+# types of which numpy arrays are converted to messages by ``tolist``, other
+# ones are converted by ``from_numpy_object``
+_NUMPY_SCALARS = (Bool, Int, UInt, Float, Complex)
+
 
 class Flusher:
     """Empty class is passed down queues to release a blockage."""
     pass
 
 
+class _Batch:
+    """Messages moved as a single item of :py:class:`DeltaQueue`."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: typing.Union[list, np.ndarray]):
+        self.values = values
+
+
+class ConstMutationWarning(UserWarning):
+    """Issued when a node attempts to modify a message received from a
+    :py:class:`ConstQueue`, which is shared by all its iterations.
+    """
+    pass
+
+
+def _mutated(obj: object):
+    msg = (f"Constant message {obj!r} is shared by all iterations of the "
+           "receiving node and cannot be modified, copy it in the body or "
+           "run the simulator with copy_on_read=True")
+    warnings.warn(msg, ConstMutationWarning, stacklevel=3)
+    raise TypeError(msg)
+
+
+class FrozenList(list):
+    """List that cannot be modified, used for constant messages of
+    :py:class:`Array<deltalanguage.data_types.Array>` type.
+
+    It compares equal to lists and is validated as a list.
+    """
+
+    def _mutate(self, *args, **kwargs):
+        _mutated(self)
+
+    append = extend = insert = pop = remove = clear = sort = reverse = \
+        __setitem__ = __delitem__ = __iadd__ = __imul__ = _mutate
+
+    def __reduce__(self):
+        # copies are regular lists
+        return (list, (list(self),))
+
+
+_frozen_records: typing.Dict[type, type] = {}
+
+
+def _frozen_record_class(cls: type) -> type:
+    """Subclass of an ``attrs`` class whose instances cannot be modified,
+    but compare equal to the instances of ``cls``.
+    """
+    frozen = _frozen_records.get(cls)
+    if frozen is not None:
+        return frozen
+
+    def __setattr__(self, name, value):
+        _mutated(self)
+
+    def __delattr__(self, name):
+        _mutated(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, cls):
+            return NotImplemented
+        return (attr.astuple(self, recurse=False)
+                == attr.astuple(other, recurse=False))
+
+    def __ne__(self, other):
+        eq = __eq__(self, other)
+        return eq if eq is NotImplemented else not eq
+
+    def __reduce__(self):
+        # copies are regular instances
+        return (_thaw_record, (cls, attr.asdict(self, recurse=False)))
+
+    frozen = type(cls.__name__, (cls,), {
+        "__slots__": (),
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "__setattr__": __setattr__,
+        "__delattr__": __delattr__,
+        "__eq__": __eq__,
+        "__ne__": __ne__,
+        "__hash__": None,
+        "__reduce__": __reduce__
+    })
+    _frozen_records[cls] = frozen
+    return frozen
+
+
+def _thaw_record(cls: type, values: typing.Dict[str, object]) -> object:
+    obj = object.__new__(cls)
+    for name, value in values.items():
+        object.__setattr__(obj, name, value)
+    return obj
+
+
+def freeze(val: object) -> object:
+    """Return an immutable equivalent of a message, so that it can be shared
+    by all receivers of a constant without copying.
+
+    - lists become :py:class:`FrozenList`, tuples are rebuilt from
+      frozen elements,
+    - ``numpy`` arrays become read-only views of a read-only copy,
+    - ``attrs`` instances are recreated as instances of a subclass which
+      cannot be modified, their fields are frozen as well,
+    - the rest of the objects are returned unchanged.
+    """
+    if isinstance(val, list):
+        return FrozenList(freeze(v) for v in val)
+
+    if isinstance(val, tuple):
+        return tuple(freeze(v) for v in val)
+
+    if isinstance(val, np.ndarray):
+        val = val.copy()
+        val.setflags(write=False)
+        # the flag of a view of a read-only array cannot be reset
+        return val.view()
+
+    if attr.has(type(val)):
+        frozen = object.__new__(_frozen_record_class(type(val)))
+        for field in attr.fields(type(val)):
+            object.__setattr__(frozen, field.name,
+                               freeze(getattr(val, field.name)))
+        return frozen
+
+    return val
+
+
 class DeltaQueue(Queue):
     """Queue class that communicate messages between nodes in
     :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`.
@@ -33,11 +178,39 @@ class DeltaQueue(Queue):
         this means that the Python GIL will be forced to run another node's
         thread once the queue is full, thus it will prevent blockage.
     queue_interval : float
-        When the simulation is called to stop, some of the queues might be
-        blocking nodes at ``put`` methods as they are full.
-        :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`
-        interrupts this at this periodicity (in seconds) and checks if
-        stopping is needed.
+        A ``put`` blocked on a full queue raises ``Full`` at this periodicity
+        (in seconds), so that the node can check if stopping is needed.
+        This is only a fallback, :py:meth:`flush` wakes all threads blocked
+        at ``put`` and ``get`` immediately.
+    validation : str
+        How messages are validated against the port type:
+
+        - ``"strict"`` - every message is packed and unpacked via the codec
+          of the data type, i.e.
+          :py:meth:`BaseDeltaType.pack_bytes
+          <deltalanguage.data_types.BaseDeltaType.pack_bytes>`.
+        - ``"sample"`` - the first ``validation_samples`` messages are
+          validated as in the strict mode, after that the queue behaves as
+          in the trusted mode.
+        - ``"trusted"`` - messages whose Python type is exactly the one
+          returned by ``as_python_type()`` of the port type are put on the
+          queue as they are, all other messages are validated.
+          Only immutable Python types (``bool``, ``int``, ``float``,
+          ``complex``, ``str``) are trusted, thus values of compound types
+          are always validated (and thus copied).
+    validation_samples : int
+        Number of messages validated in the ``"sample"`` mode.
+
+
+    .. warning::
+        Trusted messages are neither range checked nor converted to the
+        precision of the port type, e.g. an ``int`` larger than 32 bits can
+        be sent via an ``Int(Size(32))`` port.
+        Use the strict mode while developing a graph.
+
+    Several messages can be moved as a single item of the queue via
+    :py:meth:`put_many`, they are received either one by one via
+    :py:meth:`get` or as batches via :py:meth:`get_many`.
 
     Attributes
     ----------
@@ -47,12 +220,29 @@ class DeltaQueue(Queue):
         requires a message from this queue or it's optional.
         If ``False`` and nothing is sent down this queue, the caller will use
         ``Queue.get()`` with block and wait.
+    validated_count : int
+        Number of messages validated via the codec of the port type.
+    trusted_count : int
+        Number of messages put on the queue without validation.
+    batches : bool
+        ``True`` if batches are moved as single items via :py:meth:`put_many`.
+    constant : bool
+        ``True`` if the same message is received at every request, see
+        :py:class:`ConstQueue`.
     """
 
+    validation_modes = ("strict", "sample", "trusted")
+
+    batches = True
+
+    constant = False
+
     def __init__(self,
                  out_port: OutPort,
                  maxsize: int = 16,
-                 queue_interval: float = 1.0):
+                 queue_interval: float = 1.0,
+                 validation: str = "strict",
+                 validation_samples: int = 100):
         super().__init__(maxsize=maxsize)
         self._src = out_port
         self._log = make_logger(logging.WARNING,
@@ -62,17 +252,240 @@ class DeltaQueue(Queue):
 
         self._type = out_port.port_type
 
+        if validation not in self.validation_modes:
+            raise ValueError(f"Unknown validation mode '{validation}', "
+                             f"choose one of {self.validation_modes}")
+        self._trusted_type = None
+        if validation != "strict":
+            try:
+                py_type = self._type.as_python_type()
+            except NotImplementedError:
+                py_type = None
+            if py_type in (bool, int, float, complex, str):
+                self._trusted_type = py_type
+        if validation == "sample":
+            self._validation_samples = validation_samples
+        else:
+            self._validation_samples = 0
+
+        self.validated_count = 0
+        self.trusted_count = 0
+
+        # set by flush, wakes the threads waiting for the queue
+        self._stopped = False
+
+        # the rest of the batch that is being received, only accessed by
+        # the receiving node
+        self._pending: list = []
+        self._pending_pos = 0
+        self._pending_clk = 0
+
+    def empty(self) -> bool:
+        return self._pending_pos == len(self._pending) and Queue.empty(self)
+
+    def qsize(self) -> int:
+        return len(self._pending) - self._pending_pos + Queue.qsize(self)
+
     def get(self, block=True, timeout=None) -> QueueMessage:
         """If the queue is optional and empty return ``None``,
         otherwise return the item.
+
+        Messages of batches are returned one by one.
         """
+        if self._pending_pos < len(self._pending):
+            return QueueMessage(self._next_pending(1)[0],
+                                clk=self._pending_clk)
+
         if self.optional and self.empty():
             return QueueMessage(None, clk=0)
 
-        item = Queue.get(self, block=block, timeout=timeout)
+        item = self._get_item(block, timeout)
+
+        if type(item.msg) is _Batch:
+            self._set_pending(item)
+            return QueueMessage(self._next_pending(1)[0], clk=item.clk)
 
         return item
 
+    def get_many(self,
+                 max_n: int,
+                 block=True,
+                 timeout=None) -> QueueMessage:
+        """Get up to ``max_n`` messages, both batches and single ones.
+
+        Waits only if no message is available. If the queue is optional and
+        empty the list is empty.
+
+        Returns
+        -------
+        QueueMessage
+            The list of the messages with the latest clock among them.
+        """
+        values = []
+        clk = 0
+        while len(values) < max_n:
+            if self._pending_pos < len(self._pending):
+                values.extend(self._next_pending(max_n - len(values)))
+                clk = max(clk, self._pending_clk)
+                continue
+
+            if values or (self.optional and self.empty()):
+                # do not wait or pass the flusher together with messages
+                with self.mutex:
+                    if (not self.queue
+                            or type(self.queue[0].msg) is Flusher):
+                        break
+
+            item = self._get_item(block, timeout)
+            if type(item.msg) is _Batch:
+                self._set_pending(item)
+            elif type(item.msg) is Flusher:
+                return item
+            else:
+                values.append(item.msg)
+                clk = max(clk, item.clk)
+
+        return QueueMessage(values, clk=clk)
+
+    def _wait(self, condition: typing.Callable[[], bool],
+              ready: typing.Callable[[], bool],
+              timeout: typing.Optional[float]) -> bool:
+        """Wait on ``condition`` (holding its lock) until ``ready`` or until
+        the queue is stopped by :py:meth:`flush`.
+
+        Returns
+        -------
+        bool
+            ``False`` if the queue is stopped or the timeout expired before
+            ``ready``.
+        """
+        if timeout is None:
+            while not ready() and not self._stopped:
+                condition.wait()
+        else:
+            deadline = monotonic() + timeout
+            while not ready() and not self._stopped:
+                remaining = deadline - monotonic()
+                if remaining <= 0.0:
+                    break
+                condition.wait(remaining)
+        return ready()
+
+    def _get_item(self, block=True, timeout=None) -> QueueMessage:
+        """``Queue.get`` that returns a flusher instead of waiting once the
+        queue is stopped.
+        """
+        with self.not_empty:
+            if not self._wait(self.not_empty,
+                              lambda: self._qsize() > 0,
+                              timeout if block else 0.0):
+                if self._stopped:
+                    return QueueMessage(Flusher(), clk=-1)
+                raise Empty
+            item = self._get()
+            self.not_full.notify()
+            return item
+
+    def _put_item(self, item: QueueMessage, block=True, timeout=None):
+        """``Queue.put`` that raises ``Full`` instead of waiting once the
+        queue is stopped.
+        """
+        with self.not_full:
+            if self.maxsize > 0:
+                if not self._wait(self.not_full,
+                                  lambda: self._qsize() < self.maxsize,
+                                  timeout if block else 0.0):
+                    raise Full
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def _set_pending(self, item: QueueMessage):
+        values = item.msg.values
+        if isinstance(values, np.ndarray):
+            if (values.dtype.fields is None
+                    and isinstance(self._type, _NUMPY_SCALARS)):
+                values = values.tolist()
+            else:
+                values = [self._type.from_numpy_object(v) for v in values]
+        self._pending = values
+        self._pending_pos = 0
+        self._pending_clk = item.clk
+
+    def _next_pending(self, n: int) -> list:
+        start = self._pending_pos
+        self._pending_pos = min(start + n, len(self._pending))
+        return self._pending[start:self._pending_pos]
+
+    def _validate(self, msg: object) -> object:
+        """Validate a message against the port type.
+
+        Returns
+        -------
+        object
+            The message as unpacked from the port type, or the message itself
+            if it is trusted.
+        """
+        if (type(msg) is self._trusted_type
+                and self.validated_count >= self._validation_samples):
+            self.trusted_count += 1
+            return msg
+
+        try:
+            validated = self._type.unpack_bytes(self._type.pack_bytes(msg))
+        except DeltaTypeError as exc:
+            raise TypeError(
+                f"Message {msg} cannot be packed into {self._type}"
+            ) from exc
+
+        if validated is None:
+            raise TypeError(f"Message {msg} was not packed into {self._type}")
+        self.validated_count += 1
+
+        return validated
+
+    def _check_message(self, item: QueueMessage) -> bool:
+        """Validate the message of the item against the port type.
+
+        Returns
+        -------
+        bool
+            ``False`` if the message is ``None`` and thus should not be added
+            to the queue.
+        """
+        if not isinstance(item, QueueMessage):
+            raise TypeError("Only QueueMessage objects can be put on queues")
+
+        if item.msg is None:
+            return False
+
+        item.msg = self._validate(item.msg)
+        return True
+
+    def _check_batch(
+        self,
+        values: typing.Union[list, np.ndarray]
+    ) -> typing.Union[list, np.ndarray]:
+        """Validate a batch of messages.
+
+        A ``numpy`` array of the type given by ``as_numpy_type()`` of the port
+        type is valid by construction, it is copied so that the sender
+        can reuse it. Otherwise each message is validated.
+        """
+        if isinstance(values, np.ndarray):
+            try:
+                dtype = np.dtype(self._type.as_numpy_type())
+            except NotImplementedError:
+                dtype = None
+            if values.ndim == 1 and values.dtype == dtype:
+                self.trusted_count += len(values)
+                return values.copy()
+
+        if any(msg is None for msg in values):
+            raise TypeError("Batches cannot contain None")
+
+        return [self._validate(msg) for msg in values]
+
     def _delta_put(self, item: QueueMessage, block=True, timeout=None):
         """Add item to this queue.
 
@@ -82,23 +495,11 @@ class DeltaQueue(Queue):
         that the node pushing to it becomes unblocked to check for an exit
         signal.
         """
-        if not isinstance(item, QueueMessage):
-            raise TypeError("Only QueueMessage objects can be put on queues")
-
-        if item.msg is not None:
-            if not self._type.is_packable(item.msg):
-                raise TypeError(
-                    f"Message {item.msg} cannot be packed into {self._type}")
-
-            item.msg = self._type.unpack(self._type.pack(item.msg))
-            if item.msg is None:
-                raise TypeError(
-                    f"Message {item.msg} was not packed into {self._type}")
-                    
+        if self._check_message(item):
             if timeout is None:
-                Queue.put(self, item, block, timeout=self._queue_interval)
+                self._put_item(item, block, timeout=self._queue_interval)
             else:
-                Queue.put(self, item, block, timeout=timeout)
+                self._put_item(item, block, timeout=timeout)
 
     def put(self, item: QueueMessage, block=True, timeout=None):
         """Add an item to a queue.
@@ -108,25 +509,176 @@ class DeltaQueue(Queue):
         """
         self._delta_put(item, block, timeout)
 
+    def put_many(self, item: QueueMessage, block=True, timeout=None):
+        """Add a batch of messages to the queue as a single item.
+
+        Parameters
+        ----------
+        item : QueueMessage
+            The messages of the batch are either in a list or in a
+            one-dimensional ``numpy`` array, all of them have the clock of
+            the item. Empty batches are not added.
+        """
+        if not isinstance(item, QueueMessage):
+            raise TypeError("Only QueueMessage objects can be put on queues")
+
+        if len(item.msg) == 0:
+            return
+
+        batch = QueueMessage(_Batch(self._check_batch(item.msg)),
+                             clk=item.clk)
+        if timeout is None:
+            self._put_item(batch, block, timeout=self._queue_interval)
+        else:
+            self._put_item(batch, block, timeout=timeout)
+
     def flush(self):
-        """Unblock any thread waiting for this queue."""
-        if self.empty():
-            Queue.put(self, QueueMessage(Flusher(), clk=-1))
+        """Unblock any thread waiting for this queue.
+
+        If the queue is empty a :py:class:`Flusher` is added to it.
+        Threads blocked at ``get`` and ``put`` are woken immediately, from
+        then on calls that would wait receive a :py:class:`Flusher` or raise
+        ``Full`` instead.
+        """
+        with self.mutex:
+            self._stopped = True
+            if (self._pending_pos == len(self._pending)
+                    and not self._qsize()):
+                self._put(QueueMessage(Flusher(), clk=-1))
+                self.unfinished_tasks += 1
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
+
+
+class AsyncDeltaQueue(DeltaQueue):
+    """Queue used by
+    :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`
+    with the ``"asyncio"`` scheduler, backed by ``asyncio.Queue``.
+
+    Messages are validated exactly as in :py:class:`DeltaQueue`, but they
+    are received and sent via the coroutines :py:meth:`aget` and
+    :py:meth:`aput`, thus a node waiting for this queue suspends instead of
+    blocking a thread. The queue is not thread-safe, it must be accessed
+    only from the event loop it is bound to.
+
+    Parameters
+    ----------
+    out_port : OutPort
+        Output port for which this queue is created.
+    maxsize : int
+        If maxsize is <= 0, the queue size is infinite.
+    validation : str
+        How messages are validated against the port type,
+        see :py:class:`DeltaQueue`.
+    validation_samples : int
+        Number of messages validated in the ``"sample"`` mode.
+    """
+
+    batches = False
+
+    def __init__(self,
+                 out_port: OutPort,
+                 maxsize: int = 16,
+                 validation: str = "strict",
+                 validation_samples: int = 100):
+        super().__init__(out_port,
+                         maxsize=maxsize,
+                         validation=validation,
+                         validation_samples=validation_samples)
+        self._aqueue: asyncio.Queue = None
+
+    def bind(self):
+        """Create the underlying ``asyncio.Queue``.
+
+        It has to be called from the running event loop as in older versions
+        of Python the queue is attached to the current event loop at
+        creation.
+        """
+        self._aqueue = asyncio.Queue(maxsize=self.maxsize)
+
+    def empty(self) -> bool:
+        return self._aqueue is None or self._aqueue.empty()
+
+    def full(self) -> bool:
+        return self._aqueue is not None and self._aqueue.full()
+
+    def qsize(self) -> int:
+        return 0 if self._aqueue is None else self._aqueue.qsize()
+
+    async def aget(self) -> QueueMessage:
+        """If the queue is optional and empty return ``None``,
+        otherwise wait for the item and return it.
+        """
+        if self.optional and self._aqueue.empty():
+            return QueueMessage(None, clk=0)
+
+        return await self._aqueue.get()
+
+    async def aget_many(self, max_n: int, timeout=None) -> QueueMessage:
+        """Coroutine version of :py:meth:`DeltaQueue.get_many`.
+
+        Returns an empty list if the timeout expires.
+        """
+        if self.optional and self._aqueue.empty():
+            return QueueMessage([], clk=0)
+
+        try:
+            item = await asyncio.wait_for(self._aqueue.get(), timeout)
+        except asyncio.TimeoutError:
+            return QueueMessage([], clk=0)
+
+        items = [item]
+        while len(items) < max_n and not self._aqueue.empty():
+            items.append(self._aqueue.get_nowait())
+        return QueueMessage([item.msg for item in items],
+                            clk=max(item.clk for item in items))
+
+    async def aput(self, item: QueueMessage):
+        """Add an item to the queue, wait while the queue is full.
+
+        .. warning::
+            If ``item.msg == None``, it is not added to the queue.
+        """
+        if self._check_message(item):
+            await self._aqueue.put(item)
+
+    def get(self, block=True, timeout=None):
+        raise RuntimeError("AsyncDeltaQueue can only be read via aget")
+
+    def put(self, item: QueueMessage, block=True, timeout=None):
+        raise RuntimeError("AsyncDeltaQueue can only be written via aput")
+
+    def flush(self):
+        """Overwrite ``DeltaQueue.flush``.
+
+        Nothing is to be done as the scheduler cancels all nodes waiting for
+        this queue at the stop signal.
+        """
+        pass
 
 
 class ConstQueue(DeltaQueue):
     """An imitation queue created at the output of
     :py:class:`PyConstBody<deltalanguage.wiring.PyConstBody>`.
 
-    A deepcopy of the message from this queue is passed to the receiving node
+    The message from this queue is passed to the receiving node
     and it is _not_ removed from the queue, thus the next time the receiving
     node ask for the input the same message will be produced without
     re-evaluation of the node this message originated from.
 
+    The message is frozen once by :py:func:`freeze` and the same object is
+    passed at each request. An attempt to modify it raises ``TypeError``
+    and issues :py:class:`ConstMutationWarning`, apart from ``numpy``
+    arrays, which are made read-only and only raise ``ValueError``.
+    Nodes that modify their inputs in place need ``copy_on_read``.
+
     Parameters
     ----------
     out_port : OutPort
         Output port for which this queue is created.
+    copy_on_read : bool
+        If ``True`` the message is not frozen and a deepcopy of it is passed
+        at each request instead.
 
 
     .. warning::
@@ -137,9 +689,14 @@ class ConstQueue(DeltaQueue):
         input from this queue it will be passed to that node at every iteration.
     """
 
-    def __init__(self, out_port):
+    batches = False
+
+    constant = True
+
+    def __init__(self, out_port, copy_on_read: bool = False):
         super().__init__(out_port, maxsize=1)
         self._saved_value = None
+        self.copy_on_read = copy_on_read
 
     def put(self, item: QueueMessage, block=True, timeout=None):
         """Overwrite ``DeltaQueue.put``."""
@@ -148,7 +705,11 @@ class ConstQueue(DeltaQueue):
 
             # only non-None is saved
             if item.msg is not None:
-                self._saved_value = item
+                if self.copy_on_read:
+                    self._saved_value = item
+                else:
+                    self._saved_value = QueueMessage(freeze(item.msg),
+                                                     clk=item.clk)
         else:
             raise Full("Put to already populated ConstQueue.")
 
@@ -160,7 +721,32 @@ class ConstQueue(DeltaQueue):
 
             raise Empty
 
-        return deepcopy(self._saved_value)
+        if self.copy_on_read:
+            return deepcopy(self._saved_value)
+        return self._saved_value
+
+    def get_many(self,
+                 max_n: int,
+                 block=True,
+                 timeout=None) -> QueueMessage:
+        """Overwrite ``DeltaQueue.get_many``, the message is repeated
+        ``max_n`` times.
+        """
+        item = self.get()
+        if type(item.msg) is Flusher:
+            return item
+        if item.msg is None:
+            return QueueMessage([], clk=0)
+
+        if self.copy_on_read:
+            return QueueMessage([item.msg] + [deepcopy(item.msg)
+                                              for _ in range(max_n - 1)],
+                                clk=item.clk)
+        return QueueMessage([item.msg] * max_n, clk=item.clk)
+
+    async def aget(self) -> QueueMessage:
+        """Coroutine version of :py:meth:`get`, it never waits."""
+        return self.get()
 
     def flush(self):
         """Overwrite ``DeltaQueue.flush``"""
@@ -0,0 +1,333 @@
+import mmap
+import os
+import struct
+import tempfile
+from queue import Empty, Full
+from time import monotonic, sleep
+import typing
+import weakref
+
+from deltalanguage.data_types import DeltaTypeError
+from deltalanguage.wiring import OutPort
+from deltalanguage._utils import QueueMessage
+
+from ._queues import DeltaQueue, Flusher
+
+
+def _shared_dir() -> typing.Optional[str]:
+    """Directory for the files backing the ring buffers, memory-based if
+    the platform provides one.
+    """
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm"
+    return None
+
+
+class RingBuffer:
+    """Fixed-slot ring buffer in memory shared between threads and processes.
+
+    The buffer is a memory-mapped file that starts with a header of the
+    write index, the read index and the closed flag, each on its own cache
+    line, followed by ``slots`` slots of ``slot_size`` bytes.
+
+    There must be a single producer and a single consumer: the write index
+    is only modified by the producer and the read index only by the
+    consumer, thus no lock is required. An index is advanced only after the
+    slot is written or read.
+
+    The object can be pickled, in this case the copy is attached to the
+    same memory. The memory is released when the creator calls
+    :py:meth:`release` or is garbage collected.
+
+    Parameters
+    ----------
+    slot_size : int
+        Size of each slot in bytes.
+    slots : int
+        Number of slots.
+    path : str
+        Path of the backing file of an existing buffer to attach to.
+        If ``None`` a new buffer is created.
+
+
+    .. warning::
+        The ordering of the slot and index updates relies on the hardware
+        not reordering stores, which holds on x86.
+    """
+
+    _index = struct.Struct("<Q")
+    _head = 0
+    _tail = 64
+    _closed = 128
+    _header_size = 192
+
+    def __init__(self, slot_size: int, slots: int, path: str = None):
+        if slots < 1:
+            raise ValueError("RingBuffer should have at least one slot")
+        self.slot_size = slot_size
+        self.slots = slots
+        size = self._header_size + max(slot_size, 1) * slots
+
+        # only the creating process removes the memory, even if the object
+        # is inherited by a forked process
+        self._owner = os.getpid() if path is None else None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="deltaring_",
+                                        dir=_shared_dir())
+            os.ftruncate(fd, size)
+        else:
+            fd = os.open(path, os.O_RDWR)
+
+        try:
+            self._mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self._buf = memoryview(self._mmap)
+        self.path = path
+        self._finalizer = weakref.finalize(
+            self, self._free, self._buf, self._mmap, path, self._owner
+        )
+
+    def __reduce__(self):
+        return (RingBuffer, (self.slot_size, self.slots, self.path))
+
+    def _load(self, offset: int) -> int:
+        return self._index.unpack_from(self._buf, offset)[0]
+
+    def _store(self, offset: int, value: int):
+        self._index.pack_into(self._buf, offset, value)
+
+    def __len__(self) -> int:
+        return self._load(self._head) - self._load(self._tail)
+
+    @property
+    def closed(self) -> bool:
+        return self._load(self._closed) != 0
+
+    def close(self):
+        """Mark the buffer as closed, all waiting parties give up."""
+        self._store(self._closed, 1)
+
+    def try_put(self, data: bytes) -> bool:
+        """Write ``data`` to the next slot, called by the producer only.
+
+        Returns
+        -------
+        bool
+            ``False`` if the buffer is full.
+        """
+        head = self._load(self._head)
+        if head - self._load(self._tail) >= self.slots:
+            return False
+
+        offset = self._header_size + (head % self.slots) * self.slot_size
+        self._buf[offset:offset + self.slot_size] = data
+        self._store(self._head, head + 1)
+        return True
+
+    def try_get(self) -> typing.Optional[bytes]:
+        """Read the oldest slot, called by the consumer only.
+
+        Returns
+        -------
+        typing.Optional[bytes]
+            ``None`` if the buffer is empty.
+        """
+        tail = self._load(self._tail)
+        if tail == self._load(self._head):
+            return None
+
+        offset = self._header_size + (tail % self.slots) * self.slot_size
+        data = self._buf[offset:offset + self.slot_size].tobytes()
+        self._store(self._tail, tail + 1)
+        return data
+
+    @staticmethod
+    def _free(buf: memoryview,
+              mem: mmap.mmap,
+              path: str,
+              owner: typing.Optional[int]):
+        buf.release()
+        mem.close()
+        if owner == os.getpid():
+            os.unlink(path)
+
+    def release(self):
+        """Unmap the memory, and remove it if this object created it."""
+        self._finalizer()
+
+
+class SharedMemoryQueue(DeltaQueue):
+    """Queue that communicates messages between nodes via a
+    :py:class:`RingBuffer`, so that the nodes can run on different processes.
+
+    Each message is stored in a slot as its logical clock followed by the
+    bytes packed by the codec of the port type, see
+    :py:meth:`BaseDeltaType.pack_bytes
+    <deltalanguage.data_types.BaseDeltaType.pack_bytes>`.
+    Thus each message is validated and the port type must have a fixed size.
+
+    Waiting for a message or for a free slot is done by polling with
+    an exponential backoff up to ``poll_interval``.
+
+    Parameters
+    ----------
+    out_port : OutPort
+        Output port for which this queue is created.
+    maxsize : int
+        Number of slots of the ring buffer. As it has to be fixed, if
+        maxsize is <= 0, the ring buffer has ``default_slots`` slots.
+    queue_interval : float
+        A blocked ``put`` raises ``Full`` at this periodicity (in seconds),
+        so that the node can check if stopping is needed.
+    ring : RingBuffer
+        Attach to this existing ring buffer instead of creating a new one.
+    poll_interval : float
+        Maximum interval between polls of the ring buffer (in seconds).
+    """
+
+    default_slots = 1024
+
+    batches = False
+
+    _clock = struct.Struct("<q")
+
+    def __init__(self,
+                 out_port: OutPort,
+                 maxsize: int = 16,
+                 queue_interval: float = 1.0,
+                 ring: RingBuffer = None,
+                 poll_interval: float = 1e-3):
+        super().__init__(out_port,
+                         maxsize=maxsize,
+                         queue_interval=queue_interval)
+        self._poll_interval = poll_interval
+        if ring is None:
+            ring = self.make_ring(out_port, maxsize)
+        self.ring = ring
+
+    @classmethod
+    def make_ring(cls, out_port: OutPort, maxsize: int = 16) -> RingBuffer:
+        """Create a ring buffer for the messages of ``out_port``.
+
+        Raises
+        ------
+        DeltaTypeError
+            If the port type does not have a fixed size.
+        """
+        try:
+            size = out_port.port_type.codec.size
+        except NotImplementedError as exc:
+            raise DeltaTypeError(
+                f"Port {out_port.name} of type {out_port.port_type} cannot "
+                "be placed on shared memory"
+            ) from exc
+
+        slots = maxsize if maxsize > 0 else cls.default_slots
+        return RingBuffer(cls._clock.size + size, slots)
+
+    def _poll(self, attempt: typing.Callable, block: bool, timeout: float):
+        """Poll ``attempt`` until it succeeds, the ring buffer is closed
+        or the timeout expires.
+
+        Returns
+        -------
+        The result of ``attempt`` or ``None`` if the buffer is closed.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        delay = 0.0
+        while True:
+            result = attempt()
+            if result is not None and result is not False:
+                return result
+
+            if self.ring.closed:
+                return None
+
+            if not block or (deadline is not None and monotonic() > deadline):
+                raise TimeoutError
+
+            sleep(delay)
+            delay = min(2 * delay or 1e-6, self._poll_interval)
+
+    def empty(self) -> bool:
+        return len(self.ring) == 0
+
+    def full(self) -> bool:
+        return len(self.ring) >= self.ring.slots
+
+    def qsize(self) -> int:
+        return len(self.ring)
+
+    def get(self, block=True, timeout=None) -> QueueMessage:
+        """If the queue is optional and empty return ``None``,
+        otherwise return the item.
+        """
+        if self.optional and self.empty():
+            return QueueMessage(None, clk=0)
+
+        try:
+            data = self._poll(self.ring.try_get, block, timeout)
+        except TimeoutError:
+            raise Empty
+
+        if data is None:
+            return QueueMessage(Flusher(), clk=-1)
+
+        clk = self._clock.unpack_from(data)[0]
+        return QueueMessage(self._type.unpack_bytes(data[self._clock.size:]),
+                            clk=clk)
+
+    def get_many(self,
+                 max_n: int,
+                 block=True,
+                 timeout=None) -> QueueMessage:
+        """Get up to ``max_n`` messages, waits only if none is available."""
+        item = self.get(block=block, timeout=timeout)
+        if type(item.msg) is Flusher:
+            return item
+        if item.msg is None:
+            return QueueMessage([], clk=0)
+
+        values = [item.msg]
+        clk = item.clk
+        while len(values) < max_n and not self.empty():
+            item = self.get()
+            values.append(item.msg)
+            clk = max(clk, item.clk)
+        return QueueMessage(values, clk=clk)
+
+    def put(self, item: QueueMessage, block=True, timeout=None):
+        """Pack the message and add it to the ring buffer.
+
+        .. warning::
+            If ``item.msg == None``, it is not added to the queue.
+        """
+        if not isinstance(item, QueueMessage):
+            raise TypeError("Only QueueMessage objects can be put on queues")
+
+        if item.msg is None:
+            return
+
+        try:
+            data = (self._clock.pack(item.clk)
+                    + self._type.pack_bytes(item.msg))
+        except DeltaTypeError as exc:
+            raise TypeError(
+                f"Message {item.msg} cannot be packed into {self._type}"
+            ) from exc
+        self.validated_count += 1
+
+        try:
+            if self._poll(lambda: self.ring.try_put(data),
+                          block,
+                          self._queue_interval if timeout is None
+                          else timeout) is None:
+                # closed, let the node check the stop signal
+                raise Full
+        except TimeoutError:
+            raise Full
+
+    def flush(self):
+        """Unblock any thread or process waiting for this queue."""
+        self.ring.close()
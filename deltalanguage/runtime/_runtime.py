@@ -1,8 +1,9 @@
 import logging
 import sys
 import threading
-from typing import Dict, Tuple, Type, Union
+from typing import Dict, List, Tuple, Type, Union
 
+from deltalanguage.data_types import DeltaTypeError
 from deltalanguage.wiring import (DeltaGraph,
                                   OutPort,
                                   PyConstBody,
@@ -13,7 +14,11 @@ from deltalanguage.wiring import (DeltaGraph,
                                   RealNode)
 from deltalanguage.logging import MessageLog, clear_loggers, make_logger
 
-from ._queues import ConstQueue, DeltaQueue
+from ._async_scheduler import AsyncioScheduler
+from ._metrics import NodeMetrics, QueueMetrics, instrument, uninstrument
+from ._queues import AsyncDeltaQueue, ConstQueue, DeltaQueue
+from ._ring_buffer import SharedMemoryQueue
+from ._scheduler import CooperativeScheduler
 
 
 class DeltaRuntimeExit(Exception):
@@ -93,7 +98,8 @@ class DeltaPySimulator:
     :py:class:`DeltaGraph<deltalanguage.wiring.DeltaGraph>`.
 
     At initialisation it spins out an individual ``threading.Thread``
-    for each node's body. Inputs and outputs to which are managed by
+    for each node's body (unless the cooperative scheduler is chosen,
+    see below). Inputs and outputs to which are managed by
     corresponding input and output ports. The transfer of data is facilitated
     by channels implemented as :py:class:`DeltaQueue`.
 
@@ -121,6 +127,15 @@ class DeltaPySimulator:
         The level at which logs from messages between nodes are displayed.
         These are the same levels as in Python's ``logging`` module.
         By default only error logs are displayed.
+    msg_log_size : int
+        If given, only the last this many messages are kept by the message
+        log, otherwise all of them are kept until the end of the simulation.
+    msg_log_sampling : int
+        Keep only one in this many messages in the message log.
+    msg_log_path : str
+        If given, the messages are written to this file in a compact binary
+        form instead of being kept in memory, it can be read by
+        :py:func:`read_message_log<deltalanguage.logging.read_message_log>`.
     switchinterval : float
         Passed to `sys.setswitchinterval`, which
         sets the interpreter’s thread switch interval (in seconds).
@@ -133,10 +148,64 @@ class DeltaPySimulator:
         this means that the Python GIL will be forced to run another node's
         thread once the queue is full, thus it will prevent blockage.
     queue_interval : float
-        When the simulation is called to stop, some of the queues might be
-        blocking nodes at ``put`` methods as they are full. The simulator
-        interrupts this at this periodicity (in seconds) and checks if
-        stopping is needed.
+        When the simulation is called to stop, nodes blocked at ``get`` or
+        ``put`` of the queues are woken immediately. As a fallback a blocked
+        ``put`` is also interrupted at this periodicity (in seconds) to check
+        if stopping is needed.
+    validation : str
+        Validation mode of messages for all instances of
+        :py:class:`DeltaQueue`, one of ``"strict"`` (default), ``"sample"``
+        and ``"trusted"``. See :py:class:`DeltaQueue` for details.
+        The number of messages that took each path is returned by
+        :py:meth:`validation_stats`.
+    validation_samples : int
+        Number of validated messages per queue in the ``"sample"`` mode.
+    scheduler : str
+        How the nodes are run:
+
+        - ``"threads"`` (default) - each node runs on its own thread,
+          the switching is done by the Python GIL.
+        - ``"cooperative"`` - all nodes run on a single thread via
+          :py:class:`CooperativeScheduler`, which avoids the contention for
+          the GIL and thus scales to graphs with many nodes.
+          Nodes are evaluated in a deterministic order and the simulation
+          stops if no node can make progress.
+          Interactive nodes are suspended while they wait for their queues,
+          thus they should not busy-wait.
+        - ``"asyncio"`` - all nodes run as tasks of a single ``asyncio``
+          event loop via :py:class:`AsyncioScheduler` and communicate via
+          :py:class:`AsyncDeltaQueue`.
+          Interactive bodies can be coroutine functions that await
+          ``node.receive`` and ``node.send``. Bodies marked as ``blocking``
+          and plain interactive bodies are run on executor threads.
+          The simulation stops immediately at the stop signal.
+    channels : typing.Union[str, typing.Dict[str, str]]
+        Implementation of the channels between nodes:
+
+        - ``"queue"`` (default) - :py:class:`DeltaQueue`.
+        - ``"shared_memory"`` - :py:class:`SharedMemoryQueue`, a fixed-slot
+          ring buffer of packed messages without locks. Only wires whose
+          types have a fixed size can use it, the other wires keep
+          :py:class:`DeltaQueue`. It cannot be used with the ``"asyncio"``
+          scheduler.
+
+        Either a single value for all wires, or a dictionary from the names
+        of output ports, e.g. ``"add_1.output"``, to the values, the wires
+        not in the dictionary use ``"queue"``.
+    copy_on_read : bool
+        By default messages of constant nodes are frozen and shared by
+        all iterations of the receiving nodes, see :py:class:`ConstQueue`.
+        If ``True`` a deepcopy is passed at each iteration instead, which is
+        required for bodies that modify their inputs in place.
+    metrics : bool
+        Collect the counters of nodes and queues returned by
+        :py:meth:`metrics`. If ``False`` (default) the nodes and queues are
+        not instrumented at all.
+    metrics_sampling : int
+        Measure the times reported by :py:meth:`metrics` only for one in
+        this many steps of each node (or calls of ``get`` and ``put`` for
+        interactive nodes) and extrapolate, which lowers the overhead.
+        The counters of messages are always exact.
 
 
     .. note::
@@ -179,11 +248,24 @@ class DeltaPySimulator:
                  graph: DeltaGraph,
                  lvl: int = logging.ERROR,
                  msg_lvl: int = logging.ERROR,
+                 msg_log_size: int = None,
+                 msg_log_sampling: int = 1,
+                 msg_log_path: str = None,
                  switchinterval: float = None,
                  queue_size: int = 16,
-                 queue_interval: float = 1.0):
+                 queue_interval: float = 1.0,
+                 validation: str = "strict",
+                 validation_samples: int = 100,
+                 scheduler: str = "threads",
+                 channels: Union[str, Dict[str, str]] = "queue",
+                 copy_on_read: bool = False,
+                 metrics: bool = False,
+                 metrics_sampling: int = 1):
         self.log = make_logger(lvl, "DeltaPySimulator")
-        self.msg_log = MessageLog(msg_lvl)
+        self.msg_log = MessageLog(msg_lvl,
+                                  maxlen=msg_log_size,
+                                  sampling=msg_log_sampling,
+                                  path=msg_log_path)
         self.set_excepthook()
 
         # speed optimisation
@@ -191,6 +273,35 @@ class DeltaPySimulator:
             sys.setswitchinterval(switchinterval)
         self.queue_size = queue_size
         self.queue_interval = queue_interval
+        if validation not in DeltaQueue.validation_modes:
+            raise ValueError(f"Unknown validation mode '{validation}', "
+                             f"choose one of {DeltaQueue.validation_modes}")
+        self.validation = validation
+        self.validation_samples = validation_samples
+        if scheduler not in ("threads", "cooperative", "asyncio"):
+            raise ValueError(f"Unknown scheduler '{scheduler}', "
+                             "choose 'threads', 'cooperative' or 'asyncio'")
+        self.copy_on_read = copy_on_read
+        self.channels = channels
+        for channel in (channels.values() if isinstance(channels, dict)
+                        else [channels]):
+            if channel not in ("queue", "shared_memory"):
+                raise ValueError(f"Unknown channel '{channel}', "
+                                 "choose 'queue' or 'shared_memory'")
+            if channel == "shared_memory" and scheduler == "asyncio":
+                raise ValueError("Shared memory channels cannot be used "
+                                 "with the asyncio scheduler")
+
+        if metrics_sampling < 1:
+            raise ValueError("metrics_sampling should be at least 1")
+
+        # all running nodes are handled by a single scheduler if requested
+        if scheduler == "cooperative":
+            self.scheduler = CooperativeScheduler(self)
+        elif scheduler == "asyncio":
+            self.scheduler = AsyncioScheduler(self)
+        else:
+            self.scheduler = None
 
         # the graph
         self.graph = graph
@@ -219,8 +330,19 @@ class DeltaPySimulator:
         # Signal to stop child threads
         self.sig_stop = threading.Event()
 
+        # counters of running nodes and their out queues
+        self._node_metrics: Dict[str, NodeMetrics] = {}
+        self._queue_metrics: Dict[str, QueueMetrics] = {}
         for node in self.graph.nodes:
             node.set_communications(self)
+            if not isinstance(node, PythonNode):
+                continue
+            if metrics and isinstance(node.body, self.running_body_cls):
+                self._node_metrics[node.full_name] = instrument(
+                    node, metrics_sampling, self._queue_metrics
+                )
+            else:
+                uninstrument(node)
 
         # child threads for node's workers
         self.threads: Dict[str, threading.Thread] = {}
@@ -230,7 +352,8 @@ class DeltaPySimulator:
         """Create inter-node communication queues starting from the given node.
 
         Depending on the type of the given node, the queues will be
-        ConstQueue (for a const node) or
+        ConstQueue (for a const node),
+        AsyncDeltaQueue (for the asyncio scheduler) or
         DeltaQueue (the default).
         """
         for out_port in node.out_ports:
@@ -264,12 +387,13 @@ class DeltaPySimulator:
 
         If it is from a const node to a non-const node, it will be a
         ConstQueue. Messages between two const nodes call each other directly
-        and avoid queues altogether. The default is DeltaQueue.
+        and avoid queues altogether. The default is DeltaQueue, or
+        SharedMemoryQueue if it is selected for this wire via ``channels``.
         """
         if isinstance(out_port.node.body, self.run_once_body_cls):
             if isinstance(out_port.destination.node.body, self.run_once_body_cls):
                 return None
-            return ConstQueue(out_port)
+            return ConstQueue(out_port, copy_on_read=self.copy_on_read)
 
         if out_port.destination.in_port_size > 0 and self.queue_size > 0:
             maxsize = min(out_port.destination.in_port_size, self.queue_size)
@@ -277,9 +401,32 @@ class DeltaPySimulator:
             # one or both queues is 0, choose largest size
             maxsize = max(out_port.destination.in_port_size, self.queue_size)
 
+        if self.scheduler is not None and self.scheduler.is_async:
+            return AsyncDeltaQueue(out_port,
+                                   maxsize=maxsize,
+                                   validation=self.validation,
+                                   validation_samples=self.validation_samples)
+
+        if isinstance(self.channels, dict):
+            channel = self.channels.get(out_port.name, "queue")
+        else:
+            channel = self.channels
+        if channel == "shared_memory":
+            try:
+                return SharedMemoryQueue(out_port,
+                                         maxsize=maxsize,
+                                         queue_interval=self.queue_interval)
+            except DeltaTypeError:
+                # only wires explicitly requested to use shared memory fail
+                if isinstance(self.channels, dict):
+                    raise
+                self.log.info(f"{out_port.name} cannot use shared memory")
+
         return DeltaQueue(out_port,
                           maxsize=maxsize,
-                          queue_interval=self.queue_interval)
+                          queue_interval=self.queue_interval,
+                          validation=self.validation,
+                          validation_samples=self.validation_samples)
 
     def all_queues(self):
         """An iterator through all the queues.
@@ -290,6 +437,56 @@ class DeltaPySimulator:
             for qu in queue_store.values():
                 yield qu
 
+    def validation_stats(self) -> Dict[str, Dict[str, int]]:
+        """Number of messages that were validated and that were trusted
+        (see :py:class:`DeltaQueue`) per queue.
+
+        Returns
+        -------
+        Dict[str, Dict[str, int]]
+            Keys are the names of out ports of the queues, values are
+            dictionaries with keys ``"validated"`` and ``"trusted"``.
+        """
+        return {str(qu._src.name): {"validated": qu.validated_count,
+                                    "trusted": qu.trusted_count}
+                for qu in self.all_queues()}
+
+    def metrics(self) -> Dict[str, Dict[str, Dict[str, Union[int, float]]]]:
+        """Current counters of nodes and queues, can be called while the
+        simulation is running to find bottlenecks.
+
+        Returns
+        -------
+        Dict[str, Dict[str, Dict[str, Union[int, float]]]]
+            A dictionary with keys:
+
+            - ``"nodes"`` - for each running node by its full name,
+              the numbers of messages received (``"messages_in"``) and sent
+              (``"messages_out"``), the times in seconds spent in the body
+              (``"time_body"``), blocked on ``get`` (``"time_get"``) and
+              on ``put`` (``"time_put"``), and the number of times
+              ``put`` gave up because the queue was full
+              (``"full_retries"``).
+              Empty if the simulator was created without ``metrics``.
+            - ``"queues"`` - for each queue by the name of its out port,
+              the number of messages in it (``"depth"``) and the largest
+              number seen after a message was added
+              (``"high_water_mark"``), which is ``None`` if the simulator
+              was created without ``metrics`` or the sender is a constant
+              node.
+        """
+        nodes = {name: metrics.as_dict()
+                 for name, metrics in self._node_metrics.items()}
+        queues = {}
+        for qu in self.all_queues():
+            name = str(qu._src.name)
+            hwm = self._queue_metrics.get(name)
+            queues[name] = {
+                "depth": qu.qsize(),
+                "high_water_mark": None if hwm is None else hwm.high_water_mark
+            }
+        return {"nodes": nodes, "queues": queues}
+
     def add_message_log(self):
         """Set the message log for all nodes
 
@@ -302,6 +499,10 @@ class DeltaPySimulator:
             if isinstance(node, PythonNode):
                 node.set_msg_log(self.msg_log)
 
+    def _own_nodes(self) -> List[RealNode]:
+        """Nodes run by this simulator."""
+        return self.graph.nodes
+
     def start(self):
         """Each node's worker function is started on its own thread, and
         begins listening for input. The nodes in the run-once categories get
@@ -313,7 +514,7 @@ class DeltaPySimulator:
             self.running = True
 
         try:
-            for node in self.graph.nodes:
+            for node in self._own_nodes():
                 if isinstance(node.body, self.run_once_body_cls):
                     node.run_once(self)
 
@@ -325,12 +526,16 @@ class DeltaPySimulator:
                 "Error occurred in constant node during program start."
                 + "Exiting simulator.") from exc
 
-        for node in self.graph.nodes:
+        for node in self._own_nodes():
             if isinstance(node.body, self.run_once_body_cls):
                 continue
 
             elif isinstance(node.body, self.running_body_cls):
                 self.log.info(f"Starting node {node.full_name}")
+                if self.scheduler is not None:
+                    self.scheduler.add_node(node)
+                    continue
+
                 self.threads[node.full_name] = DeltaThread(
                     target=node.thread_worker,
                     args=(self,),
@@ -342,6 +547,13 @@ class DeltaPySimulator:
                 self.log.error(f"node {node.full_name} is not of a recognised " +
                                f"class {type(node)}")
 
+        if self.scheduler is not None and self.scheduler.tasks:
+            self.threads["scheduler"] = DeltaThread(
+                target=self.scheduler.run,
+                name="Thread_scheduler"
+            )
+            self.threads["scheduler"].start()
+
         if len(self.threads) == 0:
             raise RuntimeError("Graph cannot consist of only constant nodes.")
 
@@ -395,6 +607,9 @@ class DeltaPySimulator:
             for qu in self.all_queues():
                 qu.flush()
 
+            if self.scheduler is not None:
+                self.scheduler.stop()
+
     def stop(self):
         """Wait for all threads to join to join and do logging."""
         self._stop_workers()
@@ -403,6 +618,9 @@ class DeltaPySimulator:
             th.join()
 
         # tidy up the logs
+        for name, stats in self.validation_stats().items():
+            self.log.info(f"queue {name}: {stats['validated']} validated, "
+                          f"{stats['trusted']} trusted messages")
         self.msg_log.log_messages()
         clear_loggers()
         self.running = False
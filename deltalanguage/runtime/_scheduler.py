@@ -0,0 +1,238 @@
+from __future__ import annotations
+from collections import deque
+import threading
+import typing
+
+from deltalanguage.wiring import PyInteractiveBody, PythonNode
+
+if typing.TYPE_CHECKING:
+    from ._runtime import DeltaPySimulator
+
+
+class _FunctionTask:
+    """Scheduling unit of a node with a function or method body.
+
+    One step receives the inputs, evaluates the body once and sends
+    the result.
+    """
+
+    def __init__(self, node: PythonNode):
+        self.node = node
+        self.finished = False
+        self.scheduled = False
+        self.neighbours: typing.List[typing.Union[_FunctionTask,
+                                                  _CoroutineTask]] = []
+        self._mandatory_in = [q for q in node.in_queues.values()
+                              if not q.optional]
+        self._outs = list(node.out_queues.values())
+
+    def ready(self) -> bool:
+        """All mandatory inputs have messages and all outputs have room."""
+        for q in self._mandatory_in:
+            if q.empty():
+                return False
+        for q in self._outs:
+            if q.full():
+                return False
+        return True
+
+    def step(self):
+        self.node.run_step()
+
+    def close(self):
+        pass
+
+
+class _CoroutineTask:
+    """Scheduling unit of a node with an interactive body.
+
+    The body runs on its own thread that is used only as a stack for the
+    coroutine: the scheduler and the coroutine hand over control explicitly,
+    thus only one of them is running at any time and there is no contention
+    for the GIL.
+
+    The coroutine suspends itself inside of
+    :py:meth:`PythonNode.receive<deltalanguage.wiring.PythonNode.receive>`
+    and
+    :py:meth:`PythonNode.send<deltalanguage.wiring.PythonNode.send>`
+    if they would block, together with the condition of resumption.
+    """
+
+    def __init__(self, node: PythonNode, runtime: DeltaPySimulator):
+        self.node = node
+        self.finished = False
+        self.scheduled = False
+        self.neighbours: typing.List[typing.Union[_FunctionTask,
+                                                  _CoroutineTask]] = []
+        self.condition: typing.Optional[typing.Callable[[], bool]] = None
+        self.exc: typing.Optional[BaseException] = None
+
+        self._resume = threading.Semaphore(0)
+        self._suspend = threading.Semaphore(0)
+        self._thread = threading.Thread(target=self._run,
+                                        args=(runtime,),
+                                        name=f"Coroutine_{node.full_name}",
+                                        daemon=True)
+
+    def ready(self) -> bool:
+        return self.condition is None or self.condition()
+
+    def step(self):
+        """Resume the coroutine and wait until it suspends or finishes."""
+        if not self._thread.is_alive() and not self.finished:
+            self._thread.start()
+        self._resume.release()
+        self._suspend.acquire()
+
+        if self.exc is not None:
+            exc, self.exc = self.exc, None
+            raise exc
+
+    def suspend(self, condition: typing.Callable[[], bool]):
+        """Pass the control back to the scheduler until ``condition`` is
+        satisfied. Called from the coroutine.
+        """
+        self.condition = condition
+        self._suspend.release()
+        self._resume.acquire()
+        self.condition = None
+        self.node.check_stop()
+
+    def close(self):
+        """Unwind the coroutine, it exits at the stop signal."""
+        if self._thread.is_alive():
+            try:
+                self.step()
+            except BaseException:
+                pass
+            self._thread.join()
+
+    def _run(self, runtime: DeltaPySimulator):
+        self._resume.acquire()
+        try:
+            self.node.check_stop()
+            self.node.thread_worker(runtime)
+        except BaseException as exc:
+            self.exc = exc
+        finally:
+            self.finished = True
+            self._suspend.release()
+
+
+class CooperativeScheduler:
+    """Runs all nodes of
+    :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`
+    on a single thread.
+
+    Nodes with function and method bodies are evaluated one step at a time
+    from a ready-queue. A node is ready when all its compulsory input
+    queues are non-empty and all its output queues have room.
+    After each step only the node itself and its neighbours are re-checked
+    for readiness, thus the cost of scheduling does not depend on the size
+    of the graph.
+
+    Nodes with interactive bodies are run as coroutines which are suspended
+    whenever receiving or sending would block.
+
+    If no node can make progress the graph is blocked and the simulation is
+    stopped.
+
+    Parameters
+    ----------
+    runtime : DeltaPySimulator
+        The simulator that owns the queues and the stop signal.
+    """
+
+    is_async = False
+
+    def __init__(self, runtime: DeltaPySimulator):
+        self.runtime = runtime
+        self.log = runtime.log
+        self.tasks: typing.Dict[str, typing.Union[_FunctionTask,
+                                                  _CoroutineTask]] = {}
+
+    def add_node(self, node: PythonNode):
+        """Register a node with a running body."""
+        if isinstance(node.body, PyInteractiveBody):
+            self.tasks[node.full_name] = _CoroutineTask(node, self.runtime)
+        else:
+            self.tasks[node.full_name] = _FunctionTask(node)
+
+    def wait_until(self,
+                   node: PythonNode,
+                   condition: typing.Callable[[], bool]):
+        """Return once ``condition`` is satisfied.
+
+        Nodes with interactive bodies are suspended in the meantime,
+        for all other nodes the condition is guaranteed by the scheduler.
+        """
+        if condition():
+            return
+
+        task = self.tasks.get(node.full_name)
+        if not isinstance(task, _CoroutineTask):
+            raise RuntimeError(
+                f"Node {node.full_name} would block the cooperative "
+                "scheduler, only interactive nodes can wait for the queues."
+            )
+
+        task.suspend(condition)
+
+    def stop(self):
+        """The main loop checks the stop signal after every step, thus
+        nothing is to be done here.
+        """
+        pass
+
+    def _connect(self):
+        """Find the neighbours of each task, only their readiness can change
+        after the task's step.
+        """
+        for task in self.tasks.values():
+            neighbours = [task]
+            for q in task.node.out_queues.values():
+                neighbours.append(
+                    self.tasks.get(q._src.destination.node.full_name))
+            for q in task.node.in_queues.values():
+                neighbours.append(self.tasks.get(q._src.node.full_name))
+
+            for neighbour in neighbours:
+                if neighbour is not None and neighbour not in task.neighbours:
+                    task.neighbours.append(neighbour)
+
+    def run(self):
+        """Main loop, it should be started on its own thread."""
+        self._connect()
+
+        ready_queue = deque(self.tasks.values())
+        for task in ready_queue:
+            task.scheduled = True
+
+        try:
+            while ready_queue and not self.runtime.sig_stop.is_set():
+                task = ready_queue.popleft()
+                task.scheduled = False
+
+                if task.finished or not task.ready():
+                    continue
+
+                try:
+                    task.step()
+                except SystemExit:
+                    # silent exit of this node only
+                    task.finished = True
+
+                for neighbour in task.neighbours:
+                    if not neighbour.scheduled and not neighbour.finished:
+                        neighbour.scheduled = True
+                        ready_queue.append(neighbour)
+
+            if not self.runtime.sig_stop.is_set():
+                self.log.warning("No node can make progress, "
+                                 "the graph is blocked. Stopping.")
+                self.runtime._stop_workers()
+
+        finally:
+            self.runtime._stop_workers()
+            for task in self.tasks.values():
+                task.close()
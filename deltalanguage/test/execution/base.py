@@ -9,8 +9,16 @@ import deltalanguage as dl
 class TestExecutionBaseDL(unittest.TestCase):
     """Test execution base for Deltalanguage's ``DeltaPySimulator``,
     defines method for executing and checking test graphs.
+
+    Attributes
+    ----------
+    simulator_kwargs : dict
+        Keyword arguments passed to ``DeltaPySimulator``, subclasses can use
+        them to run the same tests with different settings.
     """
 
+    simulator_kwargs = {}
+
     def setUp(self):
         dl.DeltaGraph.clean_stack()
         self.files = []
@@ -46,9 +54,9 @@ class TestExecutionBaseDL(unittest.TestCase):
 
         if exception:
             with self.assertRaises(exception):
-                dl.DeltaPySimulator(graph).run()
+                dl.DeltaPySimulator(graph, **self.simulator_kwargs).run()
         else:
-            dl.DeltaPySimulator(graph).run()
+            dl.DeltaPySimulator(graph, **self.simulator_kwargs).run()
 
         if expect:
             self.assertMultiLineEqual(
@@ -2,28 +2,115 @@
 runtimes and runtime simulators.
 
 Note that performance benchmarks depend on hardware, thus if any of processing
-units is updated the performance might benchmarks should too.
+units is updated the performance benchmarks should be too.
 
-Proposed topics:
+The graphs are the workloads of :py:mod:`deltalanguage.bench`, which measures
+the time, messages per second, latency per hop and peak RSS of each of them.
+Here they are executed at a small scale to check that they still run.
+To measure and compare the performance run:
 
-- time as metrics (MOVE from test_blocking.py)
-  - speed tests with a lot of messages
-  - how queue blocking work
+.. code-block:: console
 
-- number of messages as metrics
-  - we don't have them yet
+    python -m deltalanguage.bench --output baseline.json
+    python -m deltalanguage.bench --compare baseline.json
 """
 
+import sys
 import unittest
 
-import deltalanguage as dl
-
+from deltalanguage.bench import WORKLOADS, compare, run_workload
 from deltalanguage.test.execution.base import TestExecutionBaseDL
+from deltalanguage.wiring import DeltaGraph
+
+
+def executed_lines(fn) -> int:
+    """Number of lines of Python executed by ``fn``, a measure of its work
+    which does not depend on the machine.
+    """
+    count = 0
+
+    def trace(frame, event, arg):
+        nonlocal count
+        if event == "line":
+            count += 1
+        return trace
+
+    sys.settrace(trace)
+    try:
+        fn()
+    finally:
+        sys.settrace(None)
+    return count
 
 
 class TestExecutionPerformance(TestExecutionBaseDL):
 
-    pass
+    scale = 0.02
+
+    def check_workload(self, name):
+        result = run_workload(name, self.scale, self.simulator_kwargs)
+
+        self.assertGreater(result["seconds"], 0)
+        self.assertGreater(result["msgs_per_sec"], 0)
+        self.assertGreater(result["latency_p50_us"], 0)
+        self.assertGreaterEqual(result["latency_p99_us"],
+                                result["latency_p50_us"])
+        return result
+
+    def test_chain(self):
+        result = self.check_workload("chain")
+        self.assertEqual(result["messages"], result["size"] * 11)
+
+    def test_fan_out(self):
+        self.check_workload("fan_out")
+
+    def test_fan_in(self):
+        self.check_workload("fan_in")
+
+    def test_const_heavy(self):
+        self.check_workload("const_heavy")
+
+    def test_migen(self):
+        self.check_workload("migen")
+
+    def test_serialisation(self):
+        result = run_workload("serialisation", self.scale)
+        self.assertEqual(result["size"], 200)
+        self.assertIsNone(result["msgs_per_sec"])
+        self.assertIsNone(result["latency_p50_us"])
+
+    def test_serialisation_linear(self):
+        """The work per node does not grow with the size of the graph,
+        it would grow 4 times if serialisation was quadratic.
+        """
+        builder, _ = WORKLOADS["serialisation"]
+        lines = []
+        for nodes in (100, 400):
+            DeltaGraph.clean_stack()
+            lines.append(executed_lines(builder(nodes=nodes).run) / nodes)
+        self.assertLess(lines[1], 1.5 * lines[0])
+
+
+class TestBenchComparison(unittest.TestCase):
+
+    def test_regressions(self):
+        baseline = {"results": {
+            "chain": {"size": 10, "seconds": 1.0, "msgs_per_sec": 100.0},
+            "fan_in": {"size": 10, "seconds": 1.0, "msgs_per_sec": 100.0},
+            "migen": {"size": 10, "seconds": 1.0},
+        }}
+        current = {"results": {
+            "chain": {"size": 10, "seconds": 1.05, "msgs_per_sec": 80.0},
+            "fan_in": {"size": 20, "seconds": 2.0, "msgs_per_sec": 50.0},
+            "migen": {"size": 10, "seconds": 0.5},
+            "serialisation": {"size": 10, "seconds": 2.0},
+        }}
+
+        self.assertEqual(compare(baseline, current, threshold=0.1),
+                         [("chain", "msgs_per_sec", 100.0, 80.0)])
+        self.assertEqual(compare(baseline, current, threshold=0.01),
+                         [("chain", "seconds", 1.0, 1.05),
+                          ("chain", "msgs_per_sec", 100.0, 80.0)])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,193 @@
+"""Test DeltaPySimulator with the asyncio scheduler.
+
+The execution tests are reused with ``scheduler="asyncio"``.
+"""
+
+import threading
+import time
+import unittest
+
+import deltalanguage as dl
+from deltalanguage.test import execution
+from deltalanguage.test._node_lib import add_non_const
+
+
+class AsyncioMixin:
+
+    simulator_kwargs = {"scheduler": "asyncio"}
+
+
+class TestAsyncioPyFuncBody(AsyncioMixin, execution.TestExecutionPyFuncBody):
+    pass
+
+
+class TestAsyncioPyInteractiveBody(
+        AsyncioMixin, execution.TestExecutionPyInteractiveBody):
+    pass
+
+
+class TestAsyncioPyInteractiveBodySend(
+        AsyncioMixin, execution.TestExecutionPyInteractiveBodySend):
+    pass
+
+
+class TestAsyncioPyMigenBody(AsyncioMixin,
+                             execution.TestExecutionPyMigenBody):
+    pass
+
+
+class TestAsyncioGeneral(AsyncioMixin, execution.TestExecutionGeneral):
+    pass
+
+
+class TestAsyncioConstantNodes(AsyncioMixin,
+                               execution.TestExecutionConstantNodes):
+    pass
+
+
+class TestAsyncioMultibodyNodes(AsyncioMixin,
+                                execution.TestExecutionMultibodyNodes):
+    pass
+
+
+class TestAsyncioMultioutput(
+        AsyncioMixin, execution.TestExecutionSplittingMultiOutputNodeTest):
+    pass
+
+
+class TestAsyncioOptionalInputs(AsyncioMixin,
+                                execution.TestExecutionOptionalInputs):
+    pass
+
+
+class TestAsyncioTypes(AsyncioMixin, execution.TestExecutionTypes):
+    pass
+
+
+@dl.Interactive(outputs=[("out", int)])
+async def async_counter(node):
+    for i in range(100):
+        await node.send(i)
+
+
+@dl.Interactive(inputs=[("a", int)], outputs=[("out", int)])
+async def async_adder(node):
+    total = 0
+    for _ in range(100):
+        total += await node.receive("a")
+    await node.send(total)
+
+
+@dl.Interactive(inputs=[("a", int)], outputs=[("out", int)])
+async def async_forward(node):
+    while True:
+        await node.send(await node.receive("a"))
+
+
+class AsyncioSchedulerTest(unittest.TestCase):
+    """Test the behaviour specific to the asyncio scheduler."""
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+
+    def test_async_interactive(self):
+        s = dl.lib.StateSaver(int)
+
+        with dl.DeltaGraph() as graph:
+            s.save_and_exit(async_adder.call(async_counter.call()))
+
+        rt = dl.DeltaPySimulator(graph, scheduler="asyncio", queue_size=2)
+        rt.run()
+        self.assertEqual(s.saved, [sum(range(100))])
+        self.assertEqual(list(rt.threads), ["scheduler"])
+
+    def test_async_interactive_threads(self):
+        """Coroutine bodies are also run by the other schedulers."""
+        for scheduler in ("threads", "cooperative"):
+            s = dl.lib.StateSaver(int)
+
+            with dl.DeltaGraph() as graph:
+                s.save_and_exit(async_adder.call(async_counter.call()))
+
+            dl.DeltaPySimulator(graph, scheduler=scheduler).run()
+            self.assertEqual(s.saved, [sum(range(100))])
+
+    def test_many_interactive_nodes(self):
+        """Interactive nodes do not occupy threads."""
+        s = dl.lib.StateSaver(int)
+
+        with dl.DeltaGraph() as graph:
+            n = async_counter.call()
+            for _ in range(1000):
+                n = async_forward.call(n)
+            s.save_and_exit(async_adder.call(n))
+
+        dl.DeltaPySimulator(graph, scheduler="asyncio").run()
+        self.assertEqual(s.saved, [sum(range(100))])
+
+    def test_blocking(self):
+        """Only blocking bodies are evaluated outside of the event loop."""
+        thread_names = []
+
+        @dl.DeltaBlock(allow_const=False, blocking=True)
+        def blocking_add(a: int) -> int:
+            thread_names.append(threading.current_thread().name)
+            return a + 1
+
+        @dl.DeltaBlock(allow_const=False)
+        def add(a: int) -> int:
+            thread_names.append(threading.current_thread().name)
+            return a + 1
+
+        s = dl.lib.StateSaver(int)
+
+        with dl.DeltaGraph() as graph:
+            s.save_and_exit(add(blocking_add(1)))
+
+        dl.DeltaPySimulator(graph, scheduler="asyncio").run()
+        self.assertEqual(s.saved, [3])
+        self.assertTrue(thread_names[0].startswith("Executor"))
+        self.assertEqual(thread_names[1], "Thread_scheduler")
+
+    def test_stop_latency(self):
+        """Nodes waiting for their queues are stopped without polling."""
+
+        @dl.Interactive(inputs=[("a", int)])
+        async def wait_forever(node):
+            await node.receive("a")
+
+        @dl.Interactive(inputs=[("a", int)])
+        def wait_forever_sync(node):
+            node.receive("a")
+
+        @dl.DeltaBlock(allow_const=False)
+        def nothing() -> int:
+            raise SystemExit
+
+        with dl.DeltaGraph() as graph:
+            n = nothing()
+            wait_forever.call(n)
+            wait_forever_sync.call(n)
+
+        rt = dl.DeltaPySimulator(graph, scheduler="asyncio",
+                                 queue_interval=10)
+        rt.start()
+        time.sleep(0.1)
+        start = time.perf_counter()
+        rt.stop()
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+    def test_error(self):
+        @dl.DeltaBlock(allow_const=False)
+        def broken(a: int) -> int:
+            raise ValueError("broken")
+
+        with dl.DeltaGraph() as graph:
+            broken(add_non_const(1, 2))
+
+        with self.assertRaises(RuntimeError):
+            dl.DeltaPySimulator(graph, scheduler="asyncio").run()
+
+
+if __name__ == "__main__":
+    unittest.main()
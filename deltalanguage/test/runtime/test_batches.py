@@ -0,0 +1,282 @@
+"""Test the transport of batches of messages."""
+
+from queue import Empty
+import unittest
+
+import numpy as np
+
+import deltalanguage as dl
+from deltalanguage.data_types import Array, Char, Int, Optional, Size, Str
+from deltalanguage.runtime import DeltaQueue
+from deltalanguage.runtime._queues import Flusher
+from deltalanguage._utils import QueueMessage
+from deltalanguage.wiring import InPort, OutPort, RealNode, DeltaGraph
+
+
+class TestDeltaQueueBatches(unittest.TestCase):
+    """Test batches put on DeltaQueue as single items."""
+
+    def setUp(self):
+        g = DeltaGraph()
+        self.q = DeltaQueue(OutPort('out',
+                                    Int(),
+                                    InPort(None, Int(), None, 0),
+                                    RealNode(g, [], name='node_name')),
+                            maxsize=2)
+        self.q_opt = DeltaQueue(OutPort('out',
+                                        Int(),
+                                        InPort(None, Optional(Int()), None, 0),
+                                        RealNode(g, [], name='node_name')))
+        self.q_arr = DeltaQueue(OutPort('out',
+                                        Array(Int(), Size(2)),
+                                        InPort(None,
+                                               Array(Int(), Size(2)),
+                                               None,
+                                               0),
+                                        RealNode(g, [], name='node_name')))
+
+    def test_single_item(self):
+        """A batch takes one slot and is received message by message."""
+        self.q.put_many(QueueMessage([1, 2, 3], clk=4))
+        self.q.put(QueueMessage(5, clk=6))
+        self.assertTrue(self.q.full())
+        self.assertEqual(self.q.qsize(), 2)
+
+        for val in (1, 2, 3):
+            msg = self.q.get()
+            self.assertEqual((msg.msg, msg.clk), (val, 4))
+            self.assertFalse(self.q.empty())
+        self.assertEqual(self.q.get().msg, 5)
+        self.assertTrue(self.q.empty())
+
+    def test_get_many(self):
+        self.q.put_many(QueueMessage([1, 2, 3], clk=4))
+        self.q.put(QueueMessage(5, clk=6))
+
+        msg = self.q.get_many(2)
+        self.assertEqual((msg.msg, msg.clk), ([1, 2], 4))
+        msg = self.q.get_many(10)
+        self.assertEqual((msg.msg, msg.clk), ([3, 5], 6))
+
+        with self.assertRaises(Empty):
+            self.q.get_many(10, timeout=0.01)
+
+    def test_get_many_optional(self):
+        self.assertEqual(self.q_opt.get_many(10).msg, [])
+
+    def test_flush(self):
+        """The flusher is not mixed with messages."""
+        self.q.put(QueueMessage(1))
+        Queue_put = super(DeltaQueue, self.q).put
+        Queue_put(QueueMessage(Flusher(), clk=-1))
+
+        self.assertEqual(self.q.get_many(10).msg, [1])
+        self.assertIsInstance(self.q.get_many(10).msg, Flusher)
+
+    def test_validation(self):
+        self.q.put_many(QueueMessage([1, True]))
+        self.assertEqual(self.q.validated_count, 2)
+        self.assertIs(type(self.q.get_many(2).msg[1]), int)
+
+        with self.assertRaises(TypeError):
+            self.q.put_many(QueueMessage([1, 2**40]))
+        with self.assertRaises(TypeError):
+            self.q.put_many(QueueMessage([1, None]))
+
+    def test_numpy(self):
+        """Arrays of the numpy type of the port are not validated one by
+        one and are received as Python objects."""
+        values = np.arange(5, dtype=np.int32)
+        self.q.put_many(QueueMessage(values))
+        values[0] = 10
+
+        self.assertEqual(self.q.validated_count, 0)
+        self.assertEqual(self.q.trusted_count, 5)
+        received = self.q.get_many(5).msg
+        self.assertEqual(received, [0, 1, 2, 3, 4])
+        self.assertIs(type(received[0]), int)
+
+        # other numpy types are validated
+        self.q.put_many(QueueMessage(np.arange(3, dtype=np.int64)))
+        self.assertEqual(self.q.validated_count, 3)
+
+    def test_numpy_chars(self):
+        """Arrays of characters and strings are received as strings."""
+        g = DeltaGraph()
+        for t, values in ((Char(), ['a', 'b']),
+                          (Str(Size(2)), ['ab', 'cd'])):
+            q = DeltaQueue(OutPort('out',
+                                   t,
+                                   InPort(None, t, None, 0),
+                                   RealNode(g, [], name='node_name')))
+            q.put_many(QueueMessage(np.array(
+                [t.as_numpy_object(v) for v in values],
+                dtype=t.as_numpy_type()
+            )))
+            self.assertEqual(q.trusted_count, 2)
+            self.assertEqual(q.get_many(2).msg, values)
+
+            q.put(QueueMessage(values[0]))
+            self.assertEqual(q.get().msg, values[0])
+
+    def test_numpy_compound(self):
+        values = np.array([([1, 2],), ([3, 4],)],
+                          dtype=self.q_arr._type.as_numpy_type())
+        self.q_arr.put_many(QueueMessage(values))
+        self.assertEqual(self.q_arr.get_many(2).msg, [[1, 2], [3, 4]])
+
+
+@dl.Interactive(outputs=[("out", int)])
+def batch_counter(node):
+    for i in range(10):
+        node.send_many("out", list(range(10 * i, 10 * (i + 1))))
+
+
+@dl.Interactive(inputs=[("a", int)], outputs=[("out", int)])
+def batch_adder(node):
+    total = 0
+    received = 0
+    while received < 100:
+        values = node.receive_many("a", 7)
+        total += sum(values)
+        received += len(values)
+    node.send(total)
+
+
+@dl.Interactive(outputs=[("out", int)])
+async def async_batch_counter(node):
+    for i in range(10):
+        await node.send_many("out", list(range(10 * i, 10 * (i + 1))))
+
+
+@dl.Interactive(inputs=[("a", int)], outputs=[("out", int)])
+async def async_batch_adder(node):
+    total = 0
+    received = 0
+    while received < 100:
+        values = await node.receive_many("a", 7)
+        total += sum(values)
+        received += len(values)
+    await node.send(total)
+
+
+@dl.Interactive(inputs=[("a", int)], outputs=[("out", int)])
+def adder(node):
+    total = 0
+    for _ in range(100):
+        total += node.receive("a")
+    node.send(total)
+
+
+class NodeBatchesTest(unittest.TestCase):
+    """Test send_many and receive_many of PythonNode."""
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+
+    def test_schedulers(self):
+        for scheduler in ("threads", "cooperative", "asyncio"):
+            s = dl.lib.StateSaver(int)
+
+            with dl.DeltaGraph() as graph:
+                s.save_and_exit(batch_adder.call(batch_counter.call()))
+
+            dl.DeltaPySimulator(graph, scheduler=scheduler,
+                                queue_size=2).run()
+            self.assertEqual(s.saved, [sum(range(100))])
+
+    def test_async(self):
+        for scheduler in ("threads", "asyncio"):
+            s = dl.lib.StateSaver(int)
+
+            with dl.DeltaGraph() as graph:
+                s.save_and_exit(
+                    async_batch_adder.call(async_batch_counter.call()))
+
+            dl.DeltaPySimulator(graph, scheduler=scheduler).run()
+            self.assertEqual(s.saved, [sum(range(100))])
+
+    def test_receive_single(self):
+        """Batches can be received message by message."""
+        s = dl.lib.StateSaver(int)
+
+        with dl.DeltaGraph() as graph:
+            s.save_and_exit(adder.call(batch_counter.call()))
+
+        dl.DeltaPySimulator(graph).run()
+        self.assertEqual(s.saved, [sum(range(100))])
+
+    def test_shared_memory(self):
+        """Queues that do not move batches get messages one by one."""
+        s = dl.lib.StateSaver(int)
+
+        with dl.DeltaGraph() as graph:
+            s.save_and_exit(batch_adder.call(batch_counter.call()))
+
+        dl.DeltaPySimulator(graph, channels="shared_memory").run()
+        self.assertEqual(s.saved, [sum(range(100))])
+
+    def test_invalid_port(self):
+        @dl.Interactive(outputs=[("out", int)])
+        def wrong_port(node):
+            node.send_many("output", [1])
+
+        with dl.DeltaGraph() as graph:
+            adder.call(wrong_port.call())
+
+        with self.assertRaises(RuntimeError):
+            dl.DeltaPySimulator(graph).run()
+
+
+class BatchBodyTest(unittest.TestCase):
+    """Test DeltaBlock bodies evaluated once per batch."""
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+
+    def test_batch_body(self):
+        batch_sizes = []
+
+        @dl.DeltaBlock(allow_const=False, batch_size=8)
+        def add(a: int, b: int, c: dl.Optional(int)) -> int:
+            batch_sizes.append(len(a))
+            self.assertEqual(len(a), len(b))
+            self.assertEqual(c, [None] * len(a))
+            return [x + y for x, y in zip(a, b)]
+
+        @dl.DeltaBlock(allow_const=False)
+        def nothing() -> int:
+            raise SystemExit
+
+        for scheduler in ("threads", "cooperative", "asyncio"):
+            batch_sizes.clear()
+            s = dl.lib.StateSaver(int)
+
+            with dl.DeltaGraph() as graph:
+                s.save_and_exit(adder.call(add(batch_counter.call(),
+                                               batch_counter.call(),
+                                               nothing())))
+
+            dl.DeltaPySimulator(graph, scheduler=scheduler).run()
+            self.assertEqual(s.saved, [2 * sum(range(100))])
+            self.assertEqual(sum(batch_sizes), 100)
+            self.assertLess(len(batch_sizes), 100)
+
+    def test_const(self):
+        """Batches of constants are repeated."""
+
+        @dl.DeltaBlock(allow_const=False, batch_size=8)
+        def add(a: int, b: int) -> int:
+            return [x + y for x, y in zip(a, b)]
+
+        s = dl.lib.StateSaver(int)
+
+        with dl.DeltaGraph() as graph:
+            s.save_and_exit(adder.call(add(batch_counter.call(), 1)))
+
+        dl.DeltaPySimulator(graph).run()
+        self.assertEqual(s.saved, [sum(range(100)) + 100])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -105,6 +105,39 @@ class BlockingQueueTest(unittest.TestCase):
         self.assertEqual(n.out_queues['out'].maxsize, 2)
 
 
+class StopLatencyTest(unittest.TestCase):
+    """Test that nodes blocked at full or empty queues are stopped as soon
+    as the simulation is called to stop, not after ``queue_interval``.
+    """
+
+    def test_blocked_producers(self):
+        @dl.Interactive(outputs=[('out', int)])
+        def producer(node):
+            while True:
+                node.send(1)
+
+        @dl.Interactive(inputs=[('a', int), ('b', int)],
+                        outputs=[('out', int)])
+        def consumer(node):
+            node.receive('a')
+            raise dl.DeltaRuntimeExit
+
+        @dl.Interactive(inputs=[('a', int)])
+        def waiter(node):
+            # the consumer never sends, this node waits at an empty queue
+            node.receive('a')
+
+        with dl.DeltaGraph() as graph:
+            waiter.call(a=consumer.call(a=producer.call(),
+                                        b=producer.call()))
+
+        start_time = time.time()
+        dl.DeltaPySimulator(graph, queue_size=1, queue_interval=60).run()
+        total_time = time.time() - start_time
+
+        self.assertLess(total_time, 1)
+
+
 class RuntimeBlockingTest(unittest.TestCase):
     """Test situations when the executuion of the graph can get stuck
     due to various reasons.
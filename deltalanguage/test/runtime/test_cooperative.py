@@ -0,0 +1,138 @@
+"""Test DeltaPySimulator with the cooperative scheduler.
+
+The execution tests are reused with ``scheduler="cooperative"``.
+"""
+
+import unittest
+
+import deltalanguage as dl
+from deltalanguage.test import execution
+from deltalanguage.test._node_lib import add_non_const
+
+
+class CooperativeMixin:
+
+    simulator_kwargs = {"scheduler": "cooperative"}
+
+
+class TestCooperativePyFuncBody(CooperativeMixin,
+                                execution.TestExecutionPyFuncBody):
+    pass
+
+
+class TestCooperativePyInteractiveBody(
+        CooperativeMixin, execution.TestExecutionPyInteractiveBody):
+    pass
+
+
+class TestCooperativePyInteractiveBodySend(
+        CooperativeMixin, execution.TestExecutionPyInteractiveBodySend):
+    pass
+
+
+class TestCooperativePyMigenBody(CooperativeMixin,
+                                 execution.TestExecutionPyMigenBody):
+    pass
+
+
+class TestCooperativeGeneral(CooperativeMixin,
+                             execution.TestExecutionGeneral):
+    pass
+
+
+class TestCooperativeConstantNodes(CooperativeMixin,
+                                   execution.TestExecutionConstantNodes):
+    pass
+
+
+class TestCooperativeMultibodyNodes(CooperativeMixin,
+                                    execution.TestExecutionMultibodyNodes):
+    pass
+
+
+class TestCooperativeMultioutput(
+        CooperativeMixin,
+        execution.TestExecutionSplittingMultiOutputNodeTest):
+    pass
+
+
+class TestCooperativeOptionalInputs(CooperativeMixin,
+                                    execution.TestExecutionOptionalInputs):
+    pass
+
+
+class TestCooperativeTypes(CooperativeMixin, execution.TestExecutionTypes):
+    pass
+
+
+class CooperativeSchedulerTest(unittest.TestCase):
+    """Test the behaviour specific to the cooperative scheduler."""
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+
+    def test_unknown_scheduler(self):
+        with dl.DeltaGraph() as graph:
+            add_non_const(1, 2)
+
+        with self.assertRaises(ValueError):
+            dl.DeltaPySimulator(graph, scheduler="greedy")
+
+    def test_single_thread(self):
+        """All function nodes are run by one thread."""
+        s = dl.lib.StateSaver(int)
+
+        with dl.DeltaGraph() as graph:
+            n = add_non_const(1, 2)
+            for _ in range(20):
+                n = add_non_const(n, 1)
+            s.save_and_exit(n)
+
+        rt = dl.DeltaPySimulator(graph, scheduler="cooperative")
+        rt.run()
+        self.assertEqual(s.saved, [23])
+        self.assertEqual(list(rt.threads), ["scheduler"])
+
+    def test_blocked_graph(self):
+        """The simulation stops if no node can make progress."""
+
+        @dl.Interactive(inputs=[("a", int)])
+        def wait_forever(node):
+            node.receive("a")
+
+        @dl.DeltaBlock(allow_const=False)
+        def nothing() -> int:
+            raise SystemExit
+
+        with dl.DeltaGraph() as graph:
+            wait_forever.call(nothing())
+
+        dl.DeltaPySimulator(graph, scheduler="cooperative").run()
+
+    def test_interactive_ping_pong(self):
+        """Two interactive nodes exchange messages via full queues."""
+
+        @dl.Interactive(outputs=[("out", int)])
+        def ping(node):
+            for i in range(100):
+                node.send(i)
+
+        @dl.Interactive(inputs=[("a", int)], outputs=[("out", int)])
+        def pong(node):
+            total = 0
+            for _ in range(100):
+                total += node.receive("a")
+            node.send(total)
+
+        s = dl.lib.StateSaver(int)
+
+        with dl.DeltaGraph() as graph:
+            s.save_and_exit(pong.call(ping.call()))
+
+        dl.DeltaPySimulator(graph, scheduler="cooperative",
+                            queue_size=2).run()
+        self.assertEqual(s.saved, [sum(range(100))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,11 @@
 import logging
+import os
+import tempfile
+import threading
 import unittest
 
 import deltalanguage as dl
+from deltalanguage._utils import QueueMessage
 
 from deltalanguage.test._node_lib import (add_non_const,
                                           forward_non_const,
@@ -49,6 +53,90 @@ class MessageLogTest(unittest.TestCase):
 
         self.assertEqual(message_times, [])
 
+    def test_maxlen(self):
+        """Only the last messages are kept."""
+        rt = dl.DeltaPySimulator(self.test_graph, msg_lvl=logging.INFO,
+                                 msg_log_size=3)
+        rt.run()
+
+        self.assertEqual(len(rt.msg_log.messages), 3)
+        self.assertEqual([msg.msg for _, _, msg in rt.msg_log.messages][-1],
+                         10)
+
+    def test_sampling(self):
+        """Only one in N messages is kept."""
+        rt = dl.DeltaPySimulator(self.test_graph, msg_lvl=logging.INFO)
+        rt.run()
+        n_all = len(rt.msg_log.messages)
+
+        self.setUp()
+        rt = dl.DeltaPySimulator(self.test_graph, msg_lvl=logging.INFO,
+                                 msg_log_sampling=4)
+        rt.run()
+        self.assertEqual(len(rt.msg_log.messages), (n_all + 3) // 4)
+
+    def test_sampling_threads(self):
+        """Messages logged concurrently are sampled exactly."""
+        msg_log = dl.logging.MessageLog(lvl=logging.INFO, sampling=4)
+
+        def log():
+            for i in range(1000):
+                msg_log.add_message("node", "out", QueueMessage(i, clk=i))
+
+        threads = [threading.Thread(target=log) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(msg_log.messages), 2000)
+
+    def test_path(self):
+        """Messages are written to the file and read back in clock order."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "messages.bin")
+            rt = dl.DeltaPySimulator(self.test_graph, msg_lvl=logging.INFO,
+                                     msg_log_path=path)
+            rt.msg_log.run_size = 4
+            rt.run()
+
+            self.assertEqual(rt.msg_log.messages, [])
+            messages = list(dl.logging.read_message_log(path))
+
+        saved = [msg.msg for node, _, msg in messages
+                 if node.startswith("save")]
+        self.assertEqual(saved, list(range(11)))
+        message_times = [msg.clk for _, _, msg in messages]
+        self.assertEqual(message_times, sorted(message_times))
+
+
+class MessageLogModesTest(unittest.TestCase):
+    """Test the modes of MessageLog without a simulation."""
+
+    def test_run_merge(self):
+        """Runs written out of order are merged by clock."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "messages.bin")
+            msg_log = dl.logging.MessageLog(logging.INFO, path=path,
+                                            run_size=3)
+            for clk in (5, 1, 3, 2, 6, 4, 0):
+                msg_log.add_message("node_0", "a", QueueMessage(clk, clk),
+                                    dl.Int())
+            msg_log.add_message("node_1", "b", QueueMessage([1, 2], 7))
+            msg_log.close()
+
+            messages = list(dl.logging.read_message_log(path))
+
+        self.assertEqual([msg.clk for _, _, msg in messages], list(range(8)))
+        self.assertEqual([msg.msg for _, _, msg in messages][:7],
+                         list(range(7)))
+        self.assertEqual(messages[-1][:2], ("node_1", "b"))
+        self.assertEqual(messages[-1][2].msg, [1, 2])
+
+    def test_invalid_sampling(self):
+        with self.assertRaises(ValueError):
+            dl.logging.MessageLog(sampling=0)
+
 
 if __name__ == "__main__":
     unittest.main()
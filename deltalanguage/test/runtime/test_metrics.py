@@ -0,0 +1,108 @@
+"""Test the counters of nodes and queues of DeltaPySimulator."""
+
+import time
+import unittest
+
+import deltalanguage as dl
+from deltalanguage.runtime import DeltaQueue
+
+
+@dl.Interactive(outputs=[("out", int)])
+def count(node):
+    for i in range(50):
+        node.send(i)
+
+
+@dl.DeltaBlock(allow_const=False)
+def increment(a: int) -> int:
+    return a + 1
+
+
+@dl.Interactive(inputs=[("a", int)])
+def slow_sink(node):
+    for _ in range(50):
+        node.receive("a")
+        time.sleep(0.002)
+    raise dl.DeltaRuntimeExit
+
+
+class DeltaPySimulatorMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+        with dl.DeltaGraph() as graph:
+            slow_sink.call(increment(count.call()))
+        self.graph = graph
+        self.names = [node.full_name for node in graph.nodes]
+
+    def test_counters(self):
+        for scheduler in ("threads", "cooperative", "asyncio"):
+            rt = dl.DeltaPySimulator(self.graph,
+                                     scheduler=scheduler,
+                                     queue_size=2,
+                                     queue_interval=1e-3,
+                                     metrics=True)
+            rt.run()
+            metrics = rt.metrics()
+
+            nodes = metrics["nodes"]
+            self.assertEqual(list(nodes), self.names)
+            self.assertEqual(nodes[self.names[0]]["messages_out"], 50)
+            self.assertEqual(nodes[self.names[1]]["messages_in"], 50)
+            self.assertEqual(nodes[self.names[1]]["messages_out"], 50)
+            self.assertEqual(nodes[self.names[2]]["messages_in"], 50)
+            for counters in nodes.values():
+                for name in ("time_body", "time_get", "time_put"):
+                    self.assertGreaterEqual(counters[name], 0)
+
+            # the sink is the bottleneck
+            self.assertGreater(nodes[self.names[2]]["time_body"], 0.05)
+
+            self.assertEqual(len(metrics["queues"]), 2)
+            for queue in metrics["queues"].values():
+                self.assertIn(queue["high_water_mark"], (1, 2))
+                self.assertLessEqual(queue["depth"], 2)
+
+    def test_full_retries(self):
+        rt = dl.DeltaPySimulator(self.graph,
+                                 queue_size=1,
+                                 queue_interval=1e-4,
+                                 metrics=True)
+        rt.run()
+        nodes = rt.metrics()["nodes"]
+        self.assertGreater(nodes[self.names[1]]["full_retries"], 0)
+        self.assertGreater(nodes[self.names[1]]["time_put"], 0.01)
+
+    def test_sampling(self):
+        """Times are sampled, the numbers of messages are exact."""
+        rt = dl.DeltaPySimulator(self.graph, metrics=True, metrics_sampling=7)
+        rt.run()
+        nodes = rt.metrics()["nodes"]
+        self.assertEqual(nodes[self.names[0]]["messages_out"], 50)
+        self.assertEqual(nodes[self.names[2]]["messages_in"], 50)
+        self.assertGreater(nodes[self.names[2]]["time_body"], 0)
+
+        with self.assertRaises(ValueError):
+            dl.DeltaPySimulator(self.graph, metrics=True, metrics_sampling=0)
+
+    def test_disabled(self):
+        """Without metrics the nodes use the queues and their methods
+        directly, even after a simulation with metrics.
+        """
+        dl.DeltaPySimulator(self.graph, metrics=True)
+        rt = dl.DeltaPySimulator(self.graph)
+        for node in self.graph.nodes:
+            for queue in node.in_queues.values():
+                self.assertIsInstance(queue, DeltaQueue)
+            self.assertNotIn("run_step", vars(node))
+            self.assertNotIn("thread_worker", vars(node))
+        rt.run()
+
+        metrics = rt.metrics()
+        self.assertEqual(metrics["nodes"], {})
+        for queue in metrics["queues"].values():
+            self.assertIsNone(queue["high_water_mark"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,296 @@
+"""Test DeltaProcessSimulator and the shared memory queues it uses."""
+
+import os
+from queue import Empty, Full
+import tempfile
+import unittest
+
+import deltalanguage as dl
+from deltalanguage.runtime import (DeltaProcessSimulator,
+                                   DeltaRuntimeExit,
+                                   RingBuffer,
+                                   SharedMemoryQueue,
+                                   partition_graph)
+from deltalanguage.runtime._process_runtime import _const_replicas
+from deltalanguage.wiring import InPort, Latency, OutPort, RealNode
+from deltalanguage._utils import QueueMessage
+from deltalanguage.runtime._queues import Flusher
+from deltalanguage.test._node_lib import MigenIncrementer
+
+
+@dl.DeltaBlock(allow_const=False)
+def increment(a: int) -> int:
+    return a + 1
+
+
+@dl.DeltaBlock(allow_const=False, latency=Latency(time=1000))
+def slow_increment(a: int) -> int:
+    return a + 1
+
+
+@dl.Interactive(outputs=[("out", int)])
+def count(node):
+    for i in range(20):
+        node.send(i)
+
+
+@dl.DeltaBlock(allow_const=False)
+def save_last(a: int, path: dl.Str()) -> dl.Void:
+    if a == 19 + 3:
+        with open(path, "w") as f:
+            f.write(f"{a} {os.getpid()}")
+        raise DeltaRuntimeExit
+
+
+@dl.DeltaBlock(allow_const=False)
+def save_incremented(a: int, path: dl.Str()) -> dl.Void:
+    # the first output of the incrementer is 0
+    if a > 0:
+        with open(path, "w") as f:
+            f.write(f"{a} {os.getpid()}")
+        raise DeltaRuntimeExit
+
+
+@dl.DeltaBlock()
+def three() -> int:
+    return 3
+
+
+@dl.DeltaBlock(allow_const=False, latency=Latency(time=1000))
+def slow_add(a: int, b: int) -> int:
+    return a + b
+
+
+@dl.DeltaBlock(allow_const=False)
+def save_pair(a: int, b: int, path: dl.Str()) -> dl.Void:
+    if a == 19 + 3:
+        with open(path, "w") as f:
+            f.write(f"{a} {b}")
+        raise DeltaRuntimeExit
+
+
+@dl.DeltaBlock(allow_const=False)
+def broken(a: int) -> dl.Void:
+    raise ValueError("broken")
+
+
+class PartitionGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+
+    def test_balanced(self):
+        """Nodes with large latencies are spread across the processes."""
+        with dl.DeltaGraph() as graph:
+            n = count.call()
+            for _ in range(4):
+                n = slow_increment(n)
+
+        partitions = partition_graph(graph, 4)
+        slow = [partitions[node.full_name] for node in graph.nodes
+                if node.name.startswith("slow_increment")]
+        self.assertEqual(sorted(slow), [0, 1, 2, 3])
+
+    def test_constants_grouped(self):
+        """Constant nodes are placed with their destinations."""
+        with dl.DeltaGraph() as graph:
+            n = increment(count.call())
+            save_last(n, "/tmp/nowhere")
+
+        partitions = partition_graph(graph, 4)
+        const = graph.find_node_by_name("node")
+        save = graph.find_node_by_name("save_last")
+        self.assertEqual(partitions[const.full_name],
+                         partitions[save.full_name])
+        self.assertEqual(sorted(set(partitions.values())),
+                         list(range(len(set(partitions.values())))))
+
+    def test_shared_constant(self):
+        """A constant sent to independent chains does not join them."""
+        with dl.DeltaGraph() as graph:
+            offset = three()
+            slow_add(count.call(), offset)
+            slow_add(count.call(), offset)
+
+        partitions = partition_graph(graph, 2)
+        slow = [partitions[node.full_name] for node in graph.nodes
+                if node.name.startswith("slow_add")]
+        self.assertEqual(sorted(slow), [0, 1])
+
+        # the constant is sent to both by a constant splitter
+        self.assertIn({0, 1}, _const_replicas(graph, partitions).values())
+
+    def test_placement(self):
+        with dl.DeltaGraph() as graph:
+            n = count.call()
+            increment(increment(n))
+
+        names = [node.full_name for node in graph.nodes]
+        partitions = partition_graph(graph, 2, {names[0]: 1,
+                                                names[1]: 1,
+                                                names[2]: 0})
+        self.assertEqual([partitions[node.full_name]
+                          for node in graph.nodes], [1, 1, 0])
+
+        with self.assertRaises(ValueError):
+            partition_graph(graph, 2, {names[0]: 2})
+
+    def test_placement_conflict(self):
+        with dl.DeltaGraph() as graph:
+            save_last(increment(count.call()), "/tmp/nowhere")
+
+        const = graph.find_node_by_name("node")
+        save = graph.find_node_by_name("save_last")
+        with self.assertRaises(ValueError):
+            partition_graph(graph, 2, {const.full_name: 0,
+                                       save.full_name: 1})
+
+
+class SharedMemoryQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.out_port = OutPort(
+            'out',
+            dl.Int(),
+            InPort(None, dl.Int(), None, 0),
+            RealNode(dl.DeltaGraph(), [], name='node_name'),
+        )
+
+    def test_ring_buffer(self):
+        ring = RingBuffer(4, 2)
+        try:
+            self.assertTrue(ring.try_put(b"abcd"))
+            self.assertTrue(ring.try_put(b"efgh"))
+            self.assertFalse(ring.try_put(b"ijkl"))
+            self.assertEqual(len(ring), 2)
+
+            # a copy attached to the same memory
+            other = RingBuffer(4, 2, ring.path)
+            self.assertEqual(other.try_get(), b"abcd")
+            self.assertEqual(ring.try_get(), b"efgh")
+            self.assertIsNone(ring.try_get())
+            other.release()
+        finally:
+            ring.release()
+        self.assertFalse(os.path.exists(ring.path))
+
+    def test_put_get(self):
+        q = SharedMemoryQueue(self.out_port, maxsize=2)
+        try:
+            q.put(QueueMessage(1, clk=5))
+            q.put(QueueMessage(-2, clk=6))
+            with self.assertRaises(Full):
+                q.put(QueueMessage(3), timeout=0.01)
+            self.assertEqual(q.qsize(), 2)
+
+            msg = q.get()
+            self.assertEqual((msg.msg, msg.clk), (1, 5))
+            msg = q.get()
+            self.assertEqual((msg.msg, msg.clk), (-2, 6))
+            with self.assertRaises(Empty):
+                q.get(timeout=0.01)
+        finally:
+            q.ring.release()
+
+    def test_type_error(self):
+        q = SharedMemoryQueue(self.out_port)
+        try:
+            with self.assertRaises(TypeError):
+                q.put(QueueMessage(2**40))
+        finally:
+            q.ring.release()
+
+    def test_flush(self):
+        q = SharedMemoryQueue(self.out_port)
+        try:
+            q.flush()
+            self.assertIsInstance(q.get().msg, Flusher)
+            with self.assertRaises(Full):
+                for _ in range(q.ring.slots + 1):
+                    q.put(QueueMessage(1))
+        finally:
+            q.ring.release()
+
+
+class DeltaProcessSimulatorTest(unittest.TestCase):
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_run(self):
+        with dl.DeltaGraph() as graph:
+            n = count.call()
+            for _ in range(3):
+                n = increment(n)
+            save_last(n, self.path)
+
+        rt = DeltaProcessSimulator(graph, processes=3)
+        rt.start()
+        paths = [ring.path for ring in rt.rings.values()]
+        rt.sig_stop.wait()
+        rt.stop()
+        self.assertEqual(len(set(rt.partitions.values())), 3)
+
+        with open(self.path) as f:
+            result, pid = f.read().split()
+        self.assertEqual(result, "22")
+        self.assertNotEqual(int(pid), os.getpid())
+        self.assertTrue(paths)
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+
+    def test_migen(self):
+        """Migen bodies are shipped to the processes as Python objects."""
+        with dl.DeltaGraph() as graph:
+            incrementer = MigenIncrementer(name="incrementer")
+            save_incremented(incrementer.call(i1=count.call()).o1,
+                             self.path)
+
+        DeltaProcessSimulator(graph, processes=2).run()
+
+        with open(self.path) as f:
+            result, pid = f.read().split()
+        self.assertIn(int(result), range(1, 21))
+        self.assertNotEqual(int(pid), os.getpid())
+
+    def test_shared_constant(self):
+        """Each process runs the constants its nodes receive."""
+        with dl.DeltaGraph() as graph:
+            offset = three()
+            a = slow_add(count.call(), offset)
+            b = slow_add(count.call(), offset)
+            save_pair(a, b, self.path)
+
+        rt = DeltaProcessSimulator(graph,
+                                   processes=2,
+                                   placement={a.full_name: 0,
+                                              b.full_name: 1})
+        rt.run()
+        self.assertFalse(any(out_port.name in rt.rings
+                             for node in graph.nodes if node.is_const()
+                             for out_port in node.out_ports))
+
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "22 22")
+
+    def test_error(self):
+        with dl.DeltaGraph() as graph:
+            broken(increment(count.call()))
+
+        with self.assertRaises(RuntimeError) as cm:
+            DeltaProcessSimulator(graph, processes=2).run()
+        self.assertIn("broken", str(cm.exception))
+
+    def test_timeout(self):
+        with dl.DeltaGraph() as graph:
+            increment(count.call())
+
+        DeltaProcessSimulator(graph, processes=2).run(timeout=0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
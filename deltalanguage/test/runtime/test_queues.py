@@ -1,9 +1,19 @@
+from copy import copy, deepcopy
 from queue import Empty, Full
+import statistics
+import threading
+import time
 import unittest
 
-from deltalanguage.data_types import Optional, Int
-from deltalanguage.runtime import ConstQueue, DeltaQueue
-from deltalanguage.runtime._queues import Flusher
+import attr
+import numpy as np
+
+from deltalanguage.data_types import Array, Optional, Int, Record, Size
+from deltalanguage.runtime import (ConstMutationWarning,
+                                   ConstQueue,
+                                   DeltaQueue,
+                                   FrozenList)
+from deltalanguage.runtime._queues import Flusher, freeze
 from deltalanguage._utils import QueueMessage
 from deltalanguage.wiring import InPort, OutPort, RealNode, DeltaGraph
 
@@ -174,5 +184,218 @@ class TestDeltaQueue(unittest.TestCase):
             self.assertEqual(q.get(), self.msg1_answer)
 
 
+class TestDeltaQueueStop(unittest.TestCase):
+    """Test that flush wakes the threads blocked at a DeltaQueue
+    immediately, instead of after queue_interval.
+    """
+
+    def setUp(self):
+        g = DeltaGraph()
+        self.out_port = OutPort(
+            'out',
+            Int(),
+            InPort(None, Int(), None, 0),
+            RealNode(g, [], name='node_name'),
+        )
+
+    def wake_latency(self, blocked, samples: int = 9) -> float:
+        """Median time between the flush of ``self.queue`` and the return of
+        ``blocked``, which waits for the queue on another thread.
+
+        A single wake-up can be delayed by the scheduling of the OS, thus
+        the median of several ones, each with a new queue, is measured.
+        """
+        latencies = []
+        for _ in range(samples):
+            self.queue = DeltaQueue(self.out_port,
+                                    maxsize=1,
+                                    queue_interval=60.0)
+            returned = []
+            thread = threading.Thread(
+                target=lambda: returned.append((blocked(),
+                                                time.perf_counter()))
+            )
+            thread.start()
+            time.sleep(0.01)
+            self.assertTrue(thread.is_alive())
+
+            flushed = time.perf_counter()
+            self.queue.flush()
+            thread.join(timeout=5.0)
+            self.assertFalse(thread.is_alive())
+            self.assertTrue(returned[0][0])
+            latencies.append(returned[0][1] - flushed)
+
+        return statistics.median(latencies)
+
+    def test_wake_get(self):
+        latency = self.wake_latency(
+            lambda: isinstance(self.queue.get().msg, Flusher)
+        )
+        self.assertLess(latency, 1e-3)
+        self.assertIsInstance(self.queue.get().msg, Flusher)
+
+    def test_wake_put(self):
+        def blocked():
+            self.queue.put(QueueMessage(1))
+            try:
+                self.queue.put(QueueMessage(2))
+            except Full:
+                return True
+            return False
+
+        latency = self.wake_latency(blocked)
+        self.assertLess(latency, 1e-3)
+
+        # the queued message is kept
+        self.assertEqual(self.queue.get(), QueueMessage(1))
+
+
+class TestDeltaQueueValidation(unittest.TestCase):
+    """Test the validation modes of DeltaQueue."""
+
+    def setUp(self):
+        g = DeltaGraph()
+        self.out_port = OutPort(
+            'out',
+            Int(),
+            InPort(None, Int(), None, 0),
+            RealNode(g, [], name='node_name'),
+        )
+        self.out_port_arr = OutPort(
+            'out',
+            Array(Int(), Size(2)),
+            InPort(None, Array(Int(), Size(2)), None, 0),
+            RealNode(g, [], name='node_name'),
+        )
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            DeltaQueue(self.out_port, validation="lazy")
+
+    def test_strict(self):
+        """All messages are validated."""
+        q = DeltaQueue(self.out_port)
+        for _ in range(5):
+            q.put(QueueMessage(1))
+        self.assertEqual(q.validated_count, 5)
+        self.assertEqual(q.trusted_count, 0)
+
+    def test_sample(self):
+        """Only the first messages are validated."""
+        q = DeltaQueue(self.out_port, validation="sample",
+                       validation_samples=3)
+        for _ in range(5):
+            q.put(QueueMessage(1))
+        self.assertEqual(q.validated_count, 3)
+        self.assertEqual(q.trusted_count, 2)
+
+    def test_trusted(self):
+        """Messages of the annotated type are trusted, others are validated
+        and converted."""
+        q = DeltaQueue(self.out_port, validation="trusted")
+        q.put(QueueMessage(1))
+        q.put(QueueMessage(True))
+        self.assertEqual(q.validated_count, 1)
+        self.assertEqual(q.trusted_count, 1)
+        self.assertIs(type(q.get().msg), int)
+        self.assertIs(type(q.get().msg), int)
+
+        with self.assertRaises(TypeError):
+            q.put(QueueMessage("abcde"))
+
+    def test_trusted_compound(self):
+        """Mutable compound messages are always validated."""
+        q = DeltaQueue(self.out_port_arr, validation="trusted")
+        msg = [1, 2]
+        q.put(QueueMessage(msg))
+        self.assertEqual(q.validated_count, 1)
+        self.assertEqual(q.trusted_count, 0)
+        self.assertIsNot(q.get().msg, msg)
+
+
+@attr.s(slots=True)
+class Point:
+
+    x: int = attr.ib()
+    y: Array(Int(), Size(2)) = attr.ib()
+
+
+class TestConstQueueFreeze(unittest.TestCase):
+    """Test that ConstQueue shares a frozen message instead of copying it."""
+
+    def setUp(self):
+        self.g = DeltaGraph()
+
+    def make_queue(self, t, **kwargs):
+        return ConstQueue(OutPort('out',
+                                  t,
+                                  InPort(None, t, None, 0),
+                                  RealNode(self.g, [], name='node_name')),
+                          **kwargs)
+
+    def test_array(self):
+        q = self.make_queue(Array(Array(Int(), Size(2)), Size(2)))
+        q.put(QueueMessage([[1, 2], [3, 4]]))
+
+        msg = q.get().msg
+        self.assertIs(q.get().msg, msg)
+        self.assertIsInstance(msg, FrozenList)
+        self.assertEqual(msg, [[1, 2], [3, 4]])
+
+        with self.assertWarns(ConstMutationWarning):
+            with self.assertRaises(TypeError):
+                msg[1].append(5)
+        self.assertEqual(q.get().msg, [[1, 2], [3, 4]])
+
+        # copies can be modified
+        copied = copy(msg)
+        copied.append([5, 6])
+        self.assertEqual(copied, [[1, 2], [3, 4], [5, 6]])
+        copied = deepcopy(msg)
+        copied[1].append(5)
+        self.assertEqual(copied, [[1, 2], [3, 4, 5]])
+        self.assertEqual(q.get().msg, [[1, 2], [3, 4]])
+
+    def test_numpy(self):
+        msg = freeze(np.array([1, 2, 3]))
+        with self.assertRaises(ValueError):
+            msg[0] = 5
+        with self.assertRaises(ValueError):
+            msg.setflags(write=True)
+
+    def test_record(self):
+        q = self.make_queue(Record(Point))
+        q.put(QueueMessage(Point(x=1, y=[2, 3])))
+
+        msg = q.get().msg
+        self.assertIsInstance(msg, Point)
+        self.assertEqual(msg, Point(x=1, y=[2, 3]))
+        self.assertEqual(Point(x=1, y=[2, 3]), msg)
+        self.assertNotEqual(msg, Point(x=2, y=[2, 3]))
+
+        with self.assertWarns(ConstMutationWarning):
+            with self.assertRaises(TypeError):
+                msg.x = 5
+        with self.assertWarns(ConstMutationWarning):
+            with self.assertRaises(TypeError):
+                msg.y.append(5)
+
+        # copies can be modified
+        copied = deepcopy(msg)
+        copied.x = 5
+        copied.y.append(4)
+        self.assertEqual(copied, Point(x=5, y=[2, 3, 4]))
+
+    def test_copy_on_read(self):
+        q = self.make_queue(Array(Int(), Size(2)), copy_on_read=True)
+        q.put(QueueMessage([1, 2]))
+
+        msg = q.get().msg
+        self.assertIsNot(q.get().msg, msg)
+        msg.append(3)
+        self.assertEqual(q.get().msg, [1, 2])
+
+
 if __name__ == "__main__":
     unittest.main()
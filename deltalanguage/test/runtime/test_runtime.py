@@ -3,9 +3,11 @@
 import unittest
 
 import deltalanguage as dl
+from deltalanguage.test._node_lib import add_non_const
 
 from deltalanguage.test._graph_lib import (getg_const_chain,
-                                           getg_optional_queues)
+                                           getg_optional_queues,
+                                           getg_PyFunc_body_graph)
 
 
 class DeltaQueueCreationTest(unittest.TestCase):
@@ -38,5 +40,95 @@ class DeltaQueueCreationTest(unittest.TestCase):
         self.assertEqual(graph.nodes[1].out_queues['output'].optional, False)
 
 
+class DeltaQueueValidationTest(unittest.TestCase):
+    """Test that the simulator passes the validation mode to the queues."""
+
+    def test_validation_stats(self):
+        graph = getg_PyFunc_body_graph()
+        rt = dl.DeltaPySimulator(graph, validation="trusted")
+        rt.run()
+
+        stats = rt.validation_stats()
+        self.assertEqual(len(stats), 3)
+        stats_add = stats[str(graph.nodes[2].out_ports[0].name)]
+        self.assertEqual(stats_add["validated"], 0)
+        self.assertGreaterEqual(stats_add["trusted"], 1)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            dl.DeltaPySimulator(getg_PyFunc_body_graph(), validation="lazy")
+
+
+class DispatchPlanTest(unittest.TestCase):
+    """Test the plans used by the nodes to receive and send messages."""
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+
+    def test_plan(self):
+        graph = getg_optional_queues()
+        dl.DeltaPySimulator(graph)
+        node = graph.nodes[2]
+
+        self.assertEqual(node._compulsory_names, ("n2",))
+        self.assertEqual(node._optional_names, ("n1",))
+        names, in_queues, compulsory = node._receive_plans[()]
+        self.assertEqual(names, ("n1", "n2"))
+        self.assertEqual(in_queues, (node.in_queues["n1"],
+                                     node.in_queues["n2"]))
+        self.assertEqual(compulsory, (node.in_queues["n2"],))
+        self.assertEqual(node._out_plan,
+                         (("output", node.out_queues["output"]),))
+        self.assertFalse(node._log_io)
+        self.assertFalse(node._log_messages)
+
+    def test_selected_inputs(self):
+        s = dl.lib.StateSaver(int)
+
+        @dl.Interactive(inputs=[("a", int), ("b", int)],
+                        outputs=[("output", int)])
+        def diff(node):
+            b = node.receive("b")
+            a = node.receive("a")
+            node.send(a - b)
+
+        with dl.DeltaGraph() as graph:
+            s.save_and_exit(diff.call(a=add_non_const(5, 3), b=2))
+
+        dl.DeltaPySimulator(graph).run()
+        self.assertEqual(s.saved, [6])
+
+
+class ConstCopyOnReadTest(unittest.TestCase):
+    """Test that constant messages are shared unless copied on read."""
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+
+    def graph(self):
+        s = dl.lib.StateSaver(int)
+
+        @dl.DeltaBlock(allow_const=False)
+        def append_sum(a: dl.Array(int, dl.Size(2)), b: int) -> int:
+            a.append(b)
+            return sum(a)
+
+        with dl.DeltaGraph() as graph:
+            s.save_and_exit(append_sum([1, 2], b=add_non_const(1, 2)))
+
+        return graph, s
+
+    def test_frozen(self):
+        graph, _ = self.graph()
+        with self.assertWarns(dl.runtime.ConstMutationWarning):
+            with self.assertRaises(RuntimeError):
+                dl.DeltaPySimulator(graph).run()
+
+    def test_copy_on_read(self):
+        graph, s = self.graph()
+        dl.DeltaPySimulator(graph, copy_on_read=True).run()
+        self.assertEqual(s.saved, [6])
+
+
 if __name__ == "__main__":
     unittest.main()
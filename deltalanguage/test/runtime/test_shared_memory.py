@@ -0,0 +1,115 @@
+"""Test DeltaPySimulator with shared memory channels.
+
+The execution tests are reused with ``channels="shared_memory"``.
+"""
+
+import unittest
+
+import deltalanguage as dl
+from deltalanguage.runtime import DeltaQueue, SharedMemoryQueue
+from deltalanguage.test import execution
+from deltalanguage.test._node_lib import add_non_const
+
+
+class SharedMemoryMixin:
+
+    simulator_kwargs = {"channels": "shared_memory"}
+
+
+class TestSharedMemoryPyFuncBody(SharedMemoryMixin,
+                                 execution.TestExecutionPyFuncBody):
+    pass
+
+
+class TestSharedMemoryPyInteractiveBody(
+        SharedMemoryMixin, execution.TestExecutionPyInteractiveBody):
+    pass
+
+
+class TestSharedMemoryPyInteractiveBodySend(
+        SharedMemoryMixin, execution.TestExecutionPyInteractiveBodySend):
+    pass
+
+
+class TestSharedMemoryPyMigenBody(SharedMemoryMixin,
+                                  execution.TestExecutionPyMigenBody):
+    pass
+
+
+class TestSharedMemoryGeneral(SharedMemoryMixin,
+                              execution.TestExecutionGeneral):
+    pass
+
+
+class TestSharedMemoryConstantNodes(SharedMemoryMixin,
+                                    execution.TestExecutionConstantNodes):
+    pass
+
+
+class TestSharedMemoryMultibodyNodes(SharedMemoryMixin,
+                                     execution.TestExecutionMultibodyNodes):
+    pass
+
+
+class TestSharedMemoryMultioutput(
+        SharedMemoryMixin,
+        execution.TestExecutionSplittingMultiOutputNodeTest):
+    pass
+
+
+class TestSharedMemoryOptionalInputs(SharedMemoryMixin,
+                                     execution.TestExecutionOptionalInputs):
+    pass
+
+
+class TestSharedMemoryTypes(SharedMemoryMixin,
+                            execution.TestExecutionTypes):
+    pass
+
+
+class TestSharedMemoryCooperative(execution.TestExecutionGeneral):
+
+    simulator_kwargs = {"channels": "shared_memory",
+                        "scheduler": "cooperative"}
+
+
+class SharedMemoryChannelsTest(unittest.TestCase):
+    """Test the selection of channels per wire."""
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+
+    def test_per_wire(self):
+        s = dl.lib.StateSaver(int)
+
+        with dl.DeltaGraph() as graph:
+            n = add_non_const(1, 2)
+            m = add_non_const(n, 1)
+            s.save_and_exit(m)
+
+        wire = n.out_ports[0]
+        rt = dl.DeltaPySimulator(graph,
+                                 channels={wire.name: "shared_memory"})
+        rt.run()
+        self.assertEqual(s.saved, [4])
+
+        self.assertIsInstance(rt.out_queues[n.full_name][wire.index],
+                              SharedMemoryQueue)
+        for qu in rt.out_queues[m.full_name].values():
+            self.assertNotIsInstance(qu, SharedMemoryQueue)
+            self.assertIsInstance(qu, DeltaQueue)
+
+    def test_unknown_channel(self):
+        with dl.DeltaGraph() as graph:
+            add_non_const(1, 2)
+
+        with self.assertRaises(ValueError):
+            dl.DeltaPySimulator(graph, channels="pipe")
+
+        with self.assertRaises(ValueError):
+            dl.DeltaPySimulator(graph, channels="shared_memory",
+                                scheduler="asyncio")
+
+
+if __name__ == "__main__":
+    unittest.main()
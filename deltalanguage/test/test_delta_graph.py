@@ -3,6 +3,7 @@
 import os
 from typing import Tuple
 import unittest
+from unittest.mock import patch
 
 import deltalanguage as dl
 from deltalanguage.data_types import DeltaTypeError
@@ -105,6 +106,70 @@ class DeltaGraphTest(unittest.TestCase):
             graph.check(allow_top=False)
 
 
+@dl.DeltaBlock(allow_const=False)
+def add_one(a: int) -> int:
+    return a + 1
+
+
+class DeltaGraphIncrementalCheckTest(unittest.TestCase):
+    """Test that ``DeltaGraph.check`` only checks again what changed."""
+
+    def setUp(self):
+        self.saver = dl.lib.StateSaver(int)
+        with dl.DeltaGraph() as graph:
+            self.first = add_one(1)
+            self.saver.save(add_one(self.first))
+
+        self.graph = graph
+        self.assertTrue(graph.check())
+
+    def test_only_modified_nodes(self):
+        with self.graph:
+            self.saver.save(add_one(self.first))
+
+        with patch.object(self.graph, "_index_node",
+                          wraps=self.graph._index_node) as index_node:
+            self.assertTrue(self.graph.check())
+
+        # the new nodes, the splitter and the nodes connected to it
+        checked = {call.args[0].name for call in index_node.call_args_list}
+        self.assertEqual(checked, {"add_one", "save", "splitter"})
+        self.assertEqual(index_node.call_count, 5)
+        self.assertLess(index_node.call_count, len(self.graph.nodes))
+
+        with patch.object(self.graph, "_index_node") as index_node:
+            self.assertTrue(self.graph.check())
+        index_node.assert_not_called()
+
+    def test_missing_input(self):
+        with self.graph:
+            p = dl.placeholder_node_factory()
+            self.saver.save(p)
+
+        with self.assertRaises(dl.data_types.DeltaIOError):
+            self.graph.check()
+
+        # the graph is checked again
+        with self.assertRaises(dl.data_types.DeltaIOError):
+            self.graph.check()
+
+    def test_flags(self):
+        """Changing the rules checks the whole graph again."""
+        with patch.object(self.graph, "_index_node",
+                          wraps=self.graph._index_node) as index_node:
+            self.assertTrue(self.graph.check(allow_top=False))
+        self.assertEqual(index_node.call_count, len(self.graph.nodes))
+
+    def test_node_added_directly(self):
+        with dl.DeltaGraph() as other:
+            p = dl.placeholder_node_factory()
+            self.saver.save(p)
+
+        self.graph.nodes.extend(other.nodes)
+        with self.assertRaises(dl.data_types.DeltaIOError):
+            self.graph.check()
+
+
 class DeltaGraphStrTest(unittest.TestCase):
     """Test for correct graph printing."""
 
@@ -364,6 +429,75 @@ class DeltaGraphEquality(unittest.TestCase):
 
         self.assertNotEqual(get_g1(), get_g2())
 
+    def test_fingerprint(self):
+        """Graphs with different fingerprints are not compared further."""
+        with dl.DeltaGraph() as g1:
+            add_one(add_one(1))
+
+        with dl.DeltaGraph() as g2:
+            add_one(add_one(1))
+
+        with dl.DeltaGraph() as g3:
+            add_one(add_one(add_one(1)))
+
+        self.assertEqual(g1.fingerprint(), g2.fingerprint())
+        self.assertNotEqual(g1.fingerprint(), g3.fingerprint())
+
+        with patch("networkx.algorithms.is_isomorphic") as is_isomorphic:
+            self.assertNotEqual(g1, g3)
+        is_isomorphic.assert_not_called()
+
+    def test_fingerprint_node_order(self):
+        """The fingerprint does not depend on the order of the nodes."""
+        @dl.DeltaBlock(allow_const=False)
+        def add(a: int, b: int) -> int:
+            return a + b
+
+        with dl.DeltaGraph() as g1:
+            a = add_one(1)
+            b = add_one(2)
+            add(a, b)
+
+        with dl.DeltaGraph() as g2:
+            b = add_one(2)
+            a = add_one(1)
+            add(a, b)
+
+        self.assertEqual(g1.fingerprint(), g2.fingerprint())
+        with patch("networkx.algorithms.is_isomorphic") as is_isomorphic:
+            self.assertEqual(g1, g2)
+        is_isomorphic.assert_not_called()
+
+    def test_neq_port_diff(self):
+        """Nodes with the same label connected to different ports."""
+        @dl.DeltaBlock(allow_const=False)
+        def sub(a: int, b: int) -> int:
+            return a - b
+
+        with dl.DeltaGraph() as g1:
+            sub(add_one(1), add_one(add_one(1)))
+
+        with dl.DeltaGraph() as g2:
+            sub(add_one(add_one(1)), add_one(1))
+
+        self.assertNotEqual(g1, g2)
+
+    def test_fingerprint_modified(self):
+        """The fingerprint is computed again when the graph is modified."""
+        with dl.DeltaGraph() as g1:
+            node = add_one(1)
+
+        with dl.DeltaGraph() as g2:
+            add_one(add_one(1))
+
+        self.assertNotEqual(g1, g2)
+
+        with g1:
+            add_one(node)
+
+        self.assertEqual(g1.fingerprint(), g2.fingerprint())
+        self.assertEqual(g1, g2)
+
 
 if __name__ == "__main__":
     unittest.main()
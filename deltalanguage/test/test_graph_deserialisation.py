@@ -1,5 +1,11 @@
+import inspect
+import os
+import tempfile
 import unittest
+
 import deltalanguage as dl
+from deltalanguage.wiring import PyFuncBody, PyMethodBody
+from deltalanguage.wiring._node_classes.node_bodies import SerialisedBody
 from deltalanguage.test._graph_lib import (getg_const_chain,
                                            getg_optional_queues,
                                            getg_PyFunc_body_graph,
@@ -54,5 +60,84 @@ class GraphDeserialisationTest(unittest.TestCase):
             self.check_serialise_deserialise_isomorphism(g)
 
 
+@dl.DeltaBlock(allow_const=False)
+def increment(a: int) -> int:
+    return a + 1
+
+
+class LazyDeserialisationTest(unittest.TestCase):
+    """Test that bodies are deserialised on their first use and only once."""
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+        self.saver = dl.lib.StateSaver(int)
+
+        with dl.DeltaGraph() as graph:
+            self.saver.save_and_exit(increment(increment(increment(1))))
+
+        self.graph = graph
+
+    def test_lazy_bodies(self):
+        _, program = dl.serialise_graph(self.graph)
+        de_graph = dl.DeltaGraph.from_capnp(program)
+
+        for node in de_graph.nodes:
+            self.assertIsInstance(node.bodies[0], SerialisedBody)
+
+        # the function body is shared by the nodes, and deserialised once
+        incs = [node for node in de_graph.nodes if node.name == "increment"]
+        self.assertEqual(len(incs), 3)
+        self.assertIs(incs[0].bodies[0], incs[1].bodies[0])
+        body = incs[0].body
+        self.assertIsInstance(body, PyFuncBody)
+        self.assertIs(incs[0].bodies[0], body)
+        self.assertIs(incs[2].body, body)
+
+        self.assertEqual(self.graph, de_graph)
+
+    def test_method_bodies_not_shared(self):
+        """Bodies with state are deserialised for each node."""
+        class Adder:
+            def __init__(self):
+                self.total = 0
+
+            @dl.DeltaMethodBlock()
+            def add(self, a: int) -> int:
+                self.total += a
+                return self.total
+
+        adder = Adder()
+        with dl.DeltaGraph() as graph:
+            adder.add(adder.add(1))
+
+        _, program = dl.serialise_graph(graph)
+        de_graph = dl.DeltaGraph.from_capnp(program)
+        first, second = [node for node in de_graph.nodes
+                         if node.name == "add"]
+        self.assertIsNot(first.bodies[0], second.bodies[0])
+        self.assertIsNot(first.body, second.body)
+        self.assertIsInstance(first.body, PyMethodBody)
+
+    def test_run_from_file(self):
+        data, program = dl.serialise_graph(self.graph)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "program.df")
+            with open(path, "wb") as df_file:
+                df_file.write(data)
+
+            with dl.deserialise_graph_file(path) as df_program:
+                de_graph = dl.DeltaGraph.from_capnp(df_program)
+
+        # serialisations of bodies not used are kept
+        _, re_program = dl.serialise_graph(de_graph)
+        self.assertEqual([body.to_dict() for body in re_program.bodies],
+                         [body.to_dict() for body in program.bodies])
+
+        dl.DeltaPySimulator(de_graph).run()
+        saver_node = de_graph.find_node_by_name("save_and_exit")
+        saver = inspect.getclosurevars(saver_node.body.callback).nonlocals
+        self.assertEqual(saver["self"].saved, [4])
+
+
 if __name__ == "__main__":
     unittest.main()
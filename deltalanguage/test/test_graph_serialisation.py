@@ -98,6 +98,16 @@ class PortSerialisationTest(unittest.TestCase):
         self.assertEqual(wire.destInPort, 1)
         self.assertEqual(wire.direct, False)
 
+    def test_in_port_capnp_wiring_index(self):
+        """Positions are taken from the index if provided."""
+        n = RealNode(DeltaGraph(), [], name='node_name')
+        in_port = InPort("index", as_delta_type(int), n, 0)
+        wire = dotdf_capnp.Wire.new_message()
+        in_port.capnp_wiring([], wire, {n.full_name: (2, {"index": 1})})
+        self.assertEqual(wire.destNode, 2)
+        self.assertEqual(wire.destInPort, 1)
+        self.assertEqual(wire.direct, False)
+
     def test_in_port_capnp_wiring_direct(self):
         """In port has limit on port size."""
         n = RealNode(DeltaGraph(), [], name='node_name')
@@ -196,6 +206,31 @@ class PythonNodeSerialisationTest(unittest.TestCase):
         self.assertEqual(len(prog.bodies), 5)
         self.assertEqual(prog.nodes[2].bodies[0], prog.nodes[5].bodies[0])
 
+    def test_node_serialisation_indexed(self):
+        """Bodies and wires found via indexes are the same as the ones
+        found by searching the serialised nodes.
+        """
+        with DeltaGraph() as test_graph:
+            self.func(2, 3)
+            self.func(4, multiplier(5, 6))
+
+        data, _ = serialise_graph(test_graph)
+
+        prog = dotdf_capnp.Program.new_message()
+        prog.name = test_graph.name
+        prog.init("requirements", 0)
+        bodies = prog.init_resizable_list("bodies")
+        nodes = prog.init("nodes", len(test_graph.nodes))
+        wiring = prog.init_resizable_list("graph")
+        for graph_node, capnp_node in zip(test_graph.nodes, nodes):
+            graph_node.capnp(capnp_node, bodies)
+        for graph_node in test_graph.nodes:
+            graph_node.capnp_wiring(nodes, wiring)
+        bodies.finish()
+        wiring.finish()
+
+        self.assertEqual(data, prog.to_bytes())
+
     def test_node_serialisation_multi_body_node(self):
         """If two blocks share the same body only keep one copy."""
         with DeltaGraph() as test_graph:
@@ -0,0 +1,93 @@
+"""Test that optional heavy packages are only imported when used."""
+
+import os
+import subprocess
+import sys
+import textwrap
+import unittest
+
+import deltalanguage
+
+
+HEAVY = ("capnp", "matplotlib", "migen", "networkx")
+
+
+def loaded_modules(code: str) -> list:
+    """Heavy packages imported after running ``code`` in a new
+    interpreter.
+    """
+    script = textwrap.dedent(code) + textwrap.dedent(f"""
+        import sys
+        print(" ".join(m for m in {HEAVY!r} if m in sys.modules))
+    """)
+    root = os.path.dirname(os.path.dirname(deltalanguage.__file__))
+    out = subprocess.run([sys.executable, "-c", script],
+                         cwd=root,
+                         stdout=subprocess.PIPE,
+                         check=True)
+    return out.stdout.decode().split()
+
+
+class LazyImportsTest(unittest.TestCase):
+
+    def test_import(self):
+        self.assertEqual(loaded_modules("import deltalanguage"), [])
+
+    def test_simulation(self):
+        """Data types and the simulator are available without the heavy
+        packages."""
+        loaded = loaded_modules("""
+            import deltalanguage as dl
+
+            @dl.DeltaBlock(allow_const=False)
+            def add(a: int, b: int) -> int:
+                return a + b
+
+            s = dl.lib.StateSaver(int, verbose=False)
+            with dl.DeltaGraph() as graph:
+                s.save_and_exit(add(1, 2))
+
+            graph.check()
+            dl.DeltaPySimulator(graph).run()
+            assert s.saved == [3]
+        """)
+        self.assertEqual(loaded, [])
+
+    def test_on_demand(self):
+        loaded = loaded_modules("""
+            import deltalanguage as dl
+            dl.MigenNodeTemplate
+        """)
+        self.assertEqual(loaded, ["migen"])
+
+        loaded = loaded_modules("""
+            import deltalanguage as dl
+            with dl.DeltaGraph() as graph:
+                dl.lib.StateSaver(int).save(1)
+            dl.serialise_graph(graph)
+            graph.get_networkx_graph()
+        """)
+        self.assertEqual(loaded, ["capnp", "networkx"])
+
+    def test_star(self):
+        """``import *`` provides the classes loaded on first access."""
+        for module in ("deltalanguage", "deltalanguage.wiring"):
+            loaded = loaded_modules(f"""
+                from {module} import *
+                from deltalanguage.wiring import __all__
+                assert all(name in globals() for name in __all__)
+            """)
+            self.assertEqual(loaded, ["migen"])
+
+    def test_schema(self):
+        """The schema of .df files can be imported directly."""
+        loaded = loaded_modules("""
+            import deltalanguage
+            import deltalanguage.data_types.dotdf_capnp as dotdf_capnp
+            dotdf_capnp.Program.new_message()
+        """)
+        self.assertEqual(loaded, ["capnp"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import migen
+
+import deltalanguage as dl
+from deltalanguage.test._node_lib import DUT1, MigenDUT, MigenIncrementer
+from deltalanguage.wiring import ProtocolAdaptor
+from deltalanguage.wiring._node_classes import migen_compiler
+from deltalanguage.wiring._node_classes.migen_compiler import (
+    CompiledSimulator,
+    compile_statements
+)
+
+
+class Constructs(migen.Module):
+    """Module using the statements and expressions supported by the
+    compiler.
+    """
+
+    def __init__(self):
+        self.a = migen.Signal(8)
+        self.b = migen.Signal((8, True))
+        self.sel = migen.Signal(2)
+        self.ios = [self.a, self.b, self.sel]
+
+        self.mux = migen.Signal(8)
+        self.cat = migen.Signal(16)
+        self.lo = migen.Signal(4)
+        self.hi = migen.Signal(4)
+        self.rep = migen.Signal(12)
+        self.neg = migen.Signal((10, True))
+        self.case = migen.Signal(8)
+        self.sliced = migen.Signal(8)
+        self.part = migen.Signal(4)
+        self.acc = migen.Signal((12, True))
+        self.array = migen.Array(migen.Signal(8, reset=i) for i in range(3))
+        self.outs = [self.mux, self.cat, self.lo, self.hi, self.rep,
+                     self.neg, self.case, self.sliced, self.part, self.acc,
+                     *self.array]
+
+        self.comb += [
+            self.mux.eq(migen.Mux(self.sel[0], self.a, self.b)),
+            self.cat.eq(migen.Cat(self.a, self.b)),
+            migen.Cat(self.lo, self.hi).eq(self.a ^ 0x5a),
+            self.rep.eq(migen.Replicate(self.sel, 6)),
+            self.neg.eq(-self.b + (self.a >> 2) - (self.a << 1)),
+            self.part.eq(self.a.part(self.sel, 4)),
+            migen.Case(self.sel, {
+                0: self.case.eq(self.a * 3),
+                1: self.case.eq(~self.a),
+                "default": self.case.eq(self.array[self.sel]),
+            }),
+        ]
+        self.sync += [
+            self.sliced[2:6].eq(self.a),
+            self.sliced[0].eq(self.a >= self.b),
+            migen.If(self.b < 0,
+                     self.acc.eq(self.acc + self.b)
+                     ).Elif(self.sel == 3,
+                            self.acc.eq(0)
+                            ).Else(self.acc.eq(self.acc + 1)),
+            self.array[self.sel].eq(self.array[self.sel] + self.a),
+        ]
+
+
+class CompiledSimulatorTest(unittest.TestCase):
+    """Test that the compiled simulator gives the same signals as
+    ``migen.Simulator``, cycle by cycle.
+    """
+
+    def setUp(self):
+        self.cache = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache.cleanup)
+
+    def trace(self, simulator, module, inputs, outputs, n=300, **kwargs):
+        rand = random.Random(42)
+        trace = []
+
+        def tb():
+            for _ in range(n):
+                for signal in inputs:
+                    yield signal.eq(rand.randrange(2 ** len(signal)))
+                yield
+                trace.append((yield outputs))
+
+        sim = simulator(module, tb(), **kwargs)
+        sim.run()
+        return sim, trace
+
+    def assert_conforms(self, make, inputs, outputs):
+        module = make()
+        _, expected = self.trace(migen.Simulator, module,
+                                 inputs(module), outputs(module))
+        module = make()
+        sim, compiled = self.trace(CompiledSimulator, module,
+                                   inputs(module), outputs(module),
+                                   cache_path=self.cache.name)
+        self.assertTrue(sim.compiled)
+        self.assertEqual(compiled, expected)
+
+    def test_constructs(self):
+        self.assert_conforms(Constructs,
+                             lambda m: m.ios,
+                             lambda m: m.outs)
+
+    def test_protocol_adaptor(self):
+        self.assert_conforms(
+            lambda: ProtocolAdaptor(buf_width=8, buf_depth=16, buf_afull=5),
+            lambda pa: [pa.wr_valid_in, pa.wr_data_in, pa.rd_ready_in],
+            lambda pa: [pa.rd_data_out, pa.rd_valid_out, pa.wr_ready_out,
+                        pa.num_fifo_elements, pa.cnt, pa.almost_full]
+        )
+
+    def test_disk_cache(self):
+        """The compiled code is stored once and then loaded instead of being
+        compiled again.
+        """
+        sim = migen.Simulator(Constructs(), [])
+        statement_lists = [sim.fragment.comb, *sim.fragment.sync.values()]
+        compile_statements(statement_lists, sim.fragment.clock_domains,
+                           self.cache.name)
+        files = os.listdir(self.cache.name)
+        self.assertEqual(len(files), 1)
+
+        with mock.patch.object(migen_compiler, "compile", create=True,
+                               side_effect=AssertionError):
+            steps = compile_statements(statement_lists,
+                                       sim.fragment.clock_domains,
+                                       self.cache.name)
+        self.assertEqual(os.listdir(self.cache.name), files)
+        self.assertEqual(len(steps), len(statement_lists))
+
+    def test_fallback(self):
+        """Fragments with unsupported statements are interpreted."""
+        module = migen.Module()
+        counter = migen.Signal(4)
+        module.sync += [counter.eq(counter + 1),
+                        migen.Display("counter %d", counter)]
+
+        with self.assertLogs("Migen Compiler"):
+            sim, _ = self.trace(CompiledSimulator, module, [], [counter],
+                                n=0, cache_path=None)
+        self.assertFalse(sim.compiled)
+
+
+class CompiledMigenNodeTest(unittest.TestCase):
+    """Test that compiled Migen nodes give the same outputs as interpreted
+    ones.
+    """
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+
+    def assert_conforms(self, template, inputs):
+        interpreted = template(name="Interpreted")
+        compiled = template(name="Compiled", compiled=True)
+        for kwargs in inputs:
+            self.assertEqual(compiled.call(**kwargs),
+                             interpreted.call(**kwargs))
+        self.assertTrue(compiled._sim.compiled)
+
+    def test_dut1(self):
+        self.assert_conforms(DUT1, [{"i1": i} for i in range(200)])
+
+    def test_incrementer(self):
+        rand = random.Random(42)
+        self.assert_conforms(
+            MigenIncrementer,
+            [{"i1": rand.choice([None, rand.randrange(100)])}
+             for _ in range(200)]
+        )
+
+    def test_migen_dut(self):
+        self.assert_conforms(MigenDUT,
+                             [{"in1": i, "in2": 2 * i} for i in range(20)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
+import logging
 import unittest
 
+import migen
+
 import deltalanguage as dl
 
 
@@ -24,6 +27,97 @@ class MigenNodeTemplateTest(unittest.TestCase):
 
         AMigenNodeB()
 
+    def test_testbench_by_log_level(self):
+        """The testbench without debug logging gives the same outputs as the
+        one with it, clock by clock.
+        """
+
+        class Accumulator(dl.MigenNodeTemplate):
+            def migen_body(self, template):
+                a = template.add_pa_in_port('a', dl.Optional(int))
+                out = template.add_pa_out_port('out', int)
+
+                acc = migen.Signal(32)
+                self.comb += a.ready.eq(1)
+                self.sync += migen.If(a.valid, acc.eq(acc + a.data))
+                self.comb += [out.data.eq(acc), out.valid.eq(acc > 3)]
+
+        # each evaluation is half a clock cycle, inputs are read on the
+        # rising edges
+        inputs = [1, 1, None, None, 2, 2, 3, 3, None, None, 4, 4, None]
+
+        fast = Accumulator(name="AccumulatorFast")
+        self.assertEqual(fast._tb.__name__, "_tb_fast")
+        fast_out = [fast.call(a=a) for a in inputs]
+
+        debug = Accumulator(name="AccumulatorDebug", lvl=logging.DEBUG)
+        self.assertEqual(debug._tb.__name__, "_tb_debug")
+        with self.assertLogs(debug.log, logging.DEBUG):
+            debug_out = [debug.call(a=a) for a in inputs]
+
+        self.assertEqual(fast_out, debug_out)
+        self.assertIn((6,), fast_out)
+
+
+class Pulse(dl.MigenNodeTemplate):
+    """The output is valid once every 8 clock cycles."""
+
+    def migen_body(self, template):
+        out = template.add_pa_out_port('out', int)
+
+        counter = migen.Signal(32)
+        self.sync += counter.eq(counter + 1)
+        self.comb += [out.data.eq(counter),
+                      out.valid.eq(counter[0:3] == 7)]
+
+
+class MigenBatchCyclesTest(unittest.TestCase):
+    """Test the multi-cycle evaluation of MigenNodeTemplate."""
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+
+    def test_single_cycle(self):
+        """By default each evaluation is half a clock cycle."""
+        pulse = Pulse()
+        outputs = [pulse.call() for _ in range(16)]
+        self.assertEqual(outputs, [(None,), None] * 7 + [(7,), None])
+
+    def test_full_cycle(self):
+        """With one batch cycle each evaluation is a full clock cycle."""
+        pulse = Pulse(batch_cycles=1)
+        outputs = [pulse.call() for _ in range(16)]
+        self.assertEqual(outputs,
+                         [(None,)] * 7 + [(7,)] + [(None,)] * 7 + [(15,)])
+
+    def test_until_valid(self):
+        pulse = Pulse(batch_cycles=16)
+        self.assertEqual([pulse.call() for _ in range(3)],
+                         [(7,), (15,), (23,)])
+
+    def test_limit(self):
+        pulse = Pulse(batch_cycles=4)
+        self.assertEqual([pulse.call() for _ in range(4)],
+                         [(None,), (7,), (None,), (15,)])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Pulse(batch_cycles=0)
+
+        # verilated bodies run full cycles
+        with self.assertRaises(ValueError):
+            Pulse(verilated=True)
+
+    def test_simulation(self):
+        s = dl.lib.StateSaver(int)
+        pulse = Pulse(batch_cycles=16)
+
+        with dl.DeltaGraph() as graph:
+            s.save_and_exit(pulse.call().out)
+
+        dl.DeltaPySimulator(graph).run()
+        self.assertEqual(s.saved, [7])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,13 +1,24 @@
+import dis
+import os
+import tempfile
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 from typing import OrderedDict
 
+import attr
+import dill
+
+from deltalanguage.data_types import Int, Record, Size, UInt
 from deltalanguage.wiring._node_classes.node_bodies import PythonBody
-from deltalanguage.wiring import (Latency,
+from deltalanguage.wiring._node_classes.serialisation import dumps_type
+from deltalanguage.wiring import (BodyCache,
+                                  Latency,
                                   PyConstBody,
                                   PyFuncBody,
                                   PyMethodBody)
 
+OFFSET = 1
+
 
 class MockCallback(Mock):
 
@@ -362,6 +373,24 @@ class TestPyFuncBody(unittest.TestCase):
 
         self.assertEqual(b5, b6)
 
+    def test_hash(self):
+        """Equal bodies can be deduplicated in sets."""
+        bodies = {self.make_b1(), self.make_b1(), self.make_b2(),
+                  self.make_b3(), self.make_b4()}
+        self.assertEqual(len(bodies), 3)
+        self.assertIn(self.make_b2(), bodies)
+
+    def test_code_fingerprint_cached(self):
+        """The code of a callback is disassembled once."""
+        b1_1 = self.make_b1()
+        b1_2 = self.make_b1()
+        with patch("dis.get_instructions",
+                   wraps=dis.get_instructions) as get_instructions:
+            for _ in range(3):
+                self.assertEqual(b1_1, b1_2)
+                self.assertEqual(hash(b1_1), hash(b1_2))
+        self.assertLessEqual(get_instructions.call_count, 1)
+
 
 class TestPyMethodBody(unittest.TestCase):
 
@@ -439,5 +468,117 @@ class TestPyMethodBody(unittest.TestCase):
         self.assertNotEqual(b1, b4)
 
 
+def offset_body(a):
+    return a + OFFSET
+
+
+@attr.s(slots=True)
+class RecordA:
+    x: int = attr.ib()
+
+
+@attr.s(slots=True)
+class RecordB:
+    x: int = attr.ib()
+
+
+class TestBodySerialisation(unittest.TestCase):
+    """Test the caches of serialisations of bodies and types."""
+
+    @staticmethod
+    def make_body(val):
+        def callback(a):
+            return a + val
+
+        return PyFuncBody(callback)
+
+    def test_kept(self):
+        body = self.make_body(1)
+        self.assertIs(body.as_serialised, body.as_serialised)
+        self.assertNotIn("_serialised", vars(dill.loads(body.as_serialised)))
+
+    def test_closure_change(self):
+        val = 1
+
+        def callback(a):
+            return a + val
+
+        body = PyFuncBody(callback)
+        blob = body.as_serialised
+        val = 2
+        self.assertNotEqual(body.as_serialised, blob)
+        self.assertEqual(dill.loads(body.as_serialised).eval(1), 3)
+
+    def test_callback_change(self):
+        body = self.make_body(1)
+        blob = body.as_serialised
+        body.callback = self.make_body(2).callback
+        self.assertNotEqual(body.as_serialised, blob)
+        self.assertEqual(dill.loads(body.as_serialised).eval(1), 3)
+
+    def test_global_change(self):
+        global OFFSET
+        body = PyFuncBody(offset_body)
+        blob = body.as_serialised
+        try:
+            OFFSET = 2
+            self.assertIsNot(body.as_serialised, blob)
+        finally:
+            OFFSET = 1
+
+    def test_instance_change(self):
+        class Accumulator:
+            def __init__(self):
+                self.values = []
+
+            def add(self, a):
+                self.values.append(a)
+
+        instance = Accumulator()
+        body = PyMethodBody(Accumulator.add, instance)
+        blob = body.as_serialised
+        instance.values.append(1)
+        self.assertEqual(dill.loads(body.as_serialised).instance.values, [1])
+        self.assertEqual(dill.loads(blob).instance.values, [])
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as path:
+            cache = BodyCache(path)
+            blob = self.make_body(1).serialise(cache)
+            self.assertEqual(len(os.listdir(path)), 1)
+
+            # found by the content of the body
+            self.assertEqual(self.make_body(1).serialise(cache), blob)
+            self.assertEqual(len(os.listdir(path)), 1)
+
+            self.make_body(2).serialise(cache)
+            self.assertEqual(len(os.listdir(path)), 2)
+
+            # classes defined locally are serialised by value, thus
+            # instances of them are not stored
+            class Instance:
+                def method(self):
+                    return 1
+
+            body = PyMethodBody(Instance.method, Instance())
+            self.assertEqual(dill.loads(body.serialise(cache)).eval(), 1)
+            self.assertEqual(len(os.listdir(path)), 2)
+
+    def test_types_interned(self):
+        self.assertIs(dumps_type(UInt(Size(32))), dumps_type(UInt(Size(32))))
+        self.assertEqual(dill.loads(dumps_type(Int(Size(8)))), Int(Size(8)))
+
+    def test_records_not_interned(self):
+        """Records made of different classes are equal but are not
+        serialised the same way."""
+        self.assertEqual(Record(RecordA), Record(RecordB))
+        self.assertIs(
+            dill.loads(dumps_type(Record(RecordA))).as_python_type(), RecordA
+        )
+        self.assertIs(
+            dill.loads(dumps_type(Record(RecordB))).as_python_type(), RecordB
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
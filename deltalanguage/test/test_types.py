@@ -1,5 +1,6 @@
 """Characterisation test BaseDeltaType and its subclasses."""
 
+import pickle
 import random
 import typing
 import unittest
@@ -277,6 +278,48 @@ class DeltaTypesTest(unittest.TestCase):
         with self.assertRaises(DeltaTypeError):
             Union([None, int])
 
+    def test_interned(self):
+        """Structurally equal types are the same object, which caches the
+        data derived from its structure."""
+        self.assertIs(as_delta_type(int), Int(Size(32)))
+        self.assertIs(Tuple([int, Array(bool, Size(2))]),
+                      Tuple([Int(), Array(Bool(), Size(2))]))
+        self.assertIs(Union([int, Str()]), Union([Str(Size(1024)), int]))
+        self.assertIs(Raw(int), Raw(Int()))
+
+        t = Tuple([int, Union([float, bool])])
+        self.assertIs(str(t), str(t))
+        self.assertIs(t.as_numpy_type(), t.as_numpy_type())
+        self.assertIs(pickle.loads(pickle.dumps(t)), t)
+
+        # sizes of interned types are shared, thus not modified in place
+        size = Int(Size(32)).size
+        size += Size(8)
+        size -= Size(16)
+        size *= 2
+        self.assertEqual(size, Size(48))
+        self.assertEqual(Int(Size(32)).size, Size(32))
+
+        # records keep their class
+        self.assertEqual(Record(RecBI), Record(RecBI_copy))
+        self.assertIsNot(Record(RecBI), Record(RecBI_copy))
+        self.assertIs(Tuple([Record(RecBI)]).elems[0].as_python_type(),
+                      RecBI)
+        self.assertIs(Tuple([Record(RecBI_copy)]).elems[0].as_python_type(),
+                      RecBI_copy)
+
+        # as are the types made of them
+        for make in (lambda r: Tuple([r, int]),
+                     lambda r: Array(r, Size(2)),
+                     lambda r: Union([r, int]),
+                     lambda r: Raw(r),
+                     lambda r: Tuple([Array(r, Size(2))])):
+            t, t_copy = make(Record(RecBI)), make(Record(RecBI_copy))
+            self.assertEqual(t, t_copy)
+            self.assertEqual(hash(t), hash(t_copy))
+            self.assertIsNot(t, t_copy)
+        self.assertNotEqual(Tuple([Record(RecBI)]), Tuple([Record(RecBIS)]))
+
     def test_top_not_allowed(self):
         """Compound types should not accept Top as a sub-type."""
 
@@ -580,6 +623,67 @@ class DeltaTypesPackTest(unittest.TestCase):
             self.check_numpy(5, Union([bool, float, int]))
 
 
+class DeltaTypesPackBytesTest(DeltaTypesPackTest):
+    """Test pack_bytes/unpack_bytes methods for `BaseDeltaType`.
+
+    All the checks from `DeltaTypesPackTest` are repeated for the native
+    binary codec.
+    """
+
+    def pack_unpack(self, val, t1, t2=None):
+        """Helper that pack and unpack a value via given types."""
+        if t2 is None:
+            t2 = t1
+        buf = t1.pack_bytes(val)
+        self.assertEqual(type(buf), bytes)
+        self.assertEqual(len(buf), t1.codec.size)
+        val_new = t2.unpack_bytes(buf)
+        return val_new
+
+    def test_Char(self):
+        self.check('a', Char())
+        self.assertFalse(Char().is_packable('ab'))
+
+    def test_codec_size(self):
+        """Packed messages are 8 times smaller than bit strings."""
+        self.assertEqual(Int(Size(64)).codec.size, 8)
+        self.assertEqual(Array(Int(), Size(4096)).codec.size, 4 * 4096)
+        self.assertEqual(Tuple([Int(Size(8)), Float(Size(64))]).codec.size, 9)
+        self.assertEqual(Str(Size(10)).codec.size, 10)
+        self.assertEqual(Union([int, bool]).codec.size, 5)
+
+    def test_codec_compiled_once(self):
+        t = Array(Int(), Size(3))
+        self.assertIs(t.codec, t.codec)
+
+    def test_bit_view(self):
+        """Bit strings of primitive types are a view on the native bytes."""
+        for val, t in ((-5, Int(Size(8))),
+                       (2**60, UInt(Size(64))),
+                       (3.25, Float(Size(64))),
+                       (1 - 2j, Complex(Size(128))),
+                       ('hello', Str(Size(8)))):
+            self.assertEqual(t.pack(val), t.bytes_to_bits(t.pack_bytes(val)))
+
+    def test_pickle(self):
+        """Compiled codecs are not a part of the pickled state."""
+        t = Tuple([int, Array(float, Size(2))])
+        t.pack_bytes((1, [2.0, 3.0]))
+        t_new = pickle.loads(pickle.dumps(t))
+        self.assertEqual(t, t_new)
+        self.assertEqual(t_new.unpack_bytes(t.pack_bytes((1, [2.0, 3.0]))),
+                         (1, [2.0, 3.0]))
+
+    def test_Raw(self):
+        t = Raw(Int(Size(16)))
+        self.assertEqual(t.unpack_bytes(t.pack_bytes(t.as_bits(-3))),
+                         t.as_bits(-3))
+        with self.assertRaises(DeltaTypeError):
+            t.pack_bytes(2**16)
+        with self.assertRaises(DeltaTypeError):
+            t.pack_bytes(1.5)
+
+
 class WiresTest(unittest.TestCase):
     """Testing the rules of data transmission in a single wire of DeltaGraph."""
 
@@ -633,6 +737,22 @@ class WiresTest(unittest.TestCase):
         with self.assertRaises(DeltaTypeError):
             DeltaGraph.check_wire(Union([Int(), Top()]), Int())
 
+    def test_records(self):
+        """Records of different classes with the same fields can be
+        connected, also inside of other types."""
+        self.assertTrue(DeltaGraph.check_wire(Record(RecBI),
+                                              Record(RecBI_copy)))
+        self.assertTrue(DeltaGraph.check_wire(Tuple([Record(RecBI)]),
+                                              Tuple([Record(RecBI_copy)])))
+        self.assertTrue(DeltaGraph.check_wire(
+            Array(Record(RecBI), Size(2)),
+            Array(Record(RecBI_copy), Size(2))
+        ))
+
+        with self.assertRaises(DeltaTypeError):
+            DeltaGraph.check_wire(Tuple([Record(RecBI)]),
+                                  Tuple([Record(RecBIS)]))
+
     def test_Union(self):
         """Test wires with Union."""
         # examples of obvious behaiviour
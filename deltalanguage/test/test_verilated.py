@@ -0,0 +1,103 @@
+import random
+import shutil
+import unittest
+from unittest import mock
+
+import deltalanguage as dl
+from deltalanguage.test._node_lib import DUT1, MigenIncrementer
+from deltalanguage.wiring import PyMigenBody, PyVerilatedBody
+from deltalanguage.wiring._node_classes import verilated_model
+from deltalanguage.wiring._node_classes.verilated_model import (
+    VerilatedModel,
+    VerilatedPort
+)
+
+
+WIDE = """\
+module wide(input [99:0] a, input [7:0] b, output [99:0] c);
+    assign c = a + b;
+endmodule
+"""
+
+
+@unittest.skipUnless(shutil.which("verilator"), "Verilator is not installed")
+class VerilatedModelTest(unittest.TestCase):
+    """Test the modules built with Verilator."""
+
+    ports = [VerilatedPort("a", 100, True),
+             VerilatedPort("b", 8, True),
+             VerilatedPort("c", 100, False)]
+
+    def test_ports(self):
+        model = VerilatedModel(WIDE, "wide", self.ports)
+        self.addCleanup(model.close)
+        for a, b in ((0, 0), (2 ** 64 - 1, 1), (2 ** 99 + 5, 255)):
+            model.set(0, a)
+            model.set(1, b)
+            model.eval()
+            self.assertEqual(model.get(2), a + b)
+
+        model.set(1, 256 + 3)
+        model.eval()
+        self.assertEqual(model.get(1), 3)
+
+    def test_cache(self):
+        """The library is built once and then loaded."""
+        VerilatedModel(WIDE, "wide", self.ports).close()
+        with mock.patch.object(verilated_model, "_build",
+                               side_effect=AssertionError):
+            VerilatedModel(WIDE, "wide", self.ports).close()
+
+
+@unittest.skipUnless(shutil.which("verilator"), "Verilator is not installed")
+class VerilatedMigenNodeTest(unittest.TestCase):
+    """Test that verilated bodies give the same outputs as the simulation of
+    Migen with the same batch cycles.
+    """
+
+    def setUp(self):
+        dl.DeltaGraph.clean_stack()
+
+    def assert_conforms(self, template, inputs):
+        simulated = template(name="Simulated", batch_cycles=1)
+        verilated = template(name="Verilated", verilated=True,
+                             batch_cycles=1)
+        body = verilated.construct_verilated_body()
+        for kwargs in inputs:
+            self.assertEqual(body.callback(verilated, **kwargs),
+                             simulated.call(**kwargs))
+
+    def test_dut1(self):
+        self.assert_conforms(DUT1, [{"i1": i} for i in range(20)])
+
+    def test_incrementer(self):
+        rand = random.Random(42)
+        self.assert_conforms(
+            MigenIncrementer,
+            [{"i1": rand.choice([None, rand.randrange(100)])}
+             for _ in range(100)]
+        )
+
+    def test_select_body(self):
+        """The verilated body is selected by its tag in a graph."""
+        saved = []
+        for preferred, body_type in (([], PyMigenBody),
+                                     (["verilated"], PyVerilatedBody)):
+            s = dl.lib.StateSaver(int)
+            incrementer = MigenIncrementer(name="incrementer",
+                                           verilated=True,
+                                           batch_cycles=10)
+            with dl.DeltaGraph() as graph:
+                node = incrementer.call(i1=41)
+                s.save_and_exit(node.o1)
+
+            graph.select_bodies(preferred=preferred)
+            self.assertIsInstance(node.body, body_type)
+            dl.DeltaPySimulator(graph).run()
+            saved.append(s.saved)
+
+        self.assertEqual(saved[0], saved[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -27,21 +27,28 @@ the top level module and can be used like this:
     print(dl.DeltaBlock())
 
 The learning path for new user is best described in :doc:`tutorials/tutorials`.
+
+:py:class:`MigenNodeTemplate` and :py:class:`ProtocolAdaptor` are loaded on
+first access, so that ``migen`` is only imported by programs that use it,
+or by ``from deltalanguage import *``.
 """
 
+import importlib
+
 from ._node_classes.abstract_node import AbstractNode, IndexProxyNode, ProxyNode
 from ._node_classes.latency import Latency
-from ._node_classes.migen_node import MigenNodeTemplate
-from ._node_classes.node_bodies import (PyConstBody,
+from ._node_classes.node_bodies import (Body,
+                                        PyConstBody,
                                         PyFuncBody,
                                         PyInteractiveBody,
                                         PyMethodBody,
                                         PyMigenBody,
-                                        PythonBody)
+                                        PythonBody,
+                                        PyVerilatedBody)
 from ._node_classes.placeholder_node import PlaceholderNode
 from ._node_classes.port_classes import InPort, OutPort
-from ._node_classes.protocol_adaptor import ProtocolAdaptor
 from ._node_classes.real_nodes import PythonNode, RealNode, as_node
+from ._node_classes.serialisation import BodyCache
 from ._body_templates import InteractiveBodyTemplate
 from ._node_templates import NodeTemplate
 from ._decorators import (DeltaBlock,
@@ -61,3 +68,20 @@ __all__ = ["DeltaBlock",
            "MigenNodeTemplate",
            "placeholder_node_factory",
            "NodeTemplate"]
+
+
+# classes loaded on first access, by the modules defining them
+_LAZY = {"MigenNodeTemplate": "._node_classes.migen_node",
+         "ProtocolAdaptor": "._node_classes.protocol_adaptor"}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
@@ -171,6 +171,10 @@ class FuncBodyTemplate(BodyTemplate):
     tags : List[str]
         List of user defined tags for the body this BodyTemplate will
         construct.
+    blocking : bool
+        Whether the body this BodyTemplate will construct can block.
+    batch_size : int
+        Maximum batch size of the body this BodyTemplate will construct.
     """
 
     def __init__(self,
@@ -179,10 +183,14 @@ class FuncBodyTemplate(BodyTemplate):
                  lvl: int,
                  fn: Callable,
                  allow_const: bool,
-                 tags: List[str] = None):
+                 tags: List[str] = None,
+                 blocking: bool = False,
+                 batch_size: int = None):
         super().__init__(name, latency, lvl, tags)
         self._callback = fn
         self.allow_const = allow_const
+        self.blocking = blocking
+        self.batch_size = batch_size
 
     def construct_const_body(self, *pos_in_nodes, **kw_in_nodes):
         """If allowed, create the constant version :py:class:`PyConstBody`
@@ -198,7 +206,8 @@ class FuncBodyTemplate(BodyTemplate):
         """Construct the :py:class:`PyFuncBody` that this ``BodyTemplate`` is
         a template for
         """
-        return PyFuncBody(self._callback, self.latency, self._tags)
+        return PyFuncBody(self._callback, self.latency, self._tags,
+                          self.blocking, self.batch_size)
 
 
 class MethodBodyTemplate(FuncBodyTemplate):
@@ -215,6 +224,10 @@ class MethodBodyTemplate(FuncBodyTemplate):
     tags : List[str]
         List of user defined tags for the body this BodyTemplate will
         construct.
+    blocking : bool
+        Whether the body this BodyTemplate will construct can block.
+    batch_size : int
+        Maximum batch size of the body this BodyTemplate will construct.
     """
 
     def __init__(self,
@@ -222,15 +235,19 @@ class MethodBodyTemplate(FuncBodyTemplate):
                  latency: Latency,
                  lvl: int,
                  fn: Callable,
-                 tags: List[str] = None):
-        super().__init__(name, latency, lvl, fn, False, tags)
+                 tags: List[str] = None,
+                 blocking: bool = False,
+                 batch_size: int = None):
+        super().__init__(name, latency, lvl, fn, False, tags, blocking,
+                         batch_size)
         self.construction_ready = False
 
     def construct_body(self, obj):
         """Construct the :py:class:`PyMethodBody` that this ``BodyTemplate``
         is a template for.
         """
-        return PyMethodBody(self._callback, obj, self.latency, self._tags)
+        return PyMethodBody(self._callback, obj, self.latency, self._tags,
+                            self.blocking, self.batch_size)
 
     def _call(self, graph, obj, *args, **kwargs):
         body = self.construct_body(obj)
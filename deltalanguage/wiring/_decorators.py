@@ -27,7 +27,9 @@ def DeltaBlock(
     in_port_size: int = 0,
     latency: Latency = None,
     lvl: int = logging.ERROR,
-    tags: List[str] = None
+    tags: List[str] = None,
+    blocking: bool = False,
+    batch_size: int = None
 ):
     """Decorator to turn a function to a block for use in
     :py:class:`DeltaGraph`.
@@ -73,6 +75,19 @@ def DeltaBlock(
         The estimated latency for running the body.
     lvl : int
         Logging level for the node.
+    blocking : bool
+        Set to ``True`` if the body can block for a long time, e.g. waiting
+        for I/O. The ``"asyncio"`` scheduler of
+        :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`
+        then evaluates it on an executor thread instead of the event loop.
+    batch_size : int
+        If set, the body is evaluated once per batch of up to this number of
+        messages instead of once per message. It receives a list for each
+        input, the batches of optional inputs are padded with ``None``,
+        and returns a list for each output. The batches are moved between
+        nodes as single queue items, see
+        :py:meth:`~deltalanguage.wiring.PythonNode.send_many`.
+        The constant version of the body is not affected.
 
 
     .. note::
@@ -167,7 +182,9 @@ def DeltaBlock(
                                                     in_port_size,
                                                     latency,
                                                     lvl,
-                                                    tags)
+                                                    tags,
+                                                    blocking,
+                                                    batch_size)
 
         @wraps(func)
         def decorated(*args, **kwargs):
@@ -206,7 +223,9 @@ def DeltaMethodBlock(
     in_port_size: int = 0,
     latency: Latency = None,
     lvl: int = logging.ERROR,
-    tags: List[str] = None
+    tags: List[str] = None,
+    blocking: bool = False,
+    batch_size: int = None
 ):
     """Decorator to turn a class method to a block for use in
     :py:class:`DeltaGraph`.
@@ -253,6 +272,19 @@ def DeltaMethodBlock(
         The estimated latency for running the body.
     lvl : int
         Logging level for the node.
+    blocking : bool
+        Set to ``True`` if the body can block for a long time, e.g. waiting
+        for I/O. The ``"asyncio"`` scheduler of
+        :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`
+        then evaluates it on an executor thread instead of the event loop.
+    batch_size : int
+        If set, the body is evaluated once per batch of up to this number of
+        messages instead of once per message. It receives a list for each
+        input, the batches of optional inputs are padded with ``None``,
+        and returns a list for each output. The batches are moved between
+        nodes as single queue items, see
+        :py:meth:`~deltalanguage.wiring.PythonNode.send_many`.
+        The constant version of the body is not affected.
 
 
     .. note::
@@ -318,7 +350,9 @@ def DeltaMethodBlock(
                                                      in_port_size,
                                                      latency,
                                                      lvl,
-                                                     tags)
+                                                     tags,
+                                                     blocking,
+                                                     batch_size)
 
         @wraps(func)
         def decorated(obj, *args, **kwargs):
@@ -491,6 +525,30 @@ def Interactive(
         ...             internal_memory -= node.receive("b")
         ...
         ...     node.send(x=internal_memory, y=internal_memory*2)
+
+    The function can also be a coroutine function, in this case ``receive``
+    and ``send`` have to be awaited. With the ``"asyncio"`` scheduler of
+    :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`
+    such nodes do not occupy a thread while they wait for inputs:
+
+    .. code-block:: python
+
+        >>> @dl.Interactive([("a", int), ("b", int)], [('output', int)])
+        ... async def baz(node: dl.PythonNode):
+        ...     internal_memory = 0
+        ...
+        ...     for i in range(10):
+        ...         inputs = await node.receive()
+        ...         internal_memory += inputs["a"] * inputs["b"]
+        ...
+        ...     await node.send(internal_memory)
+
+        >>> with dl.DeltaGraph() as graph:
+        ...     s.save_and_exit(baz.call(a=4, b=5))
+
+        >>> rt = dl.DeltaPySimulator(graph, scheduler="asyncio")
+        >>> rt.run()
+        saving 200
     """
     def decorator(func: Callable[[PythonNode], None]):
         _outputs = outputs if outputs is not None else []
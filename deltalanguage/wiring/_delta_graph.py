@@ -5,14 +5,12 @@ nodes and placeholders.
 from __future__ import annotations
 from copy import deepcopy
 import inspect
-from typing import TYPE_CHECKING, Dict, List, Union, OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union, OrderedDict
 import logging
 import textwrap
 import sys
 import dill
 
-import networkx as nx
-import matplotlib.pyplot as plt
 import numpy as np
 
 from deltalanguage.logging import make_logger
@@ -27,7 +25,10 @@ from ._node_classes.node_bodies import (Latency,
                                         PyFuncBody,
                                         PyMethodBody,
                                         PythonBody,
-                                        PyInteractiveBody)
+                                        PyInteractiveBody,
+                                        SerialisedBody,
+                                        body_type)
+from ._node_classes.port_classes import InPort
 from ._node_classes.real_nodes import (PythonNode,
                                        OutPort,
                                        as_node)
@@ -138,15 +139,26 @@ class DeltaGraph:
         self.log = make_logger(lvl, "DeltaGraph")
         # used below to silent doctest unwanted outputs
         self._org_displayhook = None
+        self._reset_check()
+        # fingerprint, the number of nodes it was computed for and the
+        # labels of the nodes by id
+        self._fingerprint: Tuple[int, int, Dict[int, int]] = None
 
     def __eq__(self, other) -> bool:
         """Equality, up to isomorphism via .df file.
+
+        Graphs with different :py:meth:`fingerprint` are not equal. For
+        graphs with the same fingerprint, the isomorphism is built from
+        nodes with the same labels, see :py:meth:`_match`, and only
+        searched with ``networkx`` if it cannot be built that way.
         """
 
         def get_networkx_iso_graph(d_graph):
             """Create a modified networkx graph that has enough information in to 
             evaluated isomorphism between DeltaGraphs.
             """
+            import networkx as nx
+
             graph = nx.MultiDiGraph()
             for node in d_graph.nodes:
                 graph.add_node(node.full_name,
@@ -170,7 +182,7 @@ class DeltaGraph:
             interesting edge data as it is stored in the ports.
             So all the data we need to compare is in the key.
             """
-            return e1.keys() == e1.keys()
+            return e1.keys() == e2.keys()
 
         def netx_node_match(n1, n2):
             if n1['name'] != n2['name']:
@@ -199,12 +211,211 @@ class DeltaGraph:
         if self.placeholders != other.placeholders:
             return False
 
+        if len(self.nodes) != len(other.nodes):
+            return False
+
+        fingerprint = self.fingerprint()
+        other_fingerprint = other.fingerprint()
+        if fingerprint is not None and other_fingerprint is not None:
+            if fingerprint != other_fingerprint:
+                return False
+            match = self._match(other)
+            if match is not None:
+                return match
+
+        import networkx as nx
+
         g1 = get_networkx_iso_graph(self)
         g2 = get_networkx_iso_graph(other)
         return nx.algorithms.is_isomorphic(g1, g2,
                                            node_match=netx_node_match,
                                            edge_match=netx_edge_match)
 
+    # number of refinements of the labels of the nodes in fingerprint
+    _FINGERPRINT_ROUNDS = 4
+
+    @staticmethod
+    def _node_label(node: RealNode) -> int:
+        """Hash of the attributes of a node compared by ``__eq__``, except
+        for the nodes its ports are connected to.
+
+        Bodies are only described by their access tags, so that bodies of
+        deserialised graphs are not deserialised.
+        """
+        in_ports = tuple((port.index, port.port_type, port.is_optional,
+                          port.in_port_size) for port in node.in_ports)
+        out_ports = tuple((port.index, port.port_type)
+                          for port in node.out_ports)
+        bodies = tuple(tuple(body._access_tags) for body in node.bodies)
+        return hash((node.name,
+                     tuple(node.inputs.items()),
+                     tuple(node.outputs.items()),
+                     in_ports,
+                     out_ports,
+                     bodies))
+
+    @staticmethod
+    def _nodes_match(node: RealNode, other: RealNode) -> bool:
+        """Same comparison of two nodes as the one of ``__eq__``."""
+        if node.name != other.name:
+            return False
+
+        if node.inputs != other.inputs:
+            return False
+
+        if node.outputs != other.outputs:
+            return False
+
+        if node.in_ports != other.in_ports:
+            return False
+
+        if node.out_ports != other.out_ports:
+            return False
+
+        return node.bodies == other.bodies
+
+    def _wiring(self):
+        """Nodes connected to the ports of each node, by index of the
+        ports, as ``(id of the node, index of its port)``.
+
+        Returns ``None`` if ports have more than one wire or are connected
+        to nodes outside of the graph.
+        """
+        ids = {id(node) for node in self.nodes}
+        sources = {key: {} for key in ids}
+        destinations = {key: {} for key in ids}
+        for node in self.nodes:
+            for port in node.out_ports:
+                dest = port.destination
+                dest_id = id(dest.node)
+                if (dest_id not in ids
+                        or port.index in destinations[id(node)]
+                        or dest.index in sources[dest_id]):
+                    return None
+                destinations[id(node)][port.index] = (dest_id, dest.index)
+                sources[dest_id][dest.index] = (id(node), port.index)
+        return sources, destinations
+
+    def _match(self, other: DeltaGraph) -> Union[bool, None]:
+        """Isomorphism between graphs with the same fingerprint.
+
+        As every port has a single wire, the image of a node determines the
+        image of all the nodes connected to it. The image of one node of
+        each connected component is chosen among the nodes of ``other``
+        with the same label, starting from its node with the rarest label.
+
+        Returns
+        -------
+        Union[bool, None]
+            ``None`` if the graphs have ports with more than one wire.
+        """
+        wiring, other_wiring = self._wiring(), other._wiring()
+        if wiring is None or other_wiring is None:
+            return None
+
+        labels, other_labels = self._fingerprint[2], other._fingerprint[2]
+        nodes = {id(node): node for node in self.nodes}
+        other_nodes = {id(node): node for node in other.nodes}
+        candidates: Dict[int, List[int]] = {}
+        for key, label in other_labels.items():
+            candidates.setdefault(label, []).append(key)
+
+        def extend(start, other_start, mapping, used):
+            """Map the component of ``start``, ``None`` if it fails."""
+            added = {start: other_start}
+            todo = [(start, other_start)]
+            while todo:
+                key, other_key = todo.pop()
+                if labels[key] != other_labels[other_key]:
+                    return None
+                if not self._nodes_match(nodes[key], other_nodes[other_key]):
+                    return None
+                for ports, other_ports in zip(wiring, other_wiring):
+                    ports, other_ports = ports[key], other_ports[other_key]
+                    if ports.keys() != other_ports.keys():
+                        return None
+                    for index, (peer, peer_index) in ports.items():
+                        other_peer, other_index = other_ports[index]
+                        if peer_index != other_index:
+                            return None
+                        image = added.get(peer, mapping.get(peer))
+                        if image is None:
+                            if other_peer in used:
+                                return None
+                            added[peer] = other_peer
+                            used.add(other_peer)
+                            todo.append((peer, other_peer))
+                        elif image != other_peer:
+                            return None
+            return added
+
+        # components are mapped from their nodes with the fewest candidates
+        order = sorted(nodes,
+                       key=lambda key: len(candidates.get(labels[key], ())))
+        mapping: Dict[int, int] = {}
+        used = set()
+        for key in order:
+            if key in mapping:
+                continue
+            for other_key in candidates.get(labels[key], ()):
+                if other_key in used:
+                    continue
+                tried = used | {other_key}
+                added = extend(key, other_key, mapping, tried)
+                if added is not None:
+                    mapping.update(added)
+                    used = tried
+                    break
+            else:
+                return False
+        return True
+
+    def fingerprint(self) -> Union[int, None]:
+        """Hash of the structure of the graph, equal for equal graphs.
+
+        It is a Weisfeiler-Lehman hash: the label of each node, made of its
+        name, ports and bodies, is refined a few times with the labels of
+        the nodes it is connected to and the indices of the ports of the
+        wires.
+
+        The fingerprint is kept until the graph is modified via
+        :py:meth:`add_node` or :py:meth:`mark_dirty`, or nodes are added.
+        It is only valid within a process.
+
+        Returns
+        -------
+        Union[int, None]
+            ``None`` if some attributes of the nodes cannot be hashed.
+        """
+        if (self._fingerprint is not None
+                and self._fingerprint[1] == len(self.nodes)):
+            return self._fingerprint[0]
+        self._fingerprint = None
+
+        try:
+            labels = {id(node): self._node_label(node) for node in self.nodes}
+        except TypeError:
+            return None
+
+        # wires as (source, destination, indices of their ports)
+        wires = [(id(node), id(port.destination.node),
+                  (port.index, port.destination.index))
+                 for node in self.nodes for port in node.out_ports]
+
+        for _ in range(self._FINGERPRINT_ROUNDS):
+            neighbours = {key: [] for key in labels}
+            for src, dest, ports in wires:
+                if src in neighbours:
+                    neighbours[src].append((0, ports, labels.get(dest, 0)))
+                if dest in neighbours:
+                    neighbours[dest].append((1, ports, labels[src]))
+            labels = {key: hash((label, tuple(sorted(neighbours[key]))))
+                      for key, label in labels.items()}
+
+        fingerprint = hash(tuple(sorted(labels.values())))
+        self._fingerprint = (fingerprint, len(self.nodes), labels)
+        return fingerprint
+
     @property
     def name(self):
         return self._name
@@ -272,6 +483,7 @@ class DeltaGraph:
         for alien_node in alien_nodes:
             self.nodes.append(alien_node)
             alien_node.graph = self
+            self.mark_dirty(alien_node)
 
         # Merge placeholder dicts
         self.placeholders.update(other.placeholders)
@@ -378,8 +590,13 @@ class DeltaGraph:
                     out_ports_dict[x.name] = [x]
 
             # Set this nodes out ports to a list of merged out ports
-            node.out_ports = [self._merge_out_ports(x)
-                              for x in out_ports_dict.values()]
+            out_ports = [self._merge_out_ports(x)
+                         for x in out_ports_dict.values()]
+            if (len(out_ports) != len(node.out_ports)
+                    or any(a is not b
+                           for a, b in zip(out_ports, node.out_ports))):
+                self.mark_dirty(node)
+            node.out_ports = out_ports
 
     def check(self, allow_top: bool = True, allow_node_key: bool = True):
         """Check that the graph is correct.
@@ -395,6 +612,11 @@ class DeltaGraph:
 
             2. Check typing of wires, see the impl and characterisation tests.
 
+        The graph keeps indexes of the names and wires checked, so that
+        only the nodes added or modified since the last successful check,
+        see :py:meth:`mark_dirty`, and the wires out of them are checked
+        again.
+
         Parameters
         ----------
         allow_top : bool
@@ -413,74 +635,65 @@ class DeltaGraph:
         .. todo::
             Add extra checks of splitting/multi-output of wires in step 1.
         """
-        # check node names
-        nodes_names = [node.full_name for node in self.nodes]
-        if len(set(nodes_names)) != len(nodes_names):
-            raise DeltaIOError(f"nodes' names should be unique\n"
-                               f"graph={self}")
-
-        # check ports
-        in_ports_all = [port
-                        for node in self.nodes
-                        for port in node.in_ports]
-        out_ports_all = [port
-                         for node in self.nodes
-                         for port in node.out_ports]
-        out_ports_dest = [port.destination
-                          for node in self.nodes
-                          for port in node.out_ports]
-
-        # port name uniqueness guarantees port object uniqueness
-        in_ports_names = [port.name for port in in_ports_all]
-        out_ports_names = [port.name for port in out_ports_all]
-        out_ports_dest_names = [port.name for port in out_ports_dest]
-        if len(set(in_ports_names)) != len(in_ports_names):
-            raise DeltaIOError(f"in_ports' names should be unique\n"
-                               f"graph={self}")
-        if len(set(out_ports_names)) != len(out_ports_names):
-            raise DeltaIOError(f"out_ports' names should be unique\n"
-                               f"graph={self}")
-        if len(set(out_ports_dest_names)) != len(out_ports_dest_names):
-            raise DeltaIOError(f"out_ports' destination names should be unique\n"
-                               f"graph={self}")
-
-        # nodes with interactive bodies cannot be portless,
-        # as they block simulation, until scheduling is implemented
-        for node in self.nodes:
-            if not allow_node_key and node.node_key is not None:
-                raise DeltaIOError(
-                    "Node has a node key when allow_node_key is set to False")
-            for body in node.bodies:
-                if (isinstance(body, PyInteractiveBody)
-                        and len(node.in_ports) == 0
-                        and len(node.out_ports) == 0):
-                    raise DeltaIOError(
-                        f"Node {node} without any I/O has an interactive body "
-                        f"{body}. At the moment this is not supported.\n"
-                        "Please either remove this body or connect this node "
-                        "to another one."
-                    )
-
-        # check missing inputs
-        in_ports_unused = [port
-                           for node in self.nodes
-                           for port in node.in_ports
-                           if not port in out_ports_dest]
-        for port in in_ports_unused:
-            if not port.is_optional:
+        flags = (allow_top, allow_node_key)
+        if flags != self._checked_flags or any(
+            id(node) not in self._dirty
+            and self._checked_nodes.get(id(node), (None,))[0] is not node
+            for node in self.nodes
+        ):
+            # nodes were added without add_node or the graph was copied
+            self._reset_check()
+            for node in self.nodes:
+                self.mark_dirty(node)
+
+        dirty = list(self._dirty.values())
+        try:
+            # check names of nodes and ports and missing inputs
+            for node in dirty:
+                self._uncheck_node(node)
+            for node in dirty:
+                self._index_node(node)
+
+            # nodes with interactive bodies cannot be portless,
+            # as they block simulation, until scheduling is implemented
+            for node in dirty:
+                if not allow_node_key and node.node_key is not None:
+                    raise DeltaIOError("Node has a node key when "
+                                       "allow_node_key is set to False")
+                for body in node.bodies:
+                    if (issubclass(body_type(body), PyInteractiveBody)
+                            and len(node.in_ports) == 0
+                            and len(node.out_ports) == 0):
+                        raise DeltaIOError(
+                            f"Node {node} without any I/O has an interactive "
+                            f"body {body}. At the moment this is not "
+                            "supported.\nPlease either remove this body or "
+                            "connect this node to another one."
+                        )
+
+            for port in self._unprovided.values():
                 raise DeltaIOError(f"Mandatory input is not provided\n"
                                    f"graph={self}\n{port=}")
 
-        # check each channel typing
-        for port in out_ports_all:
-            try:
-                self.check_wire(type_s=port.port_type,
-                                type_r=port.destination.port_type,
-                                allow_top=allow_top)
-            except DeltaTypeError as port_type_err:
-                raise DeltaTypeError(
-                    port_type_err.args[0] + f'\n{port=}') from port_type_err
-
+            # check each channel typing, wires into the nodes are immutable
+            # thus only the ones out of them can change
+            for node in dirty:
+                for port in node.out_ports:
+                    try:
+                        self.check_wire(type_s=port.port_type,
+                                        type_r=port.destination.port_type,
+                                        allow_top=allow_top)
+                    except DeltaTypeError as port_type_err:
+                        raise DeltaTypeError(
+                            port_type_err.args[0] + f'\n{port=}'
+                        ) from port_type_err
+
+        except Exception:
+            self._reset_check()
+            raise
+
+        self._checked_flags = flags
+        self._dirty = {}
         return True
 
     def select_bodies(self,
@@ -504,6 +717,97 @@ class DeltaGraph:
             all_selected = all_selected and is_selected
         return all_selected
 
+    def _reset_check(self):
+        """Forget the indexes kept by :py:meth:`check`, so that the next
+        check is of the whole graph.
+        """
+        self._checked_flags = None
+        # nodes added or modified since the last check, by id
+        self._dirty: Dict[int, RealNode] = {}
+        # nodes checked and the names indexed for them, by id
+        self._checked_nodes: Dict[int, Tuple[RealNode, tuple]] = {}
+        # names of nodes and ports checked, to the id of their node
+        self._node_names: Dict[str, int] = {}
+        self._in_port_names: Dict[str, int] = {}
+        self._out_port_names: Dict[str, int] = {}
+        # names of the destinations of out ports, to the in port
+        self._destinations: Dict[str, InPort] = {}
+        # mandatory in ports without a wire, by name
+        self._unprovided: Dict[str, InPort] = {}
+
+    def mark_dirty(self, node: RealNode):
+        """Have the next :py:meth:`check` validate ``node`` and the wires
+        out of it again.
+
+        Called when the node is added to the graph or its ports or bodies
+        change.
+        """
+        self._dirty[id(node)] = node
+        self._fingerprint = None
+
+    def _uncheck_node(self, node: RealNode):
+        """Remove a node from the indexes of :py:meth:`check`."""
+        checked = self._checked_nodes.pop(id(node), None)
+        if checked is None:
+            return
+
+        name, in_names, out_names, dest_names = checked[1]
+        del self._node_names[name]
+        for in_name in in_names:
+            del self._in_port_names[in_name]
+            self._unprovided.pop(in_name, None)
+        for out_name in out_names:
+            del self._out_port_names[out_name]
+        for dest_name in dest_names:
+            dest = self._destinations.pop(dest_name)
+            if not dest.is_optional and dest_name in self._in_port_names:
+                self._unprovided[dest_name] = dest
+
+    def _index_node(self, node: RealNode):
+        """Add a node to the indexes of :py:meth:`check`, checking that
+        names are unique.
+
+        Raises
+        ------
+        DeltaIOError
+            If a name of the node or its ports is not unique.
+        """
+        name = node.full_name
+        if name in self._node_names:
+            raise DeltaIOError(f"nodes' names should be unique\n"
+                               f"graph={self}")
+        self._node_names[name] = id(node)
+
+        # port name uniqueness guarantees port object uniqueness
+        in_names = [port.name for port in node.in_ports]
+        out_names = [port.name for port in node.out_ports]
+        dests = [port.destination for port in node.out_ports]
+        dest_names = [port.name for port in dests]
+        self._checked_nodes[id(node)] = (
+            node, (name, in_names, out_names, dest_names)
+        )
+
+        for in_name, port in zip(in_names, node.in_ports):
+            if in_name in self._in_port_names:
+                raise DeltaIOError(f"in_ports' names should be unique\n"
+                                   f"graph={self}")
+            self._in_port_names[in_name] = id(node)
+            if not port.is_optional and in_name not in self._destinations:
+                self._unprovided[in_name] = port
+
+        for out_name in out_names:
+            if out_name in self._out_port_names:
+                raise DeltaIOError(f"out_ports' names should be unique\n"
+                                   f"graph={self}")
+            self._out_port_names[out_name] = id(node)
+
+        for dest_name, dest in zip(dest_names, dests):
+            if dest_name in self._destinations:
+                raise DeltaIOError(f"out_ports' destination names should be "
+                                   f"unique\ngraph={self}")
+            self._destinations[dest_name] = dest
+            self._unprovided.pop(dest_name, None)
+
     @staticmethod
     def check_wire(type_s: BaseDeltaType,
                    type_r: BaseDeltaType,
@@ -583,6 +887,7 @@ class DeltaGraph:
         node : RealNode
         """
         self.nodes.append(node)
+        self.mark_dirty(node)
 
     def add_placeholder(self, key: str, placeholder: PlaceholderNode):
         """Add a placeholder with unique key to this graph.
@@ -616,6 +921,8 @@ class DeltaGraph:
             Directional multigraph object used for graphical representation of
             :py:class:`DeltaGraph`.
         """
+        import networkx as nx
+
         graph = nx.MultiDiGraph()
         for node in self.nodes:
             graph.add_node(node.full_name, name=node.full_name, type="block")
@@ -648,6 +955,9 @@ class DeltaGraph:
         Additional parameters are passed to draw_networkx.
         See the NetworkX documentation for further details on parameters.
         """
+        import matplotlib.pyplot as plt
+        import networkx as nx
+
         if seed is None:
             seed = np.random
 
@@ -699,6 +1009,8 @@ class DeltaGraph:
         To spread nodes out, you can apply a layout function.
         Layout -> Edge-weighted Spring Embedded Layout -> (none)
         """
+        import networkx as nx
+
         nx.write_gml(self.get_networkx_graph(**kwargs), path)
 
     @classmethod
@@ -722,23 +1034,46 @@ class DeltaGraph:
         DeltaGraph
         """
         graph = cls(capnp_obj.name, lvl)
+        capnp_bodies = capnp_obj.bodies
 
-        # Initialise all nodes with their bodies and in ports
-        for capnp_node in capnp_obj.nodes:
+        # Each body and type is deserialised once, even if it is shared
+        # by several nodes, and bodies only when a node uses them
+        serialised_bodies = {}
+        port_types = {}
 
-            # Create body objects
-            bodies = []
-            for body_id in capnp_node.bodies:
-                capnp_body = capnp_obj.bodies[body_id]
+        def get_body(body_id):
+            body = serialised_bodies.get(body_id)
+            if body is None:
+                capnp_body = capnp_bodies[body_id]
                 which_body = capnp_body.which()
                 if "python" in which_body:
-                    body = dill.loads(capnp_body.python.dillImpl)
+                    blob = capnp_body.python.dillImpl
                 elif "interactive" in which_body:
-                    body = dill.loads(capnp_body.interactive.dillImpl)
+                    blob = capnp_body.interactive.dillImpl
                 else:
                     raise ValueError("Body has invalid type. Not all bodies are"
                                      " currently supported for deserialisation.")
-                bodies.append(body)
+                body = SerialisedBody(blob, dill.loads(capnp_body.tags))
+                serialised_bodies[body_id] = body
+
+            # Function bodies have no state, other bodies are deserialised
+            # for each node
+            if issubclass(body.body_type, PyFuncBody):
+                return body
+            return SerialisedBody(body.blob, body.access_tags)
+
+        def get_port_type(blob):
+            port_type = port_types.get(blob)
+            if port_type is None:
+                port_type = port_types[blob] = dill.loads(blob)
+            return port_type
+
+        # Initialise all nodes with their bodies and in ports
+        nodes = []
+        capnp_nodes = list(capnp_obj.nodes)
+        for capnp_node in capnp_nodes:
+
+            bodies = [get_body(body_id) for body_id in capnp_node.bodies]
 
             # Name ID stripping
             name = '_'.join(capnp_node.name.split('_')[:-1])
@@ -747,11 +1082,12 @@ class DeltaGraph:
             node = PythonNode(graph, bodies, inputs=None,
                               pos_in_nodes=[], kw_in_nodes={},
                               outputs=None, name=name)
+            nodes.append(node)
 
             # Create and add InPorts and inputs
             inputs = []
             for capnp_in_port in capnp_node.inPorts:
-                port_type = dill.loads(capnp_in_port.type)
+                port_type = get_port_type(capnp_in_port.type)
                 if capnp_in_port.optional:
                     port_type = Optional(port_type)
                 inputs.append((capnp_in_port.name, port_type))
@@ -759,28 +1095,18 @@ class DeltaGraph:
 
             node.inputs = OrderedDict(inputs)
 
-        # Create mapping between OutPorts and the already existing InPorts
+        # Create mapping between OutPorts and the already existing InPorts,
+        # which are in the same order as in the serialisation
         port_dests = {}
         for wire in capnp_obj.graph:
-            dest_node = capnp_obj.nodes[wire.destNode]
-            dest_index = dest_node.inPorts[wire.destInPort].name
-
-            # Find the dest port that has the correct index
-            dest_port = None
-            for port in graph.nodes[wire.destNode].in_ports:
-                if dest_index == port.index:
-                    dest_port = port
-                    break
-
-            src_port_indicies = (wire.srcNode, wire.srcOutPort)
-            port_dests[src_port_indicies] = dest_port
+            dest_port = nodes[wire.destNode].in_ports[wire.destInPort]
+            port_dests[(wire.srcNode, wire.srcOutPort)] = dest_port
 
         # Create and add OutPorts and outputs
-        for i, capnp_node in enumerate(capnp_obj.nodes):
+        for i, (capnp_node, node) in enumerate(zip(capnp_nodes, nodes)):
             outputs = []
-            node = graph.nodes[i]
             for j, capnp_out_port in enumerate(capnp_node.outPorts):
-                port_type = dill.loads(capnp_out_port.type)
+                port_type = get_port_type(capnp_out_port.type)
                 port_index = capnp_out_port.name
                 dest_port = port_dests[(i, j)]
                 outputs.append((port_index, port_type))
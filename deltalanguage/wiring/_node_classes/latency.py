@@ -41,3 +41,6 @@ class Latency:
         return (self._clocks == other._clocks and
                 self._time == other._time and 
                 self.variance == other.variance)
+
+    def __hash__(self):
+        return hash((self._clocks, self._time, self.variance))
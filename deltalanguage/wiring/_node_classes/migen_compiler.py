@@ -0,0 +1,421 @@
+"""Compilation of migen fragments to Python functions.
+
+The interpreter of ``migen.sim`` walks the statements of a fragment at each
+clock cycle. Here the statements are translated once to Python source, one
+straight-line function per statement list, which reads and writes the
+signal values of the evaluator directly. The code objects are cached on disk
+by the hash of the generated source.
+"""
+
+import collections.abc
+import hashlib
+import logging
+import marshal
+import os
+import sys
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+import migen
+from migen.fhdl.bitcontainer import value_bits_sign
+from migen.fhdl.structure import (_ArrayProxy, _Assign, _Operator, _Part,
+                                  _Slice, Case, Cat, ClockSignal, Constant,
+                                  If, Replicate, ResetSignal, Signal)
+from migen.sim.core import Evaluator, _truncate
+
+from deltalanguage.logging import make_logger
+
+log = make_logger(logging.WARNING, "Migen Compiler")
+
+_BINARY_OPS = {
+    "+": "+",
+    "-": "-",
+    "*": "*",
+    ">>>": ">>",
+    "<<<": "<<",
+    "&": "&",
+    "^": "^",
+    "|": "|",
+    "<": "<",
+    "<=": "<=",
+    "==": "==",
+    "!=": "!=",
+    ">": ">",
+    ">=": ">=",
+}
+
+
+def cache_dir() -> str:
+    """Default directory of the on-disk caches of simulation backends."""
+    base = os.environ.get("XDG_CACHE_HOME",
+                          os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "deltalanguage")
+
+
+def _mask(nbits: int) -> int:
+    return (1 << nbits) - 1
+
+
+class _Generator:
+    """Generates the source of the functions for a list of statement lists.
+
+    Signals and helpers are referred to by name in the source and bound in
+    :py:attr:`namespace`, so that the same source is produced for fragments
+    of the same structure.
+    """
+
+    def __init__(self, clock_domains):
+        self.clock_domains = clock_domains
+        self.namespace = {"_truncate": _truncate}
+        self._names = {}
+        self._arrays = {}
+        self._tmp = 0
+        self.lines = []
+
+    def _signal(self, signal: Signal) -> str:
+        name = self._names.get(signal)
+        if name is None:
+            name = f"s{len(self._names)}"
+            self._names[signal] = name
+            self.namespace[name] = signal
+        return name
+
+    def _array(self, node: _ArrayProxy):
+        """Names of the tuples of signals and of reset values of an array of
+        signals of the same shape, ``None`` for other arrays.
+        """
+        choices = tuple(node.choices)
+        if not all(isinstance(c, Signal) and not c.variable
+                   for c in choices):
+            return None
+        if len({(c.nbits, c.signed) for c in choices}) != 1:
+            return None
+        # signals compare to expressions, so the tuples are keyed by id
+        key = tuple(map(id, choices))
+        names = self._arrays.get(key)
+        if names is None:
+            names = (f"a{len(self._arrays)}", f"r{len(self._arrays)}")
+            self._arrays[key] = names
+            self.namespace[names[0]] = choices
+            self.namespace[names[1]] = tuple(c.reset.value for c in choices)
+        return names
+
+    def _temp(self) -> str:
+        self._tmp += 1
+        return f"t{self._tmp}"
+
+    def _emit(self, indent: int, line: str):
+        self.lines.append("    " * indent + line)
+
+    def _domain_signal(self, node):
+        domain = self.clock_domains[node.cd]
+        if isinstance(node, ClockSignal):
+            return domain.clk
+        if domain.rst is None:
+            if node.allow_reset_less:
+                return Constant(0)
+            raise ValueError("Attempted to get reset signal of resetless"
+                             " domain '{}'".format(node.cd))
+        return domain.rst
+
+    def expr(self, node, postcommit: bool = False) -> str:
+        """Expression evaluating ``node`` as ``Evaluator.eval``."""
+        if isinstance(node, Constant):
+            return repr(node.value)
+        elif isinstance(node, Signal):
+            name = self._signal(node)
+            read = f"_get({name}, {node.reset.value!r})"
+            if postcommit:
+                return f"(mod[{name}] if {name} in mod else {read})"
+            return read
+        elif isinstance(node, _Operator):
+            operands = [self.expr(o, postcommit) for o in node.operands]
+            if node.op == "m":
+                return f"({operands[1]} if {operands[0]} else {operands[2]})"
+            elif len(operands) == 1 and node.op in ("-", "~"):
+                return f"({node.op}{operands[0]})"
+            elif len(operands) == 2 and node.op in _BINARY_OPS:
+                return f"({operands[0]} {_BINARY_OPS[node.op]} {operands[1]})"
+            raise NotImplementedError(node.op)
+        elif isinstance(node, _Slice):
+            if node.stop <= node.start:
+                return "0"
+            value = self.expr(node.value, postcommit)
+            return (f"(({value} >> {node.start})"
+                    f" & {_mask(node.stop - node.start)})")
+        elif isinstance(node, _Part):
+            value = self.expr(node.value, postcommit)
+            offset = self.expr(node.offset, postcommit)
+            return f"(({value} >> {offset}) & {_mask(node.width)})"
+        elif isinstance(node, Cat):
+            terms = []
+            shift = 0
+            for element in node.l:
+                nbits = len(element)
+                term = f"({self.expr(element, postcommit)} & {_mask(nbits)})"
+                terms.append(f"({term} << {shift})" if shift else term)
+                shift += nbits
+            return f"({' | '.join(terms)})" if terms else "0"
+        elif isinstance(node, Replicate):
+            nbits = len(node.v)
+            # copies of a positive value of nbits bits do not overlap
+            factor = sum(1 << i * nbits for i in range(node.n))
+            value = self.expr(node.v, postcommit)
+            return f"(({value} & {_mask(nbits)}) * {factor})"
+        elif isinstance(node, _ArrayProxy):
+            key = self.expr(node.key, postcommit)
+            idx = f"min({len(node.choices) - 1}, {key})"
+            array = self._array(node)
+            if array is not None and not postcommit:
+                i = self._temp()
+                return f"_get({array[0]}[({i} := {idx})], {array[1]}[{i}])"
+            choices = ", ".join(self.expr(c, postcommit)
+                                for c in node.choices)
+            return f"(({choices},)[{idx}])"
+        elif isinstance(node, (ClockSignal, ResetSignal)):
+            return self.expr(self._domain_signal(node), postcommit)
+        raise NotImplementedError(node)
+
+    def assign(self, node, value: str, indent: int, target: str = None):
+        """Statements assigning ``value`` to ``node`` as
+        ``Evaluator.assign``. ``value`` is evaluated once if ``node`` is a
+        signal, otherwise it must be a name or a constant.
+        ``target`` replaces the name of a signal of the same shape as
+        ``node``.
+        """
+        if isinstance(node, Signal):
+            if node.variable:
+                raise NotImplementedError(node)
+            name = self._signal(node) if target is None else target
+            if node.signed:
+                self._emit(indent, f"mod[{name}] = _truncate({value}, "
+                                   f"{node.nbits}, True)")
+            else:
+                self._emit(indent,
+                           f"mod[{name}] = {value} & {_mask(node.nbits)}")
+        elif isinstance(node, Cat):
+            rest = self._temp()
+            self._emit(indent, f"{rest} = {value}")
+            for element in node.l:
+                nbits = len(element)
+                part = self._temp()
+                self._emit(indent, f"{part} = {rest} & {_mask(nbits)}")
+                self.assign(element, part, indent)
+                self._emit(indent, f"{rest} >>= {nbits}")
+        elif isinstance(node, _Slice):
+            clear = _mask(node.stop) - _mask(node.start)
+            full = self._temp()
+            self._emit(indent, f"{full} = ({self.expr(node.value, True)}"
+                               f" & {~clear}) | (({value}"
+                               f" & {_mask(node.stop - node.start)})"
+                               f" << {node.start})")
+            self.assign(node.value, full, indent)
+        elif isinstance(node, _Part):
+            start = self._temp()
+            full = self._temp()
+            self._emit(indent, f"{start} = {self.expr(node.offset, True)}")
+            self._emit(indent,
+                       f"{full} = ({self.expr(node.value, True)}"
+                       f" & ~(((1 << ({start} + {node.width})) - 1)"
+                       f" - ((1 << {start}) - 1)))"
+                       f" | (({value} & {_mask(node.width)}) << {start})")
+            self.assign(node.value, full, indent)
+        elif isinstance(node, _ArrayProxy):
+            n = len(node.choices)
+            idx = self._temp()
+            self._emit(indent, f"{idx} = min({n - 1}, {self.expr(node.key)})")
+            array = self._array(node)
+            if array is not None:
+                self.assign(node.choices[0], value, indent,
+                            target=f"{array[0]}[{idx}]")
+                return
+            if value_bits_sign(node.key)[1]:
+                self._emit(indent, f"if {idx} < 0:")
+                self._emit(indent + 1, f"{idx} += {n}")
+            for i, choice in enumerate(node.choices):
+                self._emit(indent, f"{'if' if i == 0 else 'elif'}"
+                                   f" {idx} == {i}:")
+                self.assign(choice, value, indent + 1)
+        else:
+            raise NotImplementedError(node)
+
+    def statements(self, statements, indent: int):
+        """Statements executing ``statements`` as ``Evaluator.execute``."""
+        for s in statements:
+            if isinstance(s, _Assign):
+                if isinstance(s.l, Signal):
+                    self.assign(s.l, self.expr(s.r), indent)
+                else:
+                    value = self._temp()
+                    self._emit(indent, f"{value} = {self.expr(s.r)}")
+                    self.assign(s.l, value, indent)
+            elif isinstance(s, If):
+                self._emit(indent, f"if {self.expr(s.cond)}"
+                                   f" & {_mask(len(s.cond))}:")
+                self._block(s.t, indent + 1)
+                if s.f:
+                    self._emit(indent, "else:")
+                    self._block(s.f, indent + 1)
+            elif isinstance(s, Case):
+                nbits, signed = value_bits_sign(s.test)
+                test = self._temp()
+                self._emit(indent, f"{test} = _truncate({self.expr(s.test)}, "
+                                   f"{nbits}, {signed})")
+                keyword = "if"
+                for k, v in s.cases.items():
+                    if isinstance(k, Constant):
+                        self._emit(indent, f"{keyword} {test} == {k.value!r}:")
+                        self._block(v, indent + 1)
+                        keyword = "elif"
+                if "default" in s.cases:
+                    if keyword == "if":
+                        self.statements(s.cases["default"], indent)
+                    else:
+                        self._emit(indent, "else:")
+                        self._block(s.cases["default"], indent + 1)
+            elif isinstance(s, collections.abc.Iterable):
+                self.statements(s, indent)
+            else:
+                raise NotImplementedError(s)
+
+    def _block(self, statements, indent: int):
+        start = len(self.lines)
+        self.statements(statements, indent)
+        if len(self.lines) == start:
+            self._emit(indent, "pass")
+
+    def function(self, name: str, statements):
+        self._emit(0, f"def {name}(sv, mod):")
+        self._emit(1, "_get = sv.get")
+        self.statements(statements, 1)
+        self._emit(0, "")
+
+
+def _load_code(source: str, path: Optional[str]):
+    """Code object of ``source``, from the cache at ``path`` if possible."""
+    if path is None:
+        return compile(source, "<migen>", "exec")
+
+    key = hashlib.sha256(
+        repr((sys.implementation.cache_tag, source)).encode()
+    ).hexdigest()
+    file = os.path.join(path, key + ".marshal")
+    try:
+        with open(file, "rb") as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    code = compile(source, "<migen>", "exec")
+    try:
+        os.makedirs(path, exist_ok=True)
+        # written atomically, so that readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                marshal.dump(code, f)
+            os.replace(tmp, file)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError as e:
+        log.info(f"cannot cache compiled migen code in {path}: {e}")
+    return code
+
+
+def compile_statements(statement_lists: List[list],
+                       clock_domains,
+                       path: Optional[str] = None) -> List[Callable]:
+    """Compile lists of migen statements to Python functions.
+
+    Parameters
+    ----------
+    statement_lists : List[list]
+        Lists of statements, e.g. ``comb`` and ``sync`` of a fragment.
+    clock_domains
+        Clock domains of the fragment, used for clock and reset signals.
+    path : Optional[str]
+        Directory of the on-disk cache of the compiled code, if any.
+
+    Returns
+    -------
+    List[Callable]
+        For each list, a function of the signal values and the
+        modifications of a ``migen.sim.Evaluator`` executing it.
+
+    Raises
+    ------
+    NotImplementedError
+        If the statements use a construct that is not supported,
+        e.g. ``Display`` or memory ports that were not lowered to arrays.
+    """
+    generator = _Generator(clock_domains)
+    for i, statements in enumerate(statement_lists):
+        generator.function(f"step{i}", statements)
+    source = "\n".join(generator.lines)
+
+    namespace = generator.namespace
+    exec(_load_code(source, path), namespace)
+    return [namespace[f"step{i}"] for i in range(len(statement_lists))]
+
+
+class CompiledEvaluator(Evaluator):
+    """``migen.sim.Evaluator`` which runs the compiled functions of the
+    statement lists of a fragment, and interprets any other statement.
+    """
+
+    def __init__(self, clock_domains, replaced_memories,
+                 steps: Dict[int, Callable]):
+        super().__init__(clock_domains, replaced_memories)
+        self._steps = steps
+
+    def execute(self, statements):
+        step = self._steps.get(id(statements))
+        if step is None:
+            super().execute(statements)
+        else:
+            step(self.signal_values, self.modifications)
+
+
+class CompiledSimulator(migen.Simulator):
+    """``migen.Simulator`` running the ``comb`` and ``sync`` statements of
+    the fragment as compiled Python functions.
+
+    If the fragment cannot be compiled it is interpreted as by
+    ``migen.Simulator``.
+
+    Parameters
+    ----------
+    args, kwargs
+        Passed to ``migen.Simulator``.
+    cache_path : Optional[str]
+        Directory of the on-disk cache of the compiled code, by default
+        a subdirectory of :py:func:`cache_dir`. ``None`` disables the cache.
+    """
+
+    def __init__(self, *args, cache_path: Optional[str] = "", **kwargs):
+        super().__init__(*args, **kwargs)
+        if cache_path == "":
+            cache_path = os.path.join(cache_dir(), "migen")
+
+        # the lists of statements are not modified from here on,
+        # so they are identified by id
+        statement_lists = [self.fragment.comb]
+        statement_lists.extend(self.fragment.sync.values())
+        try:
+            steps = compile_statements(statement_lists,
+                                       self.fragment.clock_domains,
+                                       cache_path)
+        except NotImplementedError as e:
+            log.warning(f"cannot compile migen fragment, "
+                        f"interpreting it: {e!r}")
+            self.compiled = False
+            return
+
+        self.compiled = True
+        self.evaluator = CompiledEvaluator(
+            self.evaluator.clock_domains,
+            self.evaluator.replaced_memories,
+            {id(statements): step
+             for statements, step in zip(statement_lists, steps)}
+        )
@@ -3,7 +3,8 @@ import atexit
 import logging
 from collections import OrderedDict
 import math
-from typing import Callable, List, Type, Union
+import re
+from typing import TYPE_CHECKING, Callable, Dict, List, Type, Union
 
 import migen
 
@@ -15,7 +16,12 @@ from deltalanguage.logging import make_logger
 from .._body_templates import BodyTemplate
 from .._node_templates import NodeTemplate
 from .latency import Latency
-from .node_bodies import PyMigenBody
+from .migen_compiler import CompiledSimulator
+from .node_bodies import PyMigenBody, PyVerilatedBody
+from .verilated_model import VerilatedModel, VerilatedPort
+
+if TYPE_CHECKING:
+    from deltalanguage.runtime import DeltaQueue
 
 
 class MigenNodeTemplate(BodyTemplate):
@@ -46,6 +52,29 @@ class MigenNodeTemplate(BodyTemplate):
     generics : dict
         Generic constants for the node (e.g. number of bits,
         number of pipeline stages, etc..)
+    batch_cycles : int
+        Maximum number of clock cycles per evaluation of the node in
+        :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`.
+        By default (``None``) each evaluation advances the clock to its next
+        edge, i.e. half a clock cycle. If given, each evaluation runs full
+        clock cycles: after the first one the module keeps running without
+        new inputs until an output is valid, a message is waiting for one of
+        the in ports or this number of cycles is reached, so that idle cycles
+        do not pass messages between nodes.
+    compiled : bool
+        If ``True``, the logic of the module is compiled to Python functions
+        which are run instead of interpreting it at each clock cycle,
+        see ``CompiledSimulator``.
+        The compiled code is cached on disk.
+    verilated : bool
+        If ``True``, nodes made by this template also have a
+        :py:class:`PyVerilatedBody<deltalanguage.wiring.PyVerilatedBody>`,
+        which simulates the Verilog of the module with Verilator. It is
+        selected with ``DeltaGraph.select_bodies(preferred=["verilated"])``.
+        Verilator runs full clock cycles, thus ``batch_cycles`` must be
+        given, so that both bodies run the same cycles per evaluation.
+        The module is built when it is first evaluated and the build is
+        cached on disk by the hash of the Verilog.
 
     Attributes
     ----------
@@ -136,7 +165,10 @@ class MigenNodeTemplate(BodyTemplate):
                  vcd_name: str = None,
                  generics: dict = None,
                  node_template: NodeTemplate = None,
-                 tags: List[str] = None):
+                 tags: List[str] = None,
+                 batch_cycles: int = None,
+                 compiled: bool = False,
+                 verilated: bool = False):
         if name is None:
             name = type(self).__name__
         super().__init__(name, Latency(clocks=1), lvl, tags)
@@ -145,6 +177,17 @@ class MigenNodeTemplate(BodyTemplate):
         self.log = make_logger(lvl, f"{self.name}")
         self.vcd_name = vcd_name
 
+        if batch_cycles is not None and batch_cycles < 1:
+            raise ValueError("batch_cycles must be a positive integer")
+        if verilated and batch_cycles is None:
+            raise ValueError("verilated nodes need batch_cycles, "
+                             "as they run full clock cycles")
+        self.batch_cycles = batch_cycles
+        self.compiled = compiled
+        # in queues of the node running this template, see set_in_queues
+        self._waiting_queues = ()
+        self._const_inputs = frozenset()
+
         if generics is not None:
             self.generics = generics
 
@@ -167,10 +210,14 @@ class MigenNodeTemplate(BodyTemplate):
         self.rename_port_signals()
 
         # define a stimulus generator
+        self._tb_num_iter = tb_num_iter
         self._tb = self.tb_generator(tb_num_iter)
 
         # set up a simulator and perform run-once elaboration
         self._sim_object = None
+        self._verilated_object = None
+        # the module can be converted to Verilog only once
+        self._verilog = None
         atexit.register(self.cleanup)
 
         # Merge with or create a new NodeTemplate
@@ -183,6 +230,10 @@ class MigenNodeTemplate(BodyTemplate):
                               for name, _, type_ in self._dut.in_ports])
 
         NodeTemplate.merge_migenblock(node_template, self, _inputs, _outputs)
+        if verilated:
+            NodeTemplate.merge_migenblock(self._node_template,
+                                          _VerilatedBodyTemplate(self),
+                                          _inputs, _outputs)
 
     def add_pa_in_port(self, name: str, t: Optional):
         """Add input protocol adaptor v2.
@@ -246,6 +297,22 @@ class MigenNodeTemplate(BodyTemplate):
 
         return out_port
 
+    def __getstate__(self):
+        """Drop the stimulus generator, which cannot be pickled, so that
+        templates can be sent to other processes before they are simulated.
+        """
+        if self._sim_object is not None or self._verilated_object is not None:
+            raise TypeError(f"{self.name} cannot be pickled once it has "
+                            "started its simulation")
+        state = self.__dict__.copy()
+        del state["_tb"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._tb = self.tb_generator(self._tb_num_iter)
+        atexit.register(self.cleanup)
+
     def cleanup(self):
         """Actions that are performed just before the object is destroyed
         At the moment we only care about closing the trace file that we have
@@ -263,6 +330,8 @@ class MigenNodeTemplate(BodyTemplate):
         """
         if self._sim_object:
             self._sim_object.vcd.close()
+        if self._verilated_object:
+            self._verilated_object[0].close()
 
     def close(self):
         self._sim.vcd.close()
@@ -288,14 +357,55 @@ class MigenNodeTemplate(BodyTemplate):
         This shim injects a version of _sim that is only constructed on demand.
         """
         if self._sim_object is None:
-            sim_object = migen.Simulator(self._dut, self._tb,
-                                         vcd_name=self.vcd_name)
+            simulator = CompiledSimulator if self.compiled else migen.Simulator
+            sim_object = simulator(self._dut, self._tb,
+                                   vcd_name=self.vcd_name)
             self._sim_object = sim_object
             self._elaborate()
             return sim_object
         else:
             return self._sim_object
 
+    @property
+    def _verilated(self):
+        """The module built with Verilator and the indices of the signals
+        of its ports, built on demand as :py:attr:`_sim`.
+        """
+        if self._verilated_object is None:
+            conv = self.get_serialised_body()
+            ports = []
+
+            def add(signal, is_input):
+                ports.append(VerilatedPort(conv.ns.get_name(signal),
+                                           len(signal), is_input))
+                return len(ports) - 1
+
+            in_ready = tuple(add(port.ready, False)
+                             for _, port, _ in self._dut.in_ports)
+            in_ports = tuple((name, add(port.valid, True),
+                              add(port.data, True))
+                             for name, port, _ in self._dut.in_ports)
+            out_ready = tuple(add(port.ready, True)
+                              for _, port, _ in self._dut.out_ports)
+            out_ports = tuple((add(port.valid, False), add(port.data, False))
+                              for _, port, _ in self._dut.out_ports)
+            # there is no clock if there is no synchronous logic
+            if re.search(r"\binput\s+sys_clk\b", conv.main_source):
+                clk = len(ports)
+                ports.append(VerilatedPort("sys_clk", 1, True))
+            else:
+                clk = None
+
+            # the module name may have changed since the conversion
+            top = re.search(r"^module\s+(\w+)", conv.main_source,
+                            re.MULTILINE).group(1)
+            model = VerilatedModel(conv.main_source, top, ports,
+                                   conv.data_files)
+            model.eval()
+            self._verilated_object = (model, in_ready, in_ports, out_ready,
+                                      out_ports, clk)
+        return self._verilated_object
+
     @abstractmethod
     def migen_body(self, template):
         """This is where user defines the combinational and synchronous logic
@@ -308,12 +418,89 @@ class MigenNodeTemplate(BodyTemplate):
         """
         return PyMigenBody(self._py_sim_body, self, self.latency, self._tags)
 
+    def construct_verilated_body(self):
+        """Construct the ``PyVerilatedBody`` of the nodes of this template.
+        """
+        return PyVerilatedBody(self._py_verilated_body, self, self.latency,
+                               self._tags)
+
     def tb_generator(self, tb_num_iter: int = None):
         """Generator, a.k.a. testbench.
 
         This method generates a sequence of stimuli for the migen module
         it may run for any number of cycles, but should ensure the input and
         output queues are eventually serviced.
+
+        The testbench is specialised by the logging level of the node:
+        unless debug logging is enabled it only reads the signals needed for
+        the handshake and logs nothing, see :py:meth:`_tb_fast`.
+        """
+        if self.log.isEnabledFor(logging.DEBUG):
+            return self._tb_debug(tb_num_iter)
+        return self._tb_fast(tb_num_iter)
+
+    def _tb_fast(self, tb_num_iter: int = None):
+        """Testbench without debug logging.
+
+        It does the same handshake as :py:meth:`_tb_debug`, with the signals
+        of the ports collected once, ``ready`` of the out ports set once and
+        no reads of the signals after the clock cycle.
+        """
+        in_ready = tuple(port.ready for _, port, _ in self._dut.in_ports)
+        in_ports = tuple((name, port.valid, port.data)
+                         for name, port, _ in self._dut.in_ports)
+        out_ports = tuple((port.valid, port.data)
+                          for _, port, _ in self._dut.out_ports)
+
+        # out_ports are always ready to receive data, see _tb_debug
+        for _, port, _ in self._dut.out_ports:
+            yield port.ready.eq(1)
+
+        tb_iter = 0
+        while True:
+            if tb_num_iter is not None:
+                if tb_iter == tb_num_iter:
+                    raise ValueError(
+                        f'{self.name}.tb_generator needs more iteration to '
+                        f'finish, please increase it and restart.'
+                    )
+
+            is_module_ready = True
+            for ready in in_ready:
+                if not (yield ready):
+                    is_module_ready = False
+                    break
+
+            if self.in_buffer and is_module_ready:
+                for name, valid, data in in_ports:
+                    if name not in self.in_buffer:
+                        raise AttributeError(
+                            f'''{self.__class__.__name__} input {name}
+                            is invalid''')
+                    value = self.in_buffer[name]
+                    if value is None:
+                        yield valid.eq(0)
+                        yield data.eq(0)
+                    else:
+                        yield valid.eq(1)
+                        yield data.eq(value)
+
+            if out_ports:
+                out_tmp = []
+                for valid, data in out_ports:
+                    if (yield valid):
+                        out_tmp.append((yield data))
+                    else:
+                        out_tmp.append(None)
+                self.out_buffer = tuple(out_tmp)
+
+            yield
+
+            tb_iter += 1
+
+    def _tb_debug(self, tb_num_iter: int = None):
+        """Testbench with debug logging of the ports and of
+        :py:attr:`debug_signals` at each clock cycle.
         """
         tb_iter = 0
         while True:
@@ -428,12 +615,14 @@ class MigenNodeTemplate(BodyTemplate):
         self._sim.evaluator.execute(self._sim.fragment.comb)
         self._sim._commit_and_comb_propagate()
 
-    def _clock(self):
+    def _clock(self) -> bool:
         """One iteration of the second part of `migen.Simulator.run`.
 
-        This part executes one clock cycle of the synchronous logic and
-        propagates the combinational logic.
+        This part advances the clocks to their next edge, executes the
+        synchronous logic on rising edges and propagates the combinational
+        logic. Returns whether the testbench was run.
         """
+        tb_run = False
         delta_t, rising, falling = self._sim.time.tick()
         self._sim.vcd.delay(delta_t)
         for clk_d in rising:
@@ -445,12 +634,21 @@ class MigenNodeTemplate(BodyTemplate):
                 self._sim.evaluator.execute(self._sim.fragment.sync[clk_d])
             if clk_d in self._sim.generators:
                 self._sim._process_generators(clk_d)
+                tb_run = True
         for clk_d in falling:
             self._sim.evaluator.assign(
                 self._sim.fragment.clock_domains[clk_d].clk,
                 0
             )
         self._sim._commit_and_comb_propagate()
+        return tb_run
+
+    def _cycle(self):
+        """Advance the clocks up to and including the next rising edge on
+        which the testbench is run, i.e. one full clock cycle.
+        """
+        while not self._clock():
+            pass
 
     @staticmethod
     def _py_sim_body(self, **kwargs):
@@ -462,10 +660,98 @@ class MigenNodeTemplate(BodyTemplate):
 
         # runs until the generator terminates.
         # for this impl, this will happen when inputs is empty
-        self._clock()
+        if self.batch_cycles is None:
+            self._clock()
+        else:
+            self._cycle()
+            self._fast_forward(kwargs, self._cycle)
 
         return self.out_buffer
 
+    @staticmethod
+    def _py_verilated_body(self, **kwargs):
+        """As :py:meth:`_py_sim_body` with :py:attr:`batch_cycles`, but the
+        module is simulated by Verilator.
+        """
+        self.in_buffer = kwargs
+        self.out_buffer = None
+
+        self._verilated_cycle()
+        self._fast_forward(kwargs, self._verilated_cycle)
+
+        return self.out_buffer
+
+    def _verilated_cycle(self):
+        """One clock cycle of the module built with Verilator.
+
+        The handshake is the one of :py:meth:`_tb_fast`: the ports are read
+        before the rising edge of the clock, which samples the previous
+        inputs, and the new inputs are set after it.
+        """
+        model, in_ready, in_ports, out_ready, out_ports, clk = \
+            self._verilated
+
+        is_module_ready = all(model.get(ready) for ready in in_ready)
+        if out_ports:
+            self.out_buffer = tuple(model.get(data) if model.get(valid)
+                                    else None
+                                    for valid, data in out_ports)
+
+        if clk is not None:
+            model.set(clk, 1)
+            model.eval()
+
+        for ready in out_ready:
+            model.set(ready, 1)
+        if self.in_buffer and is_module_ready:
+            for name, valid, data in in_ports:
+                if name not in self.in_buffer:
+                    raise AttributeError(
+                        f'''{self.__class__.__name__} input {name}
+                        is invalid''')
+                value = self.in_buffer[name]
+                if value is None:
+                    model.set(valid, 0)
+                    model.set(data, 0)
+                else:
+                    model.set(valid, 1)
+                    model.set(data, value)
+        model.eval()
+
+        if clk is not None:
+            model.set(clk, 0)
+            model.eval()
+
+    def set_in_queues(self, in_queues: Dict[str, 'DeltaQueue']):
+        """Set the in queues of the node running this template, which
+        are checked for waiting messages by :py:attr:`batch_cycles`.
+        """
+        self._waiting_queues = tuple(in_q for in_q in in_queues.values()
+                                     if not in_q.constant)
+        self._const_inputs = frozenset(name
+                                       for name, in_q in in_queues.items()
+                                       if in_q.constant)
+
+    def _fast_forward(self, inputs: Dict[str, object],
+                      cycle: Callable[[], None]):
+        """Run up to ``batch_cycles - 1`` more clock cycles with ``cycle``
+        after the one with ``inputs``, as if the node was evaluated without
+        the optional inputs, until an output is valid or a message is
+        waiting.
+        """
+        idle = {name: value if name in self._const_inputs else None
+                for name, value in inputs.items()}
+        for _ in range(self.batch_cycles - 1):
+            if (self.out_buffer is not None
+                    and any(out is not None for out in self.out_buffer)):
+                return
+            if any(not in_q.empty() for in_q in self._waiting_queues):
+                return
+
+            self.in_buffer = idle
+            self.out_buffer = None
+            cycle()
+
     def call(self, *args, **kwargs):
         """This performs the same action as ``Interactive.call``,
         i.e. use this method to provide inputs to the node while building
@@ -521,7 +807,9 @@ class MigenNodeTemplate(BodyTemplate):
         parameters.
         """
         fully_parameterised = True
-        if fully_parameterised:
+        if self._verilog is not None:
+            return self._verilog
+        elif fully_parameterised:
             ios = set()
 
             for _, port, _ in self._dut.in_ports:
@@ -532,9 +820,23 @@ class MigenNodeTemplate(BodyTemplate):
                 for signal in self.unpack_record(port):
                     ios.add(signal)
 
-            v_str = migen.fhdl.verilog.convert(
+            self._verilog = migen.fhdl.verilog.convert(
                 self._dut, ios, name=self.module_name)
-            return v_str
+            return self._verilog
 
         else:
             raise NotImplementedError
+
+
+class _VerilatedBodyTemplate(BodyTemplate):
+    """Body template for the :py:class:`PyVerilatedBody` of the nodes made
+    by a :py:class:`MigenNodeTemplate`.
+    """
+
+    def __init__(self, migen_template: MigenNodeTemplate):
+        super().__init__(migen_template.name, migen_template.latency,
+                         migen_template.lvl, migen_template._tags)
+        self._migen_template = migen_template
+
+    def construct_body(self):
+        return self._migen_template.construct_verilated_body()
@@ -1,20 +1,70 @@
 """Classes to represent different node bodies a Deltaflow node could represent.
 """
 from abc import ABC, abstractmethod
-from typing import Callable, List
+from typing import Callable, List, MutableMapping, Optional
+import types
+import weakref
 
 import dill
 import dis
+import inspect
 import logging
 
 from deltalanguage.logging import make_logger
 from deltalanguage.data_types import DeltaIOError
 from .latency import Latency
+from .serialisation import (BodyCache,
+                            content_key,
+                            identity_fingerprint,
+                            same_fingerprint)
 
 
 log = make_logger(logging.WARNING, "Bodies")
 
 
+class CodeFingerprint:
+    """What :py:meth:`PythonBody.python_body_eq` compares of the code of
+    two callbacks: its variable names, constants and instructions.
+
+    Fingerprints are computed once per code object and compared by hash
+    first, see :py:func:`code_fingerprint`.
+    """
+
+    __slots__ = ("key", "_hash")
+
+    def __init__(self, code: types.CodeType):
+        instructions = tuple((i.opcode, i.arg, i.argval)
+                             for i in dis.get_instructions(code))
+        self.key = (code.co_varnames, code.co_consts, instructions)
+        # constants and arguments of instructions may not be hashable
+        self._hash = hash((code.co_varnames,
+                           tuple((op, arg) for op, arg, _ in instructions)))
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, CodeFingerprint):
+            return False
+        return self._hash == other._hash and self.key == other.key
+
+    def __hash__(self) -> int:
+        return self._hash
+
+
+# fingerprints by code object
+_code_fingerprints: MutableMapping[types.CodeType, CodeFingerprint] = \
+    weakref.WeakKeyDictionary()
+
+
+def code_fingerprint(fn: Callable) -> CodeFingerprint:
+    """Fingerprint of the code of ``fn``, computed once per code object."""
+    code = fn.__code__
+    fingerprint = _code_fingerprints.get(code)
+    if fingerprint is None:
+        fingerprint = _code_fingerprints[code] = CodeFingerprint(code)
+    return fingerprint
+
+
 class Body(ABC):
 
     def __init__(self,
@@ -66,6 +116,21 @@ class Body(ABC):
         """
         pass
 
+    def serialise(self, cache: BodyCache = None) -> str:
+        """Same as :py:attr:`as_serialised`, bodies that can be stored in
+        an on-disk cache look their serialisation up in ``cache`` first.
+
+        Parameters
+        ----------
+        cache : BodyCache
+            Cache shared between exports.
+
+        Returns
+        -------
+        str
+        """
+        return self.as_serialised
+
     def __eq__(self, other) -> bool:
         if not isinstance(other, Body):
             return False
@@ -78,36 +143,61 @@ class Body(ABC):
 
         return True
 
+    def __hash__(self) -> int:
+        return hash((tuple(self._access_tags), self.latency))
+
 
 class PythonBody(Body):
 
-    def python_body_eq(self, other, my_callback):
+    # the fingerprint of the body and its serialisation, when cached
+    _serialised = None
 
-        # Body class must be the same
-        if type(self) != type(other):
-            print(type(self))
-            print(type(other))
-            return False
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_serialised", None)
+        return state
 
-        if my_callback.__name__ != other.callback.__name__:
-            return False
+    def _state(self) -> dict:
+        """Attributes of the body that are serialised."""
+        return {name: value for name, value in vars(self).items()
+                if name != "_serialised"}
 
-        if my_callback.__code__.co_varnames != other.callback.__code__.co_varnames:
-            return False
+    def _fingerprint(self) -> Optional[list]:
+        """Objects the serialisation is made from, see
+        :py:func:`identity_fingerprint`, or ``None`` if the serialisation
+        cannot be kept in memory.
+        """
+        return identity_fingerprint(self.callback, self._state())
+
+    def _content_key(self) -> Optional[str]:
+        """Key of the serialisation in an on-disk cache, ``None`` if it
+        cannot be stored there.
+        """
+        return content_key((type(self), self._state()))
+
+    def python_body_eq(self, other, my_callback):
 
-        if my_callback.__code__.co_consts != other.callback.__code__.co_consts:
+        # Body class must be the same
+        if type(self) != body_type(other):
             return False
 
-        my_instructions = list(dis.get_instructions(my_callback))
-        other_instructions = list(dis.get_instructions(other.callback))
-        if len(my_instructions) != len(other_instructions):
+        if my_callback.__name__ != other.callback.__name__:
             return False
 
-        for (i, j) in zip(my_instructions, other_instructions):
-            if (i.opcode, i.arg, i.argval) != (j.opcode, j.arg, j.argval):
-                return False
+        return code_fingerprint(my_callback) == \
+            code_fingerprint(other.callback)
 
-        return True
+    def __hash__(self) -> int:
+        """Consistent with the equality of all the Python bodies, which
+        compares at least their class, access tags, latency and code.
+        """
+        callback = getattr(self, "callback", None)
+        if callback is None:
+            return super().__hash__()
+        return hash((super().__hash__(),
+                     type(self),
+                     callback.__name__,
+                     code_fingerprint(callback)))
 
     @staticmethod
     def freevar_check(my_callback, other_callback):
@@ -134,11 +224,47 @@ class PythonBody(Body):
     def as_serialised(self) -> str:
         """Serialisation of body as string.
 
+        The serialisation is kept until the callback, its closure, the
+        globals it refers to or the attributes of the body are replaced.
+        Objects modified in place are not detected.
+
         Returns
         -------
         str
         """
-        return dill.dumps(self, recurse=True)
+        return self._dill_serialise()
+
+    def serialise(self, cache: BodyCache = None) -> str:
+        """Overwrites :meth:`Body.serialise`.
+
+        The serialisation is looked up in ``cache`` by the hash of the
+        code and values the body is made of.
+        """
+        return self._dill_serialise(cache)
+
+    def _dill_serialise(self, cache: BodyCache = None) -> bytes:
+        """Serialisation of the body with ``dill``, which is also used for
+        the subclasses serialised differently, e.g. to ship bodies to the
+        processes of
+        :py:class:`DeltaProcessSimulator
+        <deltalanguage.runtime.DeltaProcessSimulator>`.
+        """
+        fingerprint = self._fingerprint()
+        if fingerprint is not None and self._serialised is not None:
+            cached_fingerprint, blob = self._serialised
+            if same_fingerprint(cached_fingerprint, fingerprint):
+                return blob
+
+        key = self._content_key() if cache is not None else None
+        blob = cache.get(key) if key is not None else None
+        if blob is None:
+            blob = dill.dumps(self, recurse=True)
+            if key is not None:
+                cache.put(key, blob)
+
+        if fingerprint is not None:
+            self._serialised = (fingerprint, blob)
+        return blob
 
 
 class PyFuncBody(PythonBody):
@@ -150,14 +276,26 @@ class PyFuncBody(PythonBody):
         A callable object that will play a role of the body.
     environment : Callable
         Link to the environment.
+    blocking : bool
+        If ``True`` the body can block for a long time, e.g. waiting for I/O,
+        and schedulers which run many bodies on a single thread evaluate it
+        on a separate thread.
+    batch_size : int
+        If set the body is evaluated once per batch of up to this number of
+        messages, it receives a list per input and returns a list per
+        output.
     """
 
     def __init__(self, fn: Callable,
                  latency: Latency = Latency(time=350),
-                 tags: List[str] = None):
+                 tags: List[str] = None,
+                 blocking: bool = False,
+                 batch_size: int = None):
         tags = tags if tags is not None else []
         super().__init__(latency, tags + [fn.__name__])
         self.callback = fn
+        self.blocking = blocking
+        self.batch_size = batch_size
 
     def eval(self, *args, **kwargs):
         return self.callback(*args, **kwargs)
@@ -173,6 +311,8 @@ class PyFuncBody(PythonBody):
 
         return super().__eq__(other)
 
+    __hash__ = PythonBody.__hash__
+
 
 class PyConstBody(PythonBody):
     """Node body for python are to be treated as constant.
@@ -252,6 +392,17 @@ class PyConstBody(PythonBody):
 
         return self.constant_value
 
+    def _fingerprint(self) -> Optional[list]:
+        # arguments are nodes, which are serialised with their graph
+        if self.args or self.kwargs:
+            return None
+        return super()._fingerprint()
+
+    def _content_key(self) -> Optional[str]:
+        if self.args or self.kwargs:
+            return None
+        return super()._content_key()
+
     def __eq__(self, other) -> bool:
         """Equality, up to isomorphism as component of .df file.
         """
@@ -274,6 +425,8 @@ class PyConstBody(PythonBody):
 
         return super().__eq__(other)
 
+    __hash__ = PythonBody.__hash__
+
 
 class PyMethodBody(PythonBody):
     """Node body for python methods.
@@ -289,19 +442,35 @@ class PyMethodBody(PythonBody):
         Object instance for state storage.
     environment : Callable
         Link to the environment.
+    blocking : bool
+        If ``True`` the body can block for a long time, e.g. waiting for I/O,
+        and schedulers which run many bodies on a single thread evaluate it
+        on a separate thread.
+    batch_size : int
+        If set the body is evaluated once per batch of up to this number of
+        messages, it receives a list per input and returns a list per
+        output.
     """
 
     def __init__(self, fn, instance,
                  latency: Latency = Latency(time=350),
-                 tags: List[str] = None):
+                 tags: List[str] = None,
+                 blocking: bool = False,
+                 batch_size: int = None):
         tags = tags if tags is not None else []
         super().__init__(latency, tags + [fn.__name__])
         self.callback = fn
         self.instance = instance
+        self.blocking = blocking
+        self.batch_size = batch_size
 
     def eval(self, *args, **kwargs):
         return self.callback(self.instance, *args, **kwargs)
 
+    def _fingerprint(self) -> Optional[list]:
+        # the instance holds state modified in place
+        return None
+
     def __eq__(self, other) -> bool:
         """Equality, up to isomorphism as component of .df file.
         """
@@ -317,6 +486,8 @@ class PyMethodBody(PythonBody):
 
         return super().__eq__(other)
 
+    __hash__ = PythonBody.__hash__
+
 
 class PyMigenBody(PyMethodBody):
     """Node body for migen methods.
@@ -355,19 +526,102 @@ class PyMigenBody(PyMethodBody):
                     ret = ret[0]
                 return ret
 
-    @property
-    def as_serialised(self) -> str:
-        """Serialisation of body as string.
-
-        Returns
-        -------
-        str
+    def serialise(self, cache: BodyCache = None) -> str:
+        """Overwrites :meth:`PythonBody.serialise`, the body is serialised
+        to Verilog and is not cached.
         """
         return str(self.instance.get_serialised_body())
 
 
+class PyVerilatedBody(PyMigenBody):
+    """Node body for migen nodes simulated by Verilator.
+
+    The Verilog of the node is built with Verilator and each evaluation
+    runs a full clock cycle of the built model, see
+    :py:meth:`MigenNodeTemplate._py_verilated_body`.
+    It has the ``"verilated"`` tag, so that it can be selected with
+    ``DeltaGraph.select_bodies(preferred=["verilated"])``.
+    """
+
+    def __init__(self, fn, instance,
+                 latency: Latency = Latency(clocks=1),
+                 tags: List[str] = None):
+        tags = tags if tags is not None else []
+        super().__init__(fn, instance, latency, tags + ["verilated"])
+
+
 class PyInteractiveBody(PyFuncBody):
     """Body class to represent bodies that expose queues to the designer.
     We explicitily define this class to enable custom-code creation in the
     runtimes.
+
+    The body can be a coroutine function (``async def``), in this case it
+    awaits ``receive`` and ``send`` of the node.
+    """
+
+    @property
+    def is_async(self) -> bool:
+        """``True`` if the body is a coroutine function."""
+        return inspect.iscoroutinefunction(self.callback)
+
+
+class SerialisedBody(Body):
+    """Body of a deserialised graph, which is deserialised only when it is
+    first used, e.g. when a runtime accesses the selected body of the node.
+
+    Its access tags are available without deserialising it, so that bodies
+    can be selected. Other attributes are the ones of the deserialised
+    body.
+
+    Parameters
+    ----------
+    blob : bytes
+        Serialisation of the body with ``dill``.
+    tags : List[object]
+        Access tags of the body, which include its class.
+    """
+
+    def __init__(self, blob: bytes, tags: List[object]):
+        self.blob = blob
+        self._access_tags = tags
+        self.body_type = next(tag for tag in tags
+                              if isinstance(tag, type)
+                              and issubclass(tag, Body))
+        self._body = None
+
+    def load(self) -> Body:
+        """The deserialised body, deserialised only once."""
+        if self._body is None:
+            self._body = dill.loads(self.blob)
+        return self._body
+
+    def __getattr__(self, item):
+        # private and special attributes are never delegated, in particular
+        # when the body itself is being copied
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return getattr(self.load(), item)
+
+    @property
+    def language(self) -> str:
+        return self.body_type.language.fget(self)
+
+    @property
+    def as_serialised(self) -> bytes:
+        """The original serialisation."""
+        return self.blob
+
+    def __eq__(self, other) -> bool:
+        return self.load() == other
+
+    def __hash__(self) -> int:
+        return hash(self.load())
+
+
+def body_type(body: Body) -> type:
+    """Class of ``body``, or the one it deserialises to if it is a
+    :py:class:`SerialisedBody`.
     """
+    if isinstance(body, SerialisedBody):
+        return body.body_type
+    return type(body)
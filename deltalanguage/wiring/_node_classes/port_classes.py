@@ -4,11 +4,10 @@ Each node stores references to all of its in and out ports.
 
 from typing import NamedTuple, Union
 
-import dill
-
 from deltalanguage.data_types import BaseDeltaType, Optional
 
 from .abstract_node import AbstractNode
+from .serialisation import dumps_type
 
 
 class InPort(
@@ -113,10 +112,10 @@ class InPort(
             The ``capnp`` object of this in port.
         """
         capnp_in_port.name = self.index
-        capnp_in_port.type = dill.dumps(self.port_type)
+        capnp_in_port.type = dumps_type(self.port_type)
         capnp_in_port.optional = self.is_optional
 
-    def capnp_wiring(self, nodes, capnp_wire):
+    def capnp_wiring(self, nodes, capnp_wire, node_index=None):
         """Serialise the wire that this port connects to.
 
         Parameters
@@ -126,15 +125,26 @@ class InPort(
             Used to find required indexes.
         capnp_wire
             The capnp object of this wire.
+        node_index : Dict[str, Tuple[int, Dict[str, int]]]
+            Position in ``nodes`` and positions of the in ports by
+            the name of each node. If provided it is used instead of
+            searching ``nodes``.
         """
-        for i, node in enumerate(nodes):
-            if node.name == self.node.full_name:
+        if node_index is not None:
+            if self.node.full_name in node_index:
+                i, in_ports = node_index[self.node.full_name]
                 capnp_wire.destNode = i
-                for j, in_port in enumerate(node.inPorts):
-                    if in_port.name == self.index:
-                        capnp_wire.destInPort = j
-                        break
-                break
+                if self.index in in_ports:
+                    capnp_wire.destInPort = in_ports[self.index]
+        else:
+            for i, node in enumerate(nodes):
+                if node.name == self.node.full_name:
+                    capnp_wire.destNode = i
+                    for j, in_port in enumerate(node.inPorts):
+                        if in_port.name == self.index:
+                            capnp_wire.destInPort = j
+                            break
+                    break
         capnp_wire.direct = (self.in_port_size > 0)
 
 
@@ -235,9 +245,9 @@ class OutPort(
             The ``capnp`` object of this in port.
         """
         capnp_out_port.name = self.index
-        capnp_out_port.type = dill.dumps(self.port_type)
+        capnp_out_port.type = dumps_type(self.port_type)
 
-    def capnp_wiring(self, nodes, capnp_wire):
+    def capnp_wiring(self, nodes, capnp_wire, node_index=None):
         """Serialise the wire that this port connects to.
 
         Parameters
@@ -247,5 +257,11 @@ class OutPort(
             Used to find required indexes.
         capnp_wire
             The ``capnp`` object of this wire.
+        node_index : Dict[str, Tuple[int, Dict[str, int]]]
+            Position in ``nodes`` and positions of the in ports by
+            the name of each node, see :py:meth:`InPort.capnp_wiring`.
         """
-        self.destination.capnp_wiring(nodes, capnp_wire)
+        if node_index is None:
+            self.destination.capnp_wiring(nodes, capnp_wire)
+        else:
+            self.destination.capnp_wiring(nodes, capnp_wire, node_index)
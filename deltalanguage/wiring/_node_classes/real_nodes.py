@@ -1,9 +1,10 @@
 """Module defining Real Node types, which can be run using our DeltaPySimulator."""
 from __future__ import annotations
+import asyncio
 import dill
 from inspect import _empty, signature
 import logging
-from queue import Full
+from queue import Empty, Full
 import sys
 import textwrap
 from threading import Event
@@ -11,6 +12,8 @@ from time import sleep
 import typing
 from collections import OrderedDict
 
+import numpy as np
+
 from deltalanguage.data_types import (BaseDeltaType,
                                       DeltaTypeError,
                                       Optional,
@@ -26,11 +29,16 @@ from .abstract_node import AbstractNode, IndexProxyNode
 from .node_bodies import (PyConstBody,
                           PyInteractiveBody,
                           PyMigenBody,
-                          Body)
+                          Body,
+                          SerialisedBody,
+                          body_type)
 from .port_classes import InPort, OutPort
 
 if typing.TYPE_CHECKING:
-    from deltalanguage.runtime import DeltaQueue, DeltaPySimulator
+    from deltalanguage.runtime import (AsyncioScheduler,
+                                       CooperativeScheduler,
+                                       DeltaQueue,
+                                       DeltaPySimulator)
     from .. import DeltaGraph
 
 
@@ -100,8 +108,9 @@ class RealNode(AbstractNode):
         # Note that out_ports are always stored in the same order as outputs
         self.out_ports: typing.List[OutPort] = []
 
-        self.log = make_logger(lvl,
-                               f"{self.__class__.__name__} {self.full_name}")
+        # the logger is made on first use, as making one is costly
+        self._lvl = lvl
+        self._log = None
 
         # See MessageLog for detail
         self._clock = 0
@@ -291,6 +300,8 @@ class RealNode(AbstractNode):
                 break
         else:
             self.out_ports.append(new_port)
+        self.graph.mark_dirty(self)
+        port_destination.node.graph.mark_dirty(port_destination.node)
 
         # If this port is going into a port on a different graph,
         # flatten this graph into said graph
@@ -318,6 +329,7 @@ class RealNode(AbstractNode):
         """
         my_port = InPort(arg_name, as_delta_type(in_type), self, in_port_size)
         self.in_ports.append(my_port)
+        self.graph.mark_dirty(self)
         return my_port
 
     def _create_upstream_ports(self,
@@ -391,6 +403,15 @@ class RealNode(AbstractNode):
         """
         return f"{self._name[0]}_{self._name[1]}"
 
+    @property
+    def log(self) -> logging.Logger:
+        """Logger of this node."""
+        if self._log is None:
+            self._log = make_logger(
+                self._lvl, f"{self.__class__.__name__} {self.full_name}"
+            )
+        return self._log
+
     @property
     def name(self) -> str:
         """Non-unique name of this node as string
@@ -399,6 +420,11 @@ class RealNode(AbstractNode):
 
     @property
     def body(self):
+        if isinstance(self._body, SerialisedBody):
+            # the body is deserialised on its first use
+            serialised, self._body = self._body, self._body.load()
+            self.bodies = [self._body if body is serialised else body
+                           for body in self.bodies]
         if self._body:
             return self._body
         else:
@@ -422,6 +448,9 @@ class PythonNode(RealNode):
     sig_stop : Event
         Communication channel through which a runtime simulator or a runtime
         signals `thread_worker` to stop.
+    scheduler : typing.Union[AsyncioScheduler, CooperativeScheduler, None]
+        Scheduler running this node if the runtime simulator uses one,
+        otherwise ``None`` and the node runs on its own thread.
     node_key : typing.Optional[str]
         Keyword argument used for providing the node to the block, included for
         debugging purposes.
@@ -452,7 +481,8 @@ class PythonNode(RealNode):
 
         self._is_const = False
 
-        const_body_no = sum(isinstance(body, PyConstBody) for body in bodies)
+        const_body_no = sum(issubclass(body_type(body), PyConstBody)
+                            for body in bodies)
         if const_body_no > 0:
             if const_body_no == len(bodies):
                 self._is_const = True
@@ -469,6 +499,18 @@ class PythonNode(RealNode):
         self.in_queues: typing.Dict[str, DeltaQueue] = None
         self.out_queues: typing.Dict[str, DeltaQueue] = None
         self.sig_stop: Event = None
+        self.scheduler: typing.Union[AsyncioScheduler,
+                                     CooperativeScheduler] = None
+        self._async_body = False
+        self._async_queues = False
+        self._receive_plans = {}
+        self._out_plan = ()
+        self._compulsory_names = ()
+        self._optional_names = ()
+        self._in_types = {}
+        self._log_io = True
+        self._log_messages = False
+        self._batch_size = None
         self.node_key = node_key
         self.in_port_size = in_port_size
 
@@ -488,6 +530,63 @@ class PythonNode(RealNode):
         self.in_queues = runtime.in_queues[self.full_name]
         self.out_queues = runtime.out_queues[self.full_name]
         self.sig_stop = runtime.sig_stop
+        self.scheduler = getattr(runtime, "scheduler", None)
+
+        body = self.body if self._body else None
+        self._async_body = (isinstance(body, PyInteractiveBody)
+                            and body.is_async)
+        self._batch_size = getattr(body, "batch_size", None)
+        # constant nodes are evaluated before the scheduler is started
+        self._async_queues = (self.scheduler is not None
+                              and self.scheduler.is_async
+                              and not self.is_const())
+        self._compile_plan()
+
+    def _compile_plan(self):
+        """Fix the order of the in and out queues and the logging flags
+        used by :py:meth:`receive` and :py:meth:`send`, so that they do not
+        have to be worked out per message.
+
+        It has to be called again if ``in_queues`` or ``out_queues`` are
+        replaced.
+        """
+        in_queues = self.in_queues or {}
+        out_queues = self.out_queues or {}
+
+        # plans of receive by the selected inputs, () selects all of them
+        self._receive_plans = {}
+        self._plan_receive(())
+        self._out_plan = tuple((name, out_queues.get(name))
+                               for name in self.outputs)
+        self._compulsory_names = tuple(name
+                                       for name, in_q in in_queues.items()
+                                       if not in_q.optional)
+        self._optional_names = tuple(name
+                                     for name, in_q in in_queues.items()
+                                     if in_q.optional)
+        self._in_types = {in_port.index: in_port.port_type
+                          for in_port in self.in_ports}
+
+        if isinstance(self._body, PyMigenBody):
+            self._body.instance.set_in_queues(in_queues)
+
+        self._log_io = self.log.isEnabledFor(logging.INFO)
+
+    def _plan_receive(self, args: typing.Tuple[str, ...]) -> typing.Tuple[
+            typing.Tuple[str, ...],
+            typing.Tuple[DeltaQueue, ...],
+            typing.Tuple[DeltaQueue, ...]]:
+        """Names and queues of the received inputs, all or only selected
+        ones, and the queues of the compulsory ones amongst them.
+        """
+        selected = [(name, in_q)
+                    for name, in_q in (self.in_queues or {}).items()
+                    if not args or name in args]
+        plan = (tuple(name for name, _ in selected),
+                tuple(in_q for _, in_q in selected),
+                tuple(in_q for _, in_q in selected if not in_q.optional))
+        self._receive_plans[args] = plan
+        return plan
 
     def check_stop(self):
         """Check the stop signal, which can be set by a runtime simulator or
@@ -505,6 +604,9 @@ class PythonNode(RealNode):
 
         Check if the node should stop.
 
+        If the body of the node is a coroutine function the result has to be
+        awaited, i.e. ``await node.receive()``.
+
         Parameters
         ----------
         args : str
@@ -516,45 +618,281 @@ class PythonNode(RealNode):
             If there is one input is specified via ``args`` it is received as
             an object, overwise the input values are returned as a dictionary.
         """
-        # receive all or only selected inputs
-        if args:
-            in_queues = {name: in_q
-                         for name, in_q in self.in_queues.items()
-                         if name in args}
+        if self._async_queues:
+            return self.scheduler.dispatch(self, self.areceive(*args))
+
+        names, in_queues, compulsory = self._receive_plan(args)
+
+        if self.scheduler is not None:
+            self.scheduler.wait_until(
+                self,
+                lambda: not any(in_q.empty() for in_q in compulsory)
+            )
+
+        val, received = self._process_received(
+            names, [in_q.get() for in_q in in_queues]
+        )
+
+        if self.scheduler is None and not received:
+            # let the Python GIL take a look at the other threads
+            sleep(1e-9)
+
+        return self._single_or_all(val, args)
+
+    async def areceive(
+        self,
+        *args: str
+    ) -> typing.Union[typing.Dict[str, typing.Any], typing.Any]:
+        """Coroutine version of :py:meth:`receive`, it suspends the caller
+        instead of blocking while compulsory inputs are not provided.
+
+        Only used with the ``"asyncio"`` scheduler of
+        :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`.
+        """
+        names, in_queues, _ = self._receive_plan(args)
+        items = []
+        for in_q in in_queues:
+            items.append(await in_q.aget())
+        val, received = self._process_received(names, items)
+
+        if not received:
+            # let the event loop take a look at the other nodes
+            await asyncio.sleep(0)
+
+        return self._single_or_all(val, args)
+
+    def receive_many(self,
+                     port: str,
+                     max_n: int,
+                     timeout: float = None) -> typing.List[typing.Any]:
+        """Receive a batch of messages from a single in port.
+
+        Waits until at least one message is available, unless the input is
+        optional or the timeout expires, in these cases the list can be
+        empty. The clock and the message log are updated once per batch.
+
+        If the body of the node is a coroutine function the result has to be
+        awaited, i.e. ``await node.receive_many(...)``.
+
+        Parameters
+        ----------
+        port : str
+            Name of the in port.
+        max_n : int
+            Maximum number of messages to receive.
+        timeout : float
+            Maximum time (in seconds) to wait for the first message, by
+            default it is not limited. It is not used by the
+            ``"cooperative"`` scheduler.
+
+        Returns
+        -------
+        typing.List[typing.Any]
+            The received messages in the order they were sent.
+        """
+        if self._async_queues:
+            return self.scheduler.dispatch(
+                self, self.areceive_many(port, max_n, timeout))
+
+        in_q = self._in_queue(port)
+        if in_q is None:
+            val = []
         else:
-            in_queues = self.in_queues
+            if self.scheduler is not None and not in_q.optional:
+                self.scheduler.wait_until(self, lambda: not in_q.empty())
+
+            try:
+                item = in_q.get_many(max_n, timeout=timeout)
+            except Empty:
+                item = QueueMessage([], clk=0)
+            val = self._process_received((port,), (item,),
+                                         batch=True)[0][port]
+
+        if self.scheduler is None and not val:
+            # let the Python GIL take a look at the other threads
+            sleep(1e-9)
+
+        return self._single_or_all({port: val}, (port,))
 
+    async def areceive_many(self,
+                            port: str,
+                            max_n: int,
+                            timeout: float = None) -> typing.List[typing.Any]:
+        """Coroutine version of :py:meth:`receive_many`.
+
+        Only used with the ``"asyncio"`` scheduler of
+        :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`.
+        """
+        in_q = self._in_queue(port)
+        if in_q is None:
+            val = []
+        else:
+            item = await in_q.aget_many(max_n, timeout)
+            val = self._process_received((port,), (item,),
+                                         batch=True)[0][port]
+
+        if not val:
+            # let the event loop take a look at the other nodes
+            await asyncio.sleep(0)
+
+        return self._single_or_all({port: val}, (port,))
+
+    def _in_queue(self, port: str) -> typing.Optional[DeltaQueue]:
+        """The queue of an in port, ``None`` if the port is not connected."""
+        if port not in self.inputs:
+            raise NameError(f"Node {self.full_name} tried to receive from "
+                            f"invalid port {port}")
+        return self.in_queues.get(port)
+
+    def _batch_ports(
+        self
+    ) -> typing.Tuple[typing.Tuple[str, ...], typing.Tuple[str, ...]]:
+        """Names of the compulsory and of the optional in ports."""
+        return self._compulsory_names, self._optional_names
+
+    @staticmethod
+    def _pad_batch(values: typing.Dict[str, typing.List[typing.Any]],
+                   n: int,
+                   optional: typing.List[str]):
+        """Pad the batches of optional inputs with ``None``."""
+        for name in optional:
+            values[name] += [None] * (n - len(values[name]))
+
+    def _receive_batch(
+        self,
+        max_n: int
+    ) -> typing.Dict[str, typing.List[typing.Any]]:
+        """Receive batches of the same length from all in ports.
+
+        The first compulsory input defines the length of the batches,
+        the other compulsory inputs wait for the same number of messages,
+        the optional inputs are padded with ``None``.
+        """
+        compulsory, optional = self._batch_ports()
         values = {}
-        for name, in_q in in_queues.items():
-            values[name] = in_q.get()
-            if not isinstance(values[name], QueueMessage):
+        n = max_n
+        if compulsory:
+            values[compulsory[0]] = self.receive_many(compulsory[0], max_n)
+            n = len(values[compulsory[0]])
+        for name in compulsory[1:]:
+            values[name] = []
+            while len(values[name]) < n:
+                values[name] += self.receive_many(name, n - len(values[name]))
+        for name in optional:
+            values[name] = self.receive_many(name, n)
+
+        if not compulsory:
+            n = max([len(batch) for batch in values.values()] + [1])
+        self._pad_batch(values, n, optional)
+        return values
+
+    async def _areceive_batch(
+        self,
+        max_n: int
+    ) -> typing.Dict[str, typing.List[typing.Any]]:
+        """Coroutine version of :py:meth:`_receive_batch`."""
+        compulsory, optional = self._batch_ports()
+        values = {}
+        n = max_n
+        if compulsory:
+            values[compulsory[0]] = await self.areceive_many(compulsory[0],
+                                                             max_n)
+            n = len(values[compulsory[0]])
+        for name in compulsory[1:]:
+            values[name] = []
+            while len(values[name]) < n:
+                values[name] += await self.areceive_many(
+                    name, n - len(values[name]))
+        for name in optional:
+            values[name] = await self.areceive_many(name, n)
+
+        if not compulsory:
+            n = max([len(batch) for batch in values.values()] + [1])
+        self._pad_batch(values, n, optional)
+        return values
+
+    def _receive_plan(self, args: typing.Tuple[str, ...]) -> typing.Tuple[
+            typing.Tuple[str, ...],
+            typing.Tuple[DeltaQueue, ...],
+            typing.Tuple[DeltaQueue, ...]]:
+        """Receive all or only selected inputs."""
+        plan = self._receive_plans.get(args)
+        if plan is None:
+            plan = self._plan_receive(args)
+        return plan
+
+    def _process_received(
+        self,
+        names: typing.Sequence[str],
+        items: typing.Sequence[QueueMessage],
+        batch: bool = False
+    ) -> typing.Tuple[typing.Dict[str, typing.Any], bool]:
+        """Log received messages, update the logical clock and unpack the
+        inner messages.
+
+        Returns the inner messages by the names of the inputs and whether
+        any of them is not ``None``.
+        """
+        in_types = {} if batch else self._in_types
+        clock = self._clock
+        received = False
+        val = {}
+        for name, item in zip(names, items):
+            if not isinstance(item, QueueMessage):
                 raise TypeError(
-                    f"Queue {in_q} from port {repr(in_q._src)} contained "
-                    f"an item which was not a QueueMessage: {values[name]}"
+                    f"Queue {self.in_queues[name]} from port "
+                    f"{repr(self.in_queues[name]._src)} contained "
+                    f"an item which was not a QueueMessage: {item}"
                 )
-            self.msg_log.add_message(self.full_name, name, values[name])
+            if self._log_messages:
+                self.msg_log.add_message(self.full_name, name, item,
+                                         in_types.get(name))
+
+            # logical clock update
+            if item.clk > clock:
+                clock = item.clk
 
-        # logical clock update
-        self._clock = max([self._clock] + [v.clk for v in values.values()])
+            # unpack the inner msg
+            val[name] = item.msg
+            received = received or item.msg is not None
 
-        # unpack the inner msg
-        val = {k: v.msg for k, v in values.items()}
+        self._clock = clock
 
         self.check_stop()
 
-        if all(v is None for v in val.values()):
-            # let the Python GIL take a look at the other threads
-            sleep(1e-9)
+        return val, received
 
+    def _single_or_all(self, val: typing.Dict[str, typing.Any],
+                       args: typing.Tuple[str, ...]):
         # if there is just one value to return, unpack it from the dict
         if len(val) == 1 and args:
-            val = list(val.values())[0]
+            val = next(iter(val.values()))
 
-        if val:
+        if self._log_io and val:
             self.log.info(f"<- {val}")
 
+        if self._async_body and not self._async_queues:
+            return _ready(val)
+
         return val
 
+    def _send_args(
+        self,
+        ret_to_send: typing.Union[object, typing.Tuple]
+    ) -> typing.Tuple:
+        """Unpack a tuple-based return value to the arguments of send.
+
+        Parameters
+        ----------
+        ret_to_send : typing.Union[object, typing.Tuple]
+            Either a single value to be sent or a tuple of multiple values
+            to be sent.
+        """
+        if len(self.outputs) > 1 and hasattr(ret_to_send, '__iter__'):
+            return tuple(ret_to_send)
+        else:
+            return (ret_to_send,)
+
     def _unpack_and_send(self, ret_to_send: typing.Union[object, typing.Tuple]):
         """Unpack a tuple-based return value and then send the output using the
         normal send method.
@@ -566,10 +904,7 @@ class PythonNode(RealNode):
             to be sent.
         """
         if ret_to_send is not None:
-            if len(self.outputs) > 1 and hasattr(ret_to_send, '__iter__'):
-                self.send(*ret_to_send)
-            else:
-                self.send(ret_to_send)
+            self.send(*self._send_args(ret_to_send))
 
     def send(self, *args, **kwargs):
         """Sends the node's output(s) via out ports.
@@ -578,6 +913,9 @@ class PythonNode(RealNode):
         until unblocked or a stop signal is raised, which shall stop
         the execution of the node.
 
+        If the body of the node is a coroutine function the result has to be
+        awaited, i.e. ``await node.send(...)``.
+
         Parameters
         ----------
         ret : typing.Union[object, typing.Tuple]
@@ -586,20 +924,152 @@ class PythonNode(RealNode):
             a named tuple is used, with the names of the fields matching
             the names of the out ports.
         """
+        if self._async_queues:
+            return self.scheduler.dispatch(self, self.asend(*args, **kwargs))
 
-        def check_stop_send(out_q: DeltaQueue, message: QueueMessage):
-            while True:
-                try:
-                    out_q.put(message)
-                    self.check_stop()
-                    break
-                except Full:
-                    self.check_stop()
-                except:
-                    raise
+        for out_q, message in self._messages_to_send(args, kwargs):
+            self._check_stop_put(out_q, message, out_q.put)
+
+        if self.scheduler is None:
+            # let the Python GIL take a look at the other threads
+            sleep(1e-9)
+
+        if self._async_body:
+            return _ready(None)
+
+    def _check_stop_put(self,
+                        out_q: DeltaQueue,
+                        message: QueueMessage,
+                        put: typing.Callable[[QueueMessage], None]):
+        """Put the message to the queue, checking the stop signal while the
+        queue is full.
+        """
+        if self.scheduler is not None and message.msg is not None:
+            self.scheduler.wait_until(self, lambda: not out_q.full())
+
+        while True:
+            try:
+                put(message)
+                self.check_stop()
+                break
+            except Full:
+                self.check_stop()
+            except:
+                raise
+
+    def send_many(self, port: str, values: typing.Union[list, np.ndarray]):
+        """Send a batch of messages via a single out port.
+
+        The batch is moved as a single item of the queue if the queue allows
+        it. The clock and the message log are updated once per batch.
+
+        If the body of the node is a coroutine function the result has to be
+        awaited, i.e. ``await node.send_many(...)``.
+
+        Parameters
+        ----------
+        port : str
+            Name of the out port.
+        values : typing.Union[list, np.ndarray]
+            The messages, either in a list or in a one-dimensional ``numpy``
+            array of the type given by ``as_numpy_type()`` of the port type,
+            which is not validated message by message.
+        """
+        return self._send_batches({port: values})
+
+    def _send_batches(
+        self,
+        batches: typing.Dict[str, typing.Union[list, np.ndarray]]
+    ):
+        if self._async_queues:
+            return self.scheduler.dispatch(self, self._asend_batches(batches))
+
+        for out_q, batch in self._batches_to_send(batches):
+            if out_q.batches:
+                self._check_stop_put(out_q, batch, out_q.put_many)
+            else:
+                for msg in batch.msg:
+                    self._check_stop_put(out_q,
+                                         QueueMessage(msg, clk=batch.clk),
+                                         out_q.put)
+
+        if self.scheduler is None:
+            # let the Python GIL take a look at the other threads
+            sleep(1e-9)
+
+        if self._async_body:
+            return _ready(None)
+
+    async def asend_many(self,
+                         port: str,
+                         values: typing.Union[list, np.ndarray]):
+        """Coroutine version of :py:meth:`send_many`.
+
+        Only used with the ``"asyncio"`` scheduler of
+        :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`.
+        """
+        await self._asend_batches({port: values})
+
+    async def _asend_batches(
+        self,
+        batches: typing.Dict[str, typing.Union[list, np.ndarray]]
+    ):
+        for out_q, batch in self._batches_to_send(batches):
+            for msg in batch.msg:
+                await out_q.aput(QueueMessage(msg, clk=batch.clk))
+        self.check_stop()
+
+        # let the event loop take a look at the other nodes
+        await asyncio.sleep(0)
+
+    def _batches_to_send(
+        self,
+        batches: typing.Dict[str, typing.Union[list, np.ndarray]]
+    ) -> typing.List[typing.Tuple[DeltaQueue, QueueMessage]]:
+        """Match the batches to send with the out queues, all batches have
+        the same clock.
+        """
+        if self._log_io:
+            self.log.info(f"-> {batches}")
 
+        self._clock += 1
+
+        messages = []
+        for port, values in batches.items():
+            if port not in self.outputs:
+                raise NameError(f"Node {self.full_name} tried to send value "
+                                f"with invalid keyword {port}")
+            if port in self.out_queues and values is not None:
+                messages.append((self.out_queues[port],
+                                 QueueMessage(values, clk=self._clock)))
+
+        return messages
+
+    async def asend(self, *args, **kwargs):
+        """Coroutine version of :py:meth:`send`, it suspends the caller
+        instead of blocking while an out queue is full.
+
+        Only used with the ``"asyncio"`` scheduler of
+        :py:class:`DeltaPySimulator<deltalanguage.runtime.DeltaPySimulator>`.
+        """
+        for out_q, message in self._messages_to_send(args, kwargs):
+            await out_q.aput(message)
+        self.check_stop()
+
+        # let the event loop take a look at the other nodes
+        await asyncio.sleep(0)
+
+    def _messages_to_send(
+        self,
+        args: typing.Tuple,
+        kwargs: typing.Dict[str, typing.Any]
+    ) -> typing.List[typing.Tuple[DeltaQueue, QueueMessage]]:
+        """Match the values to send with the out queues.
+
+        All values are checked before any of them is sent.
+        """
         # Log only non-trivial output(s)
-        if self.log.isEnabledFor(logging.INFO):
+        if self._log_io:
             if args and not all(x is None for x in args):
                 self.log.info(f"-> {args}")
 
@@ -608,17 +1078,19 @@ class PythonNode(RealNode):
 
         self._clock += 1
 
-        if len(self.outputs) < len(args) + len(kwargs):
+        out_plan = self._out_plan
+        if len(out_plan) < len(args) + len(kwargs):
             raise ValueError(
                 f"Node {self.full_name} tried to send too many values")
 
-        positional_indicies = []
-        for index, send_val in zip(self.outputs.keys(), args):
-            positional_indicies.append(index)
-            if index in self.out_queues:
-                out_q = self.out_queues[index]
-                check_stop_send(out_q, QueueMessage(send_val, clk=self._clock))
+        clock = self._clock
+        messages = [(out_q, QueueMessage(send_val, clk=clock))
+                    for (_, out_q), send_val in zip(out_plan, args)
+                    if out_q is not None]
+        if not kwargs:
+            return messages
 
+        positional_indicies = [name for name, _ in out_plan[:len(args)]]
         for index, send_val in kwargs.items():
             if index not in self.outputs:
                 raise NameError(f"Node {self.full_name} tried to send value with "
@@ -627,11 +1099,10 @@ class PythonNode(RealNode):
                 raise ValueError(f"Node {self.full_name} tried to send the same "
                                  "output positionaly and by keyword.")
             if index in self.out_queues:
-                out_q = self.out_queues[index]
-                check_stop_send(out_q, QueueMessage(send_val, clk=self._clock))
+                messages.append((self.out_queues[index],
+                                 QueueMessage(send_val, clk=self._clock)))
 
-        # let the Python GIL take a look at the other threads
-        sleep(1e-9)
+        return messages
 
     def thread_worker(self, runtime: DeltaPySimulator):
         """Run a regular Python node.
@@ -651,28 +1122,80 @@ class PythonNode(RealNode):
 
         if isinstance(self.body, PyInteractiveBody):
             self.log.debug(f"Running... {self}")
-            self.body.eval(self)
+            if self.body.is_async:
+                # the node has its own event loop
+                asyncio.run(self.body.eval(self))
+            else:
+                self.body.eval(self)
 
         else:
             while True:
-                values = self.receive()
+                self.run_step()
+
+    def run_step(self):
+        """Receive the inputs, evaluate the body once and send the result.
 
-                # If a node keyword has been specified for debugging then add
-                # the node to the arguments.
-                if self.node_key:
-                    # the self arg is effectively a const message,
-                    # so from time 0
-                    values[self.node_key] = self
+        This is a single iteration of :py:meth:`thread_worker` for nodes
+        with function or method bodies.
+        """
+        batch_size = self._batch_size
+        if batch_size:
+            values = self._receive_batch(batch_size)
+        else:
+            values = self.receive()
+
+        # If a node keyword has been specified for debugging then add
+        # the node to the arguments.
+        if self.node_key:
+            # the self arg is effectively a const message,
+            # so from time 0
+            values[self.node_key] = self
+
+        self.log.debug("Running...")
+        if batch_size:
+            self._send_batches(self._batches_of(self.body.eval(**values)))
+        else:
+            self._unpack_and_send(self.body.eval(**values))
+
+    def _batches_of(
+        self,
+        ret: typing.Union[list, typing.Tuple]
+    ) -> typing.Dict[str, list]:
+        """Match the return value of a batch body with the out ports."""
+        if ret is None:
+            return {}
+        if len(self.outputs) > 1:
+            return dict(zip(self.outputs.keys(), ret))
+        return {name: ret for name in self.outputs}
+
+    async def arun_step(self):
+        """Coroutine version of :py:meth:`run_step`.
+
+        The body is evaluated by the scheduler, which decides if it can be
+        run on the event loop.
+        """
+        batch_size = self._batch_size
+        if batch_size:
+            values = await self._areceive_batch(batch_size)
+        else:
+            values = await self.areceive()
+
+        self.log.debug("Running...")
+        ret = await self.scheduler.evaluate(self, values)
 
-                self.log.debug("Running...")
-                self._unpack_and_send(self.body.eval(**values))
+        if ret is None:
+            await asyncio.sleep(0)
+        elif batch_size:
+            await self._asend_batches(self._batches_of(ret))
+        else:
+            await self.asend(*self._send_args(ret))
 
     def run_once(self, runtime: DeltaPySimulator):
         """Compute the value of the node and pass it to the output queues.
 
         The output queues are
         :py:class:`ConstQueue<deltalanguage.runtime.ConstQueue>` that store
-        this value and retrive a deepcopy at each request of the receiving
+        this value frozen and retrive it at each request of the receiving
         node.
         This is done purely for optimisation purposes.
 
@@ -683,7 +1206,8 @@ class PythonNode(RealNode):
         """
         self._unpack_and_send(self.body.eval())
 
-    def capnp(self, capnp_node, capnp_bodies):
+    def capnp(self, capnp_node, capnp_bodies, body_index=None,
+              body_cache=None):
         """Generate ``capnp`` form of this node.
 
         Parameters
@@ -692,18 +1216,25 @@ class PythonNode(RealNode):
             The capnp object of this node.
         capnp_bodies
             List of bodies so we can check if a body is already serialised.
+        body_index : typing.Dict[typing.Tuple, int]
+            Positions in ``capnp_bodies`` by the kind and serialisation of
+            the body, i.e. ``(str, Union[str, bytes])``, updated with the
+            bodies added. If provided it is used instead of searching
+            ``capnp_bodies``.
+        body_cache : BodyCache
+            If provided, on-disk cache of the serialisations of the bodies.
         """
         capnp_node.name = self.full_name
         capnp_node.init("bodies", len(self.bodies))
 
         for i_bod, bod in enumerate(self.bodies):
 
-            body_impl = bod.as_serialised
+            body_impl = bod.serialise(body_cache)
 
-            if isinstance(bod, PyMigenBody):
+            if issubclass(body_type(bod), PyMigenBody):
                 body_id = 'migen'
                 impl_type = 'verilog'
-            elif isinstance(bod, PyInteractiveBody):
+            elif issubclass(body_type(bod), PyInteractiveBody):
                 body_id = 'interactive'
                 impl_type = 'dillImpl'
             else:
@@ -716,17 +1247,26 @@ class PythonNode(RealNode):
             def set_body_impl(body, impl, impl_type=impl_type, body_id=body_id):
                 body.__getattr__(body_id).__setattr__(impl_type, impl)
 
-            for i, body in enumerate(capnp_bodies):
-                if body.which() == body_id:
-                    if get_body_impl(body) == body_impl:
-                        capnp_node.bodies[i_bod] = i
-                        break
+            if body_index is not None:
+                found = body_index.get((body_id, body_impl))
+            else:
+                found = None
+                for i, body in enumerate(capnp_bodies):
+                    if body.which() == body_id:
+                        if get_body_impl(body) == body_impl:
+                            found = i
+                            break
+
+            if found is not None:
+                capnp_node.bodies[i_bod] = found
             else:
                 body = capnp_bodies.add()
                 body.init(body_id)
                 set_body_impl(body, body_impl)
                 body.tags = dill.dumps(bod.access_tags)
                 capnp_node.bodies[i_bod] = len(capnp_bodies) - 1
+                if body_index is not None:
+                    body_index[(body_id, body_impl)] = len(capnp_bodies) - 1
 
         # 2. save I/O ports
         self.capnp_ports(capnp_node)
@@ -747,7 +1287,7 @@ class PythonNode(RealNode):
         for capnp_out_port, out_port in zip(out_ports, self.out_ports):
             out_port.capnp(capnp_out_port)
 
-    def capnp_wiring(self, capnp_nodes, capnp_wiring):
+    def capnp_wiring(self, capnp_nodes, capnp_wiring, node_index=None):
         """Generate capnp form of this node's wires.
 
         Parameters
@@ -756,17 +1296,24 @@ class PythonNode(RealNode):
             List of nodes so indexes can be found.
         capnp_wiring
             List of wires so we can add our relevant wires.
+        node_index : typing.Dict[str, typing.Tuple[int, typing.Dict[str, int]]]
+            Position in ``capnp_nodes`` and positions of the in ports by
+            the name of each node. If provided it is used instead of
+            searching ``capnp_nodes``.
         """
-        for i, capnp_node in enumerate(capnp_nodes):
-            if capnp_node.name == self.full_name:
-                capnp_node_index = i
-                break
+        if node_index is not None:
+            capnp_node_index = node_index[self.full_name][0]
+        else:
+            for i, capnp_node in enumerate(capnp_nodes):
+                if capnp_node.name == self.full_name:
+                    capnp_node_index = i
+                    break
 
         for i, out_port in enumerate(self.out_ports):
             capnp_wire = capnp_wiring.add()
             capnp_wire.srcNode = capnp_node_index
             capnp_wire.srcOutPort = i
-            out_port.capnp_wiring(capnp_nodes, capnp_wire)
+            out_port.capnp_wiring(capnp_nodes, capnp_wire, node_index)
 
     def set_msg_log(self, msg_log: MessageLog):
         """Sets the log for messages received.
@@ -777,6 +1324,7 @@ class PythonNode(RealNode):
             Instance of the message log.
         """
         self.msg_log = msg_log
+        self._log_messages = msg_log.lvl <= logging.INFO
 
     def add_body(self, body: typing.Union[BodyTemplate, typing.Callable]):
         """Add some body to this node, using a ``BodyTemplate`` as a recipe
@@ -803,6 +1351,7 @@ class PythonNode(RealNode):
                 self.bodies.append(template.construct_body(body.__self__))
             else:
                 self.bodies.append(template.construct_body())
+            self.graph.mark_dirty(self)
             self.select_body(override=False)
 
     def is_const(self):
@@ -816,6 +1365,13 @@ class PythonNode(RealNode):
         return self._is_const
 
 
+async def _ready(value):
+    """Awaitable result of ``receive`` or ``send`` for nodes with coroutine
+    bodies that are run on their own threads.
+    """
+    return value
+
+
 def as_node(potential_node: typing.Union[AbstractNode, object],
             graph: DeltaGraph) -> PythonNode:
     """Ensures argument is a node and if not makes it into a constant node.
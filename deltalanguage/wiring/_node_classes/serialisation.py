@@ -0,0 +1,261 @@
+"""Caches of the serialisations of port types and node bodies, so that
+exporting a graph again only pays for what changed.
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import types
+import typing
+import weakref
+
+import dill
+
+from deltalanguage.data_types import (Array,
+                                      BaseDeltaType,
+                                      PrimitiveDeltaType,
+                                      Raw,
+                                      Top,
+                                      Tuple,
+                                      Union)
+
+
+# serialisations of port types by their class and value
+_type_blobs: typing.Dict[typing.Tuple[type, BaseDeltaType], bytes] = {}
+
+
+def _internable(port_type: BaseDeltaType) -> bool:
+    """``True`` if all the types equal to ``port_type`` serialise to
+    objects equal to each other.
+
+    This is not the case for :py:class:`Record
+    <deltalanguage.data_types.Record>`, whose equality ignores the
+    ``attrs`` class it is made of.
+    """
+    if isinstance(port_type, (PrimitiveDeltaType, Top)):
+        return True
+    if isinstance(port_type, Array):
+        return _internable(port_type.list_of)
+    if isinstance(port_type, (Tuple, Union)):
+        return all(_internable(elem) for elem in port_type.elems)
+    if type(port_type) is Raw:
+        return _internable(port_type.base_type)
+    return False
+
+
+def dumps_type(port_type: BaseDeltaType) -> bytes:
+    """Serialise a port type with ``dill``.
+
+    Types are interned: all the types equal to the first one serialised
+    reuse its serialisation.
+    """
+    if not _internable(port_type):
+        return dill.dumps(port_type)
+
+    key = (type(port_type), port_type)
+    blob = _type_blobs.get(key)
+    if blob is None:
+        blob = _type_blobs[key] = dill.dumps(port_type)
+    return blob
+
+
+class _NotCacheable(Exception):
+    """Raised if the content of an object cannot be described."""
+
+
+_MISSING = object()
+
+# names of globals that functions can refer to, by code object
+_global_names: typing.MutableMapping[types.CodeType,
+                                     typing.Tuple[str, ...]] = \
+    weakref.WeakKeyDictionary()
+
+
+def global_names(code: types.CodeType) -> typing.Tuple[str, ...]:
+    """Names that ``code`` and the code nested in it can look up in the
+    globals, a superset of the globals actually used.
+    """
+    names = _global_names.get(code)
+    if names is None:
+        found = dict.fromkeys(code.co_names)
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                found.update(dict.fromkeys(global_names(const)))
+        names = _global_names[code] = tuple(found)
+    return names
+
+
+def identity_fingerprint(fn: typing.Callable,
+                         state: typing.Dict[str, typing.Any]) -> list:
+    """Objects that make the serialisation of a function body.
+
+    If the function, its code, defaults, closure, the globals it
+    refers to or ``state`` are replaced, the fingerprint changes.
+    The objects are compared by identity, so modifications in place are
+    not detected.
+    """
+    fingerprint = [fn,
+                   getattr(fn, "__code__", None),
+                   getattr(fn, "__defaults__", None),
+                   getattr(fn, "__kwdefaults__", None)]
+    for cell in getattr(fn, "__closure__", None) or ():
+        try:
+            fingerprint.append(cell.cell_contents)
+        except ValueError:
+            fingerprint.append(_MISSING)
+    code = getattr(fn, "__code__", None)
+    if code is not None:
+        fn_globals = fn.__globals__
+        fingerprint.extend(fn_globals.get(name, _MISSING)
+                           for name in global_names(code))
+    for name, value in state.items():
+        fingerprint.append(name)
+        fingerprint.append(value)
+        if isinstance(value, list):
+            fingerprint.extend(value)
+    return fingerprint
+
+
+def same_fingerprint(a: list, b: list) -> bool:
+    return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+
+_PLAIN = (type(None), bool, int, float, complex, str, bytes, type(Ellipsis))
+
+_CODE_ATTRS = ("co_argcount", "co_posonlyargcount", "co_kwonlyargcount",
+               "co_nlocals", "co_stacksize", "co_flags", "co_code",
+               "co_names", "co_varnames", "co_freevars", "co_cellvars",
+               "co_filename", "co_name", "co_qualname", "co_firstlineno",
+               "co_lnotab", "co_linetable", "co_exceptiontable")
+
+
+def _content(obj, seen: typing.Dict[int, int]):
+    """Description of the value of ``obj`` made of plain values only,
+    so that its ``repr`` is the same in any process.
+
+    Raises
+    ------
+    _NotCacheable
+        If ``obj`` is not made of plain values, modules, functions and
+        classes that can be imported.
+    """
+    if type(obj) in _PLAIN:
+        return obj
+
+    if type(obj) in (tuple, list):
+        return (type(obj).__name__,) + tuple(_content(x, seen) for x in obj)
+
+    if type(obj) in (set, frozenset):
+        return (type(obj).__name__,) + tuple(
+            sorted(repr(_content(x, seen)) for x in obj)
+        )
+
+    if type(obj) is dict:
+        return ("dict",) + tuple((_content(k, seen), _content(v, seen))
+                                 for k, v in obj.items())
+
+    if isinstance(obj, types.ModuleType):
+        return ("module", obj.__name__)
+
+    if isinstance(obj, types.BuiltinFunctionType):
+        return ("builtin", getattr(obj, "__module__", None), obj.__qualname__)
+
+    if isinstance(obj, type):
+        module = getattr(obj, "__module__", None)
+        if module is None or module == "__main__" or "<" in obj.__qualname__:
+            # serialised by value
+            raise _NotCacheable(obj)
+        return ("class", module, obj.__qualname__)
+
+    # objects referred to again, possibly recursively
+    if id(obj) in seen:
+        return ("ref", seen[id(obj)])
+    seen[id(obj)] = len(seen)
+
+    if isinstance(obj, types.CodeType):
+        return ("code",) + tuple(_content(getattr(obj, attr, None), seen)
+                                 for attr in _CODE_ATTRS) + \
+            tuple(_content(const, seen) for const in obj.co_consts)
+
+    if isinstance(obj, types.FunctionType):
+        closure = []
+        for cell in obj.__closure__ or ():
+            try:
+                closure.append(cell.cell_contents)
+            except ValueError:
+                closure.append(None)
+        fn_globals = {name: obj.__globals__[name]
+                      for name in global_names(obj.__code__)
+                      if name in obj.__globals__}
+        return ("function", obj.__module__, obj.__qualname__,
+                _content(obj.__code__, seen),
+                _content(obj.__defaults__, seen),
+                _content(obj.__kwdefaults__, seen),
+                _content(obj.__dict__, seen),
+                _content(closure, seen),
+                _content(fn_globals, seen))
+
+    if isinstance(obj, BaseDeltaType):
+        # without the data derived from the type, computed on demand
+        return ("object", _content(type(obj), seen),
+                _content(obj.__getstate__(), seen))
+
+    if hasattr(obj, "__dict__") and not isinstance(obj, types.MethodType):
+        return ("object", _content(type(obj), seen), _content(vars(obj), seen))
+
+    raise _NotCacheable(obj)
+
+
+def content_key(obj) -> typing.Optional[str]:
+    """Hash of the content of ``obj``, ``None`` if it cannot be computed.
+
+    It covers the code of the functions ``obj`` refers to, as well as
+    their defaults, closures and the globals they refer to, and the
+    versions of Python and ``dill``.
+    """
+    try:
+        content = _content(obj, {})
+    except (_NotCacheable, RecursionError):
+        return None
+    salt = (sys.implementation.cache_tag, dill.__version__)
+    return hashlib.sha256(repr((salt, content)).encode()).hexdigest()
+
+
+class BodyCache:
+    """On-disk cache of serialised bodies, shared between exports and
+    processes.
+
+    Serialisations are stored by the hash of the content of the body,
+    see :py:func:`content_key`.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the cache, created if needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key + ".dill")
+
+    def get(self, key: str) -> typing.Optional[bytes]:
+        try:
+            with open(self._file(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, blob: bytes):
+        # written atomically, so that readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, self._file(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
@@ -0,0 +1,312 @@
+"""Verilog modules built with Verilator and driven through ``ctypes``.
+
+The Verilog is verilated to C++, which is compiled to a shared library
+together with a small C interface to set and get the ports of the module
+and to evaluate it. Libraries are cached on disk by the hash of the Verilog.
+"""
+
+import ctypes
+import glob
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Dict, List, NamedTuple
+
+from deltalanguage.logging import make_logger
+from .migen_compiler import cache_dir
+
+log = make_logger(logging.WARNING, "Verilator")
+
+_TOP = "Vtop"
+
+
+class VerilatedPort(NamedTuple):
+    """Port of a verilated module."""
+    name: str
+    width: int
+    is_input: bool
+
+
+def _words(width: int) -> int:
+    return (width + 31) // 32
+
+
+def _wrapper_source(ports: List[VerilatedPort]) -> str:
+    """C interface to the ports of the verilated module, by index.
+
+    Ports of up to 64 bits are passed as integers, wider ones as arrays
+    of 32-bit words, least significant first.
+    """
+    set_narrow, get_narrow, set_wide, get_wide = [], [], [], []
+    for i, port in enumerate(ports):
+        if port.width <= 64:
+            if port.is_input:
+                set_narrow.append(
+                    f"case {i}: top->{port.name} = value; break;")
+            get_narrow.append(f"case {i}: return top->{port.name};")
+        else:
+            n = _words(port.width)
+            if port.is_input:
+                set_wide.append(f"case {i}: for (int j = 0; j < {n}; j++) "
+                                f"top->{port.name}[j] = words[j]; break;")
+            get_wide.append(f"case {i}: for (int j = 0; j < {n}; j++) "
+                            f"words[j] = top->{port.name}[j]; break;")
+
+    def cases(lines):
+        return "\n".join("        " + line for line in lines)
+
+    return f"""\
+#include <cstdint>
+#include "verilated.h"
+#include "{_TOP}.h"
+
+extern "C" {{
+
+void* dl_new(void) {{
+    return new {_TOP};
+}}
+
+void dl_delete(void* handle) {{
+    {_TOP}* top = static_cast<{_TOP}*>(handle);
+    top->final();
+    delete top;
+}}
+
+void dl_eval(void* handle) {{
+    static_cast<{_TOP}*>(handle)->eval();
+}}
+
+void dl_set(void* handle, int port, uint64_t value) {{
+    {_TOP}* top = static_cast<{_TOP}*>(handle);
+    switch (port) {{
+{cases(set_narrow)}
+    }}
+}}
+
+uint64_t dl_get(void* handle, int port) {{
+    {_TOP}* top = static_cast<{_TOP}*>(handle);
+    switch (port) {{
+{cases(get_narrow)}
+    }}
+    return 0;
+}}
+
+void dl_set_wide(void* handle, int port, const uint32_t* words) {{
+    {_TOP}* top = static_cast<{_TOP}*>(handle);
+    switch (port) {{
+{cases(set_wide)}
+    }}
+}}
+
+void dl_get_wide(void* handle, int port, uint32_t* words) {{
+    {_TOP}* top = static_cast<{_TOP}*>(handle);
+    switch (port) {{
+{cases(get_wide)}
+    }}
+}}
+
+}}
+"""
+
+
+def _run(args: List[str], cwd: str):
+    result = subprocess.run(args, cwd=cwd, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, universal_newlines=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{args[0]} failed:\n{result.stdout}")
+
+
+def _compile_flags(include: str) -> List[str]:
+    return [os.environ.get("CXX", "g++"), "-std=c++17", "-O2", "-fPIC",
+            "-I", include, "-I", os.path.join(include, "vltstd")]
+
+
+def _runtime(verilator: str, include: str, cache_path: str) -> List[str]:
+    """Objects of the run time library of Verilator, compiled once per
+    installation of Verilator as they take most of the time of a build.
+    """
+    version = subprocess.run([verilator, "--version"],
+                             stdout=subprocess.PIPE, universal_newlines=True,
+                             check=True).stdout
+    key = hashlib.sha256(repr((include, version)).encode()).hexdigest()
+    runtime_dir = os.path.join(cache_path, "runtime-" + key)
+
+    sources = [os.path.join(include, name)
+               for name in ("verilated.cpp", "verilated_threads.cpp")
+               if os.path.exists(os.path.join(include, name))]
+    objects = [os.path.join(runtime_dir, os.path.basename(source) + ".o")
+               for source in sources]
+    if not all(os.path.exists(obj) for obj in objects):
+        os.makedirs(cache_path, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=cache_path)
+        try:
+            for source in sources:
+                _run([*_compile_flags(include), "-c", source, "-o",
+                      os.path.join(tmp_dir,
+                                   os.path.basename(source) + ".o")],
+                     tmp_dir)
+            os.rename(tmp_dir, runtime_dir)
+        except OSError:
+            # compiled concurrently by another process
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not all(os.path.exists(obj) for obj in objects):
+                raise
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+    return objects
+
+
+def _build(verilog: str,
+           top: str,
+           ports: List[VerilatedPort],
+           data_files: Dict[str, str],
+           build_dir: str,
+           data_dir: str,
+           cache_path: str) -> str:
+    """Verilate ``verilog`` and compile it to a shared library in
+    ``build_dir``, return the path of the library.
+
+    The data files are written to ``build_dir`` and referred to in
+    ``data_dir``, where ``build_dir`` is moved afterwards.
+    """
+    verilator = shutil.which("verilator")
+    if verilator is None:
+        raise RuntimeError("Verilator is not installed, "
+                           "it is needed to build verilated bodies")
+    root = subprocess.run([verilator, "--getenv", "VERILATOR_ROOT"],
+                          stdout=subprocess.PIPE, universal_newlines=True,
+                          check=True).stdout.strip()
+    include = os.path.join(root, "include")
+
+    # data files, e.g. initial contents of memories, are read at run time
+    # relatively to the working directory
+    for name, content in data_files.items():
+        with open(os.path.join(build_dir, name), "w") as f:
+            f.write(content)
+        verilog = verilog.replace(f'"{name}"',
+                                  f'"{os.path.join(data_dir, name)}"')
+    with open(os.path.join(build_dir, "top.v"), "w") as f:
+        f.write(verilog)
+    with open(os.path.join(build_dir, "wrapper.cpp"), "w") as f:
+        f.write(_wrapper_source(ports))
+
+    obj_dir = os.path.join(build_dir, "obj")
+    _run([verilator, "--cc", "top.v", "--top-module", top,
+          "--prefix", _TOP, "-Mdir", obj_dir,
+          "-Wno-fatal", "-Wno-lint", "-Wno-style"], build_dir)
+
+    sources = [path for path in glob.glob(os.path.join(obj_dir, "*.cpp"))
+               if not path.endswith("__ALL.cpp")]
+    sources.append(os.path.join(build_dir, "wrapper.cpp"))
+
+    library = os.path.join(build_dir, f"{_TOP}.so")
+    _run([*_compile_flags(include), "-shared", "-I", obj_dir, *sources,
+          *_runtime(verilator, include, cache_path),
+          "-o", library, "-lpthread"], build_dir)
+    return library
+
+
+class VerilatedModel:
+    """Verilog module built with Verilator and loaded with ``ctypes``.
+
+    The library is built once per Verilog source and cached on disk.
+
+    Parameters
+    ----------
+    verilog : str
+        Verilog source.
+    top : str
+        Name of the top module.
+    ports : List[VerilatedPort]
+        Ports of the top module to access, by their index in this list.
+    data_files : Dict[str, str]
+        Files read by the Verilog source, by name.
+    cache_path : str
+        Directory of the cache of the libraries, by default a subdirectory of
+        :py:func:`cache_dir`.
+    """
+
+    def __init__(self,
+                 verilog: str,
+                 top: str,
+                 ports: List[VerilatedPort],
+                 data_files: Dict[str, str] = None,
+                 cache_path: str = None):
+        data_files = data_files if data_files is not None else {}
+        if cache_path is None:
+            cache_path = os.path.join(cache_dir(), "verilator")
+        self.ports = ports
+
+        key = hashlib.sha256(repr((verilog, top, ports, sorted(
+            data_files.items()))).encode()).hexdigest()
+        build_dir = os.path.join(cache_path, key)
+        library = os.path.join(build_dir, f"{_TOP}.so")
+        if not os.path.exists(library):
+            log.info(f"verilating {top} in {build_dir}")
+            os.makedirs(cache_path, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=cache_path)
+            try:
+                # built aside, so that the library is never seen partially
+                # written
+                _build(verilog, top, ports, data_files, tmp_dir, build_dir,
+                       cache_path)
+                os.rename(tmp_dir, build_dir)
+            except OSError:
+                # built concurrently by another process
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                if not os.path.exists(library):
+                    raise
+            except BaseException:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+
+        self._lib = lib = ctypes.CDLL(library)
+        lib.dl_new.restype = ctypes.c_void_p
+        lib.dl_delete.argtypes = [ctypes.c_void_p]
+        lib.dl_eval.argtypes = [ctypes.c_void_p]
+        lib.dl_set.argtypes = [ctypes.c_void_p, ctypes.c_int,
+                               ctypes.c_uint64]
+        lib.dl_get.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.dl_get.restype = ctypes.c_uint64
+        lib.dl_set_wide.argtypes = [ctypes.c_void_p, ctypes.c_int,
+                                    ctypes.POINTER(ctypes.c_uint32)]
+        lib.dl_get_wide.argtypes = [ctypes.c_void_p, ctypes.c_int,
+                                    ctypes.POINTER(ctypes.c_uint32)]
+        self._handle = lib.dl_new()
+
+    def set(self, port: int, value: int):
+        """Set the input with index ``port`` to ``value``, truncated to the
+        width of the port.
+        """
+        width = self.ports[port].width
+        value &= (1 << width) - 1
+        if width <= 64:
+            self._lib.dl_set(self._handle, port, value)
+        else:
+            n = _words(width)
+            words = (ctypes.c_uint32 * n)(*((value >> (32 * i)) & 0xffffffff
+                                            for i in range(n)))
+            self._lib.dl_set_wide(self._handle, port, words)
+
+    def get(self, port: int) -> int:
+        """Value of the port with index ``port``."""
+        width = self.ports[port].width
+        if width <= 64:
+            return self._lib.dl_get(self._handle, port)
+        words = (ctypes.c_uint32 * _words(width))()
+        self._lib.dl_get_wide(self._handle, port, words)
+        return sum(word << (32 * i) for i, word in enumerate(words))
+
+    def eval(self):
+        """Evaluate the module after its inputs changed."""
+        self._lib.dl_eval(self._handle)
+
+    def close(self):
+        """Run the final blocks of the module and free it."""
+        if self._handle is not None:
+            self._lib.dl_delete(self._handle)
+            self._handle = None
@@ -282,7 +282,9 @@ class NodeTemplate():
                          in_port_size: int = 0,
                          latency: Latency = None,
                          lvl: int = logging.ERROR,
-                         tags: List[str] = None) -> BodyTemplate:
+                         tags: List[str] = None,
+                         blocking: bool = False,
+                         batch_size: int = None) -> BodyTemplate:
         """Create a :py:class:`BodyTemplate` for the bodies and constructor
         created using the ``@DeltaBlock`` decorator. Associate this with an
         existing or newly created :py:class:`NodeTemplate`.
@@ -292,7 +294,8 @@ class NodeTemplate():
         )
 
         body_template = FuncBodyTemplate(
-            name, latency, lvl, body_func, allow_const, tags)
+            name, latency, lvl, body_func, allow_const, tags, blocking,
+            batch_size)
         return NodeTemplate._standardised_merge(other,
                                                 body_template,
                                                 node_key,
@@ -309,7 +312,9 @@ class NodeTemplate():
                           in_port_size: int = 0,
                           latency: Latency = None,
                           lvl: int = logging.ERROR,
-                          tags: List[str] = None) -> BodyTemplate:
+                          tags: List[str] = None,
+                          blocking: bool = False,
+                          batch_size: int = None) -> BodyTemplate:
         """Create a :py:class:`BodyTemplate` for the bodies and constructor
         created using the ``@DeltaMethodBlock`` decorator. Associate this with
         an existing or newly created ``NodeTemplate``.
@@ -318,7 +323,8 @@ class NodeTemplate():
             body_func, True, node_key, outputs
         )
 
-        body_template = MethodBodyTemplate(name, latency, lvl, body_func, tags)
+        body_template = MethodBodyTemplate(name, latency, lvl, body_func,
+                                           tags, blocking, batch_size)
         return NodeTemplate._standardised_merge(other,
                                                 body_template,
                                                 node_key,